@@ -54,6 +54,12 @@ DRC_PATH = _py_path.joinpath("drc")
 
 TMP_PATH.mkdir(parents=True, exist_ok=True)  # TODO move elsewhere?
 
+# persistent cache of chips exported by MaskSet, shared between mask builds, in the user cache folder
+_user_cache_path = Path(os.getenv("XDG_CACHE_HOME", str(Path.home().joinpath(".cache")))).joinpath("kqcircuits")
+CHIP_CACHE_PATH = Path(os.getenv("KQC_CHIP_CACHE_PATH", str(_user_cache_path.joinpath("chip_cache"))))
+# persistent cache of simulation geometry, shared between simulation exports, in the user cache folder
+GEOMETRY_CACHE_PATH = Path(os.getenv("KQC_GEOMETRY_CACHE_PATH", str(_user_cache_path.joinpath("geometry_cache"))))
+
 ANSYS_EXECUTABLE = find_ansys_executable(r"%PROGRAMFILES%\AnsysEM\v241\Win64\ansysedt.exe")
 ANSYS_SCRIPT_PATHS = [
     SCRIPTS_PATH.joinpath("simulations").joinpath("ansys"),
@@ -84,6 +90,12 @@ if os.name == "nt":
 # could be for example "IQM" or "A!"
 default_brand = "IQM"
 
+# maximum total size of the chip cache in bytes, least recently used chips are evicted beyond this
+default_chip_cache_size = 10 * 1024**3
+
+# maximum total size of the simulation geometry cache in bytes
+default_geometry_cache_size = 10 * 1024**3
+
 # default bitmap dimensions
 default_png_dimensions = (1000, 1000)
 
@@ -0,0 +1,149 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+"""Profiling of the phases of a mask build.
+
+Phases are timed with the ``profile_phase`` context manager, which records the wall time and the CPU time in seconds and
+the increase of the peak resident set size (RSS) of the process in MB during each phase. The process peak only rises,
+so a phase that reuses memory freed by earlier phases records no increase. Phases can be nested. Worker processes
+return their records with ``take_records``, and the main process adds them back with ``add_records``.
+
+``MaskSet.export`` writes the records into ``mask_build_profile.json`` in the mask set directory, and optionally a
+trace in the Chrome trace event format, which can be viewed as a flame graph in e.g. https://ui.perfetto.dev or
+https://www.speedscope.app.
+
+Typical usage::
+
+    with profile_phase("netlist", chip="QDG"):
+        export_cell_netlist(...)
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# records of finished phases in this process
+_records = []
+# names of the currently open phases in this process
+_stack = []
+
+
+@contextmanager
+def profile_phase(name, **info):
+    """Context manager recording the wall time, CPU time and the increase of the process peak RSS in the enclosed code.
+
+    Args:
+        name: name of the phase, the same for all instances of the phase, like ``"netlist"``
+        **info: JSON serializable details identifying this instance of the phase, like ``chip="QDG"``
+    """
+    _stack.append(name)
+    start_time = time.time()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_rss = peak_rss()
+    try:
+        yield
+    finally:
+        _records.append(
+            {
+                "name": name,
+                "stack": ";".join(_stack),
+                "info": info,
+                "pid": os.getpid(),
+                "start": start_time,
+                "wall_time": time.perf_counter() - start_wall,
+                "cpu_time": time.process_time() - start_cpu,
+                "peak_rss_increase": None if start_rss is None else peak_rss() - start_rss,
+            }
+        )
+        _stack.pop()
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process so far in MB, or None if it is not available."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, kB on Linux
+
+
+def record_count():
+    """Returns the number of records in this process, to be used as the ``start`` argument of ``take_records``."""
+    return len(_records)
+
+
+def take_records(start=0):
+    """Removes the records from index ``start`` onwards in this process and returns them."""
+    records = _records[start:]
+    del _records[start:]
+    return records
+
+
+def add_records(records):
+    """Adds records returned by ``take_records``, possibly in another process, to the records of this process."""
+    _records.extend(records)
+
+
+def save_profile(path, records):
+    """Writes the records and their totals per phase name into a JSON file.
+
+    Phases running in parallel processes are summed in the totals, so the totals may exceed the wall time of the build.
+    The total ``peak_rss_increase`` of a phase is the largest increase among its records.
+    """
+    totals = {}
+    for record in records:
+        total = totals.setdefault(
+            record["name"], {"count": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_rss_increase": None}
+        )
+        total["count"] += 1
+        total["wall_time"] += record["wall_time"]
+        total["cpu_time"] += record["cpu_time"]
+        if record["peak_rss_increase"] is not None:
+            total["peak_rss_increase"] = max(total["peak_rss_increase"] or 0.0, record["peak_rss_increase"])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"totals": totals, "phases": records}, f, indent=4)
+
+
+def save_trace(path, records):
+    """Writes the records as complete events of the Chrome trace event format into a JSON file."""
+    start = min((record["start"] for record in records), default=0.0)
+    events = [
+        {
+            "name": record["name"],
+            "ph": "X",
+            "ts": (record["start"] - start) * 1e6,
+            "dur": record["wall_time"] * 1e6,
+            "pid": record["pid"],
+            "tid": record["pid"],
+            "args": {
+                **record["info"],
+                "cpu_time": record["cpu_time"],
+                "peak_rss_increase": record["peak_rss_increase"],
+            },
+        }
+        for record in records
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
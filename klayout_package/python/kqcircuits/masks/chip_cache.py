@@ -0,0 +1,202 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+"""Persistent on-disk cache for chips exported by ``MaskSet``.
+
+A chip variant is identified by a content hash of everything that affects its exported files: the source code of the
+chip class and of all KQCircuits modules it (transitively) refers to, the chip parameters, the layer configuration,
+the DRC script and the KLayout version. On a cache hit the previously exported files of ``Chips/<variant>`` are copied
+back instead of building the chip again.
+
+Typical usage::
+
+    cache = ChipCache(CHIP_CACHE_PATH)
+    key = chip_cache_key(chip, mask_name, with_grid, export_drc, extra_params)
+    if not cache.load(key, chip_path):
+        ...  # build and export the chip into chip_path
+        cache.store(key, chip_path)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+from functools import lru_cache
+from inspect import isclass, ismodule
+from pathlib import Path
+
+from kqcircuits.defaults import SRC_PATHS, DRC_PATH, layer_config_path
+from kqcircuits.util.export_helper import get_klayout_version
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
+
+# Files in the chip directory that are not cached
+_excluded_suffixes = (".log",)
+
+
+class ChipCache:
+    """Content-addressed store of exported chip directories with a least-recently-used size bound.
+
+    Each cache entry is a directory named by the cache key. The modification time of the entry directory is updated
+    on every hit, and the least recently used entries are evicted when the total size exceeds ``max_size``.
+
+    Attributes:
+        path: directory containing the cache entries
+        max_size: maximum total size of the cache in bytes
+    """
+
+    def __init__(self, path, max_size):
+        self.path = Path(path)
+        self.max_size = max_size
+
+    def load(self, key, chip_path):
+        """Copies the cached files of ``key`` into ``chip_path``.
+
+        Returns:
+            True if the cache contained ``key``, False otherwise
+        """
+        entry = self.path / key
+        if not entry.is_dir():
+            return False
+        try:
+            for file in entry.iterdir():
+                shutil.copy2(file, chip_path / file.name)
+            os.utime(entry)
+        except FileNotFoundError:  # entry evicted by another process while copying
+            return False
+        return True
+
+    def store(self, key, chip_path):
+        """Copies the exported files in ``chip_path`` into the cache as entry ``key`` and evicts old entries."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry = self.path / key
+        if entry.is_dir():
+            os.utime(entry)
+            return
+        # copy to a temporary directory first, so that concurrent readers never see a partially written entry
+        tmp_entry = self.path / f"{key}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        tmp_entry.mkdir()
+        for file in chip_path.iterdir():
+            if file.is_file() and not file.name.endswith(_excluded_suffixes):
+                shutil.copy2(file, tmp_entry / file.name)
+        try:
+            tmp_entry.rename(entry)
+        except OSError:  # another process stored the same entry first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the total cache size is at most ``self.max_size``."""
+        entries = []
+        for entry in self.path.iterdir():
+            if entry.is_dir() and ".tmp" not in entry.name:
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except FileNotFoundError:
+                    continue
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total_size <= self.max_size:
+                break
+            logging.info(f"Evicting cache entry {entry.name} from {self.path}")
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+
+def chip_cache_key(chip, mask_name, with_grid, export_drc, extra_params):
+    """Returns the cache key of a chip variant as a hex digest string.
+
+    Args:
+        chip: ``(chip_class, variant_name, parameters)`` tuple as given to ``MaskSet.add_chip``, where ``chip_class``
+            may also be a file name of a static chip and ``parameters`` is optional
+        mask_name: name of the mask set
+        with_grid: Boolean determining if ground grid is generated
+        export_drc: name of the DRC script or empty string
+        extra_params: dictionary of mask-wide chip build options, like ``skip_extras`` and ``chip_extras``
+    """
+    chip_class, variant_name, *chip_params = chip
+    chip_params = chip_params[0] if chip_params else {}
+
+    if isclass(chip_class):
+        chip_source = f"{chip_class.__module__}.{chip_class.__qualname__}:{module_tree_hash(chip_class.__module__)}"
+    else:
+        chip_source = file_hash(Path(chip_class))
+
+    key_data = {
+        "chip": chip_source,
+        "variant": variant_name,
+        "parameters": chip_params,
+        "mask_name": mask_name,
+        "with_grid": with_grid,
+        "mock_chips": extra_params.get("mock_chips", False),
+        "skip_extras": extra_params.get("skip_extras", False),
+        "chip_extras": extra_params.get("chip_extras"),
+        "layer_config": file_hash(Path(layer_config_path)),
+        "drc": file_hash(Path(DRC_PATH) / export_drc) if export_drc else "",
+        "klayout": get_klayout_version(),
+    }
+    key_json = json.dumps(key_data, cls=CacheKeyEncoder, sort_keys=True)
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+class CacheKeyEncoder(GeometryJsonEncoder):
+    """JSON encoder that serializes any remaining objects by a stable string representation."""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            if isclass(o):
+                return f"{o.__module__}.{o.__qualname__}"
+            return repr(o)
+
+
+def file_hash(path):
+    """Returns the SHA-256 hex digest of the content of the file at ``path``."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def module_tree_hash(module_name):
+    """Returns a combined hash of the module source and of all KQCircuits modules it refers to, recursively."""
+    visited = {}
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in visited:
+            continue
+        module = sys.modules.get(name)
+        file = getattr(module, "__file__", None)
+        if file is None or not _is_kqc_source(Path(file)):
+            continue
+        visited[name] = file_hash(Path(file))
+        for value in vars(module).values():
+            if ismodule(value):
+                pending.append(value.__name__)
+            elif isinstance(getattr(value, "__module__", None), str):
+                pending.append(value.__module__)
+    return hashlib.sha256(json.dumps(visited, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _is_kqc_source(path):
+    path = path.resolve()
+    return any(path.is_relative_to(src.resolve()) for src in SRC_PATHS)
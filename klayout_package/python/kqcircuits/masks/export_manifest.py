@@ -0,0 +1,179 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+"""Dependency tracking for incremental mask set export.
+
+Every mask set export writes ``export_manifest.json`` into the mask set directory. It records the content hash of the
+``.oas`` file of each used chip, the layers on which each chip has shapes, and a fingerprint of each mask layout. The
+fingerprint covers the mask layout parameters, chip positions and bounding boxes, and the source code of the mask
+layout class.
+
+In incremental mode, ``ExportManifest`` compares the current mask set against the manifest of the previous export. A
+mask layer file is exported again only if its mask layout fingerprint changed or if some changed chip of that mask
+layout has shapes on that layer, now or in the previous export. Unaffected files are not written at all, so they stay
+byte-identical.
+"""
+
+import hashlib
+import json
+from inspect import isclass
+from pathlib import Path
+
+from kqcircuits.defaults import default_faces, layer_config_path
+from kqcircuits.masks.chip_cache import file_hash, module_tree_hash
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.export_helper import get_klayout_version
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
+
+
+class ExportManifest:
+    """Record of the state of a mask set export, used to skip outputs that are not affected by changes.
+
+    Args:
+        mask_set: the built MaskSet object
+        mask_layout_names: dictionary ``{mask_layout: full_name}`` identifying the mask layouts in the manifest
+        incremental: if False, all outputs are considered changed, but the manifest is still recorded
+    """
+
+    file_name = "export_manifest.json"
+
+    def __init__(self, mask_set, mask_layout_names, incremental):
+        self.path = Path(mask_set._mask_set_dir) / self.file_name
+        self.incremental = incremental
+        previous = {}
+        if incremental and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        self._previous_chips = previous.get("chips", {})
+        self._previous_mask_layouts = previous.get("mask_layouts", {})
+
+        self._chips = {}
+        for name, cell in mask_set.used_chips.items():
+            chip_file = Path(mask_set._mask_set_dir) / "Chips" / name / f"{name}.oas"
+            self._chips[name] = {
+                "hash": file_hash(chip_file) if chip_file.exists() else None,
+                "layers": _layers_with_shapes(cell),
+            }
+        self._mask_layouts = {
+            full_name: {
+                "fingerprint": mask_layout_fingerprint(mask_set, mask_layout),
+                "chips": sorted(name for name, count in mask_layout.chip_counts.items() if count > 0),
+            }
+            for mask_layout, full_name in mask_layout_names.items()
+        }
+
+    def chip_changed(self, name):
+        """Returns True if the chip ``name`` has changed since the previous export."""
+        previous = self._previous_chips.get(name)
+        return not self.incremental or previous is None or previous["hash"] != self._chips[name]["hash"]
+
+    def mask_layout_changed(self, full_name):
+        """Returns True if the mask layout or any of its chips has changed since the previous export."""
+        if self._mask_layout_fingerprint_changed(full_name):
+            return True
+        return any(self.chip_changed(name) for name in self._mask_layouts[full_name]["chips"])
+
+    def mask_layer_changed(self, full_name, layer_name):
+        """Returns True if the layer ``layer_name`` of the mask layout may have changed since the previous export.
+
+        Args:
+            full_name: full name of the mask layout
+            layer_name: name of the layer as in ``mask_export_layers``, possibly with face id and ``-`` or ``^``
+                prefixes
+        """
+        if self._mask_layout_fingerprint_changed(full_name):
+            return True
+        layer = _base_layer_name(layer_name.lstrip("-^"))
+        for name in self._mask_layouts[full_name]["chips"]:
+            if self.chip_changed(name):
+                layers = self._chips[name]["layers"] + self._previous_chips.get(name, {}).get("layers", [])
+                if layer in {_base_layer_name(n) for n in layers}:
+                    return True
+        return False
+
+    def changed(self):
+        """Returns True if anything in the mask set has changed since the previous export."""
+        return (
+            not self.incremental
+            or set(self._previous_mask_layouts) != set(self._mask_layouts)
+            or any(self.mask_layout_changed(full_name) for full_name in self._mask_layouts)
+        )
+
+    def save(self):
+        """Writes the manifest of the current export, to be compared against on the next incremental export."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"chips": self._chips, "mask_layouts": self._mask_layouts}, f, sort_keys=True, indent=4)
+
+    def _mask_layout_fingerprint_changed(self, full_name):
+        previous = self._previous_mask_layouts.get(full_name)
+        return (
+            not self.incremental
+            or previous is None
+            or previous["fingerprint"] != self._mask_layouts[full_name]["fingerprint"]
+        )
+
+
+def mask_layout_fingerprint(mask_set, mask_layout):
+    """Returns a hash of everything in the mask layout definition that affects the exported files, except the chips.
+
+    The mask layout must be built before calling this, so that chip positions and bounding boxes are included.
+    """
+    data = {
+        "mask_set": [mask_set.name, mask_set.version, mask_set.with_grid, mask_set.add_mask_name_to_chips],
+        "mask_layout": _canonical(mask_layout),
+        "source": module_tree_hash(type(mask_layout).__module__),
+        "layer_config": file_hash(Path(layer_config_path)),
+        "klayout": get_klayout_version(),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _canonical(o):
+    """Converts ``o`` into a JSON serializable object that has the same value whenever ``o`` has the same content."""
+    if o is None or isinstance(o, (bool, int, float, str)):
+        return o
+    if isinstance(o, (pya.Cell, pya.Layout)):
+        return None  # the cells are covered by chip hashes and by the other attributes
+    if isinstance(o, dict):
+        return sorted([_canonical(k), _canonical(v)] for k, v in o.items())
+    if isinstance(o, (list, tuple)):
+        return [_canonical(v) for v in o]
+    if isclass(o):
+        return f"{o.__module__}.{o.__qualname__}"
+    if type(o).__module__.startswith(("klayout", "pya")):
+        # pya objects have an empty __dict__, so they are serialized by their value
+        if isinstance(o, pya.Region):
+            return sorted(str(p) for p in o.each())
+        try:
+            return GeometryJsonEncoder().default(o)
+        except TypeError:
+            return f"{type(o).__name__}({o})"
+    if hasattr(o, "__dict__"):
+        return {str(k): _canonical(v) for k, v in vars(o).items()}
+    return repr(o)
+
+
+def _layers_with_shapes(cell):
+    layout = cell.layout()
+    return sorted(layout.get_info(layer).name for layer in layout.layer_indexes() if not cell.bbox(layer).empty())
+
+
+def _base_layer_name(layer_name):
+    """Returns the layer name without face id prefix, since chip layers may be swapped to another face in a mask."""
+    face_id, _, base_name = layer_name.partition("_")
+    return base_name if face_id in default_faces else layer_name
@@ -19,7 +19,10 @@
 """Functions for exporting mask sets."""
 import json
 import os
+from contextlib import nullcontext
 from math import pi
+from multiprocessing import Pool
+from pathlib import Path
 
 import logging
 
@@ -31,36 +34,63 @@ from kqcircuits.defaults import (
     default_mask_parameters,
 )
 from kqcircuits.elements.flip_chip_connectors.flip_chip_connector_dc import FlipChipConnectorDc
-from kqcircuits.klayout_view import resolve_default_layer_info
+from kqcircuits.klayout_view import KLayoutView, resolve_default_layer_info
+from kqcircuits.masks.build_profile import add_records, profile_phase, record_count, take_records
+from kqcircuits.masks.export_manifest import ExportManifest
 from kqcircuits.pya_resolver import pya
 from kqcircuits.util.area import get_area_and_density
 from kqcircuits.util.count_instances import count_instances_in_cell
 from kqcircuits.util.geometry_helper import circle_polygon
 from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
-from kqcircuits.util.load_save_layout import save_layout
+from kqcircuits.util.load_save_layout import load_layout, save_layout
 from kqcircuits.util.netlist_extraction import export_cell_netlist
-from kqcircuits.util.export_helper import export_drc_report
+from kqcircuits.util.export_helper import export_drc_report, start_drc_report, wait_drc_report
 from kqcircuits.util.replace_junctions import (
     extract_junctions,
     get_tuned_junction_json,
     check_static_cell_has_junctions,
 )
 
+# side length (in µm) of the square tiles used when inverting mask layers
+inversion_tile_size = 5000
+
+# optional outputs of ``export_chip`` in addition to the chip .oas files and the chip .json file
+chip_extras = ("junction_parameters", "netlist", "bump_count", "area_and_density", "layer_clusters", "drc")
+# chip extras that only need the static chip, so they can also be exported later from the chip .oas file
+static_chip_extras = ("area_and_density", "layer_clusters", "drc")
 
-def export_mask_set(mask_set, skip_extras=False):
-    """Exports the designs, bitmap and documentation for the mask_set."""
 
-    export_bitmaps(mask_set)
-    export_designs(mask_set)
-    if not skip_extras:
-        export_docs(mask_set)
+def export_mask_set(mask_set, skip_extras=False):
+    """Exports the designs, bitmap and documentation for the mask_set.
 
+    If ``mask_set.incremental_export`` is True, only the files affected by changes since the previous export are
+    exported, see ``ExportManifest``.
+    """
+    manifest = ExportManifest(
+        mask_set,
+        {mask_layout: get_mask_layout_full_name(mask_set, mask_layout) for mask_layout in mask_set.mask_layouts},
+        mask_set.incremental_export,
+    )
+    with profile_phase("bitmaps"):
+        export_bitmaps(mask_set, manifest=manifest)
+    with profile_phase("designs"):
+        export_designs(mask_set, manifest)
+    if not skip_extras and (manifest.changed() or not (mask_set._mask_set_dir / "Mask_Documentation.md").exists()):
+        with profile_phase("docs"):
+            export_docs(mask_set)
+    manifest.save()
+
+
+def export_designs(mask_set, manifest=None):
+    """Exports .oas and .gds files of the mask_set.
 
-def export_designs(mask_set):
-    """Exports .oas and .gds files of the mask_set."""
+    Args:
+        mask_set: MaskSet object
+        manifest: ExportManifest used to skip unchanged mask layouts and layers, or None to export everything
+    """
     # export mask layouts
     for mask_layout in mask_set.mask_layouts:
-        export_masks_of_face(mask_set._mask_set_dir, mask_layout, mask_set)
+        export_masks_of_face(mask_set._mask_set_dir, mask_layout, mask_set, manifest)
 
 
 def export_chip(
@@ -72,9 +102,22 @@ def export_chip(
     alt_netlists=None,
     skip_extras=False,
     export_chip_layer_clusters=False,
+    extras=None,
 ):
-    """Exports a chip used in a maskset."""
+    """Exports a chip used in a maskset.
 
+    Args:
+        chip_cell: the chip cell, possibly a PCell
+        chip_name: name of the chip variant used in the file names
+        chip_dir: directory for the exported files
+        layout: layout of ``chip_cell``
+        export_drc: name of the DRC script, or empty string to skip the DRC
+        alt_netlists: alternative netlist definitions, see ``export_cell_netlist``
+        skip_extras: if True, none of the chip extras are exported regardless of ``extras``
+        export_chip_layer_clusters: if True, ``"layer_clusters"`` extra is exported if it is in ``extras``
+        extras: names of the chip extras to export, see ``chip_extras``. All chip extras by default.
+    """
+    extras = set() if skip_extras else set(chip_extras if extras is None else extras)
     is_pcell = chip_cell.pcell_declaration() is not None
 
     # save data that is only available in pcell, not static cell
@@ -87,66 +130,43 @@ def export_chip(
     # export .oas file with pcells (requires exporting a cell one hierarchy level above chip pcell)
     dummy_cell = layout.create_cell(chip_name)
     dummy_cell.insert(pya.DCellInstArray(chip_cell.cell_index(), pya.DTrans()))
-    _export_cell(chip_dir / f"{chip_name}_with_pcells.oas", dummy_cell, "all")
-    if not skip_extras:
-        if is_pcell:
-            # Export junctions if chip is PCell
-            export_junction_parameters(dummy_cell, chip_dir / f"{chip_name}_junction_parameters.json")
-        elif check_static_cell_has_junctions(dummy_cell):
-            # Write empty file if static chip but it has junctions
-            with open(chip_dir / f"{chip_name}_junction_parameters.json", "w", encoding="utf-8") as file:
-                file.write(json.dumps({}, indent=2))
+    with profile_phase("pcell oas", chip=chip_name):
+        _export_cell(chip_dir / f"{chip_name}_with_pcells.oas", dummy_cell, "all")
+    if "junction_parameters" in extras:
+        with profile_phase("junction parameters", chip=chip_name):
+            if is_pcell:
+                # Export junctions if chip is PCell
+                export_junction_parameters(dummy_cell, chip_dir / f"{chip_name}_junction_parameters.json")
+            elif check_static_cell_has_junctions(dummy_cell):
+                # Write empty file if static chip but it has junctions
+                with open(chip_dir / f"{chip_name}_junction_parameters.json", "w", encoding="utf-8") as file:
+                    file.write(json.dumps({}, indent=2))
     dummy_cell.delete()
-    static_cell = layout.cell(layout.convert_cell_to_static(chip_cell.cell_index()))
+    with profile_phase("static conversion", chip=chip_name):
+        static_cell = layout.cell(layout.convert_cell_to_static(chip_cell.cell_index()))
 
     # save the chip .oas file with all layers and only containing static cells
-    save_layout(chip_dir / f"{chip_name}.oas", layout, [static_cell])
+    with profile_phase("static oas", chip=chip_name):
+        save_layout(chip_dir / f"{chip_name}.oas", layout, [static_cell])
+
+    # DRC only reads the file saved above, so its subprocess runs while the other extras are exported
+    drc_process = start_drc_report(chip_name, chip_dir, export_drc) if "drc" in extras and export_drc else None
 
     bump_count = None
-    layer_areas_and_densities = {}
-    if not skip_extras:
-        # export netlist
-        export_cell_netlist(static_cell, chip_dir / f"{chip_name}-netlist.json", chip_cell, alt_netlists)
+    if "netlist" in extras:
+        with profile_phase("netlist", chip=chip_name):
+            export_cell_netlist(static_cell, chip_dir / f"{chip_name}-netlist.json", chip_cell, alt_netlists)
+    if "bump_count" in extras:
         # calculate flip-chip bump count
-        bump_count = count_instances_in_cell(chip_cell, FlipChipConnectorDc)
-        # find layer areas and densities
-        for layer, values in get_area_and_density(static_cell, None, True).items():
-            if values["area"] != 0.0:
-                layer_areas_and_densities[layer] = {
-                    "area": f"{values['area']:.2f}",
-                    "density": f"{values['density'] * 100:.2f}",
-                }
-
-        if export_chip_layer_clusters:
-            print(f"{chip_name} - Exporting chip layer clusters")
-            # export .gds files for EBL or laser writer
-            for cluster_name, layer_cluster in chip_export_layer_clusters.items():
-                # If the chip has no shapes in the main layers of the layer cluster, should not export the chip with
-                # that layer cluster.
-                export_layer_cluster = False
-                for layer_name in layer_cluster.main_layers:
-                    shapes_iter = static_cell.begin_shapes_rec(layout.layer(default_layers[layer_name]))
-                    if not shapes_iter.at_end():
-                        export_layer_cluster = True
-                        break
-                if export_layer_cluster:
-                    # To transform the exported layer cluster chip correctly (e.g. mirroring for top chip),
-                    # an instance of the cell is inserted to a temporary cell with the correct transformation.
-                    # Was not able to get this working by just using static_cell.transform_into().
-                    temporary_cell = layout.create_cell(chip_name)
-                    temporary_cell.insert(
-                        pya.DCellInstArray(
-                            static_cell.cell_index(), default_mask_parameters[layer_cluster.face_id]["chip_trans"]
-                        )
-                    )
-                    layers_to_export = {name: layout.layer(default_layers[name]) for name in layer_cluster.all_layers()}
-                    path = chip_dir / f"{chip_name}-{cluster_name}.gds"
-                    _export_cell(path, temporary_cell, layers_to_export)
-                    temporary_cell.delete()
-
-        # export drc report for the chip
-        if export_drc:
-            export_drc_report(chip_name, chip_dir, export_drc)
+        with profile_phase("bump count", chip=chip_name):
+            bump_count = count_instances_in_cell(chip_cell, FlipChipConnectorDc)
+    layer_areas_and_densities = export_static_chip_extras(
+        static_cell, chip_name, chip_dir, extras - {"drc"}, export_chip_layer_clusters
+    )
+
+    if drc_process is not None:
+        with profile_phase("drc", chip=chip_name):
+            wait_drc_report(drc_process)
 
     # save auxiliary chip data into json-file
     chip_json = {
@@ -165,29 +185,164 @@ def export_chip(
         layout.delete_cell_rec(static_cell.cell_index())
 
 
-def export_masks_of_face(export_dir, mask_layout, mask_set):
+def export_static_chip_extras(
+    static_cell, chip_name, chip_dir, extras, export_chip_layer_clusters=False, export_drc=""
+):
+    """Exports the chip extras that only need the static chip cell.
+
+    Args:
+        static_cell: static cell of the chip
+        chip_name: name of the chip variant used in the file names
+        chip_dir: directory for the exported files
+        extras: names of chip extras, of which the ones in ``static_chip_extras`` are exported
+        export_chip_layer_clusters: if True, ``"layer_clusters"`` extra is exported if it is in ``extras``
+        export_drc: name of the DRC script, or empty string to skip the DRC
+
+    Returns:
+        dictionary of layer areas and densities for the chip .json file, empty if ``"area_and_density"`` is not in
+        ``extras``
+    """
+    layer_areas_and_densities = {}
+    if "area_and_density" in extras:
+        # find layer areas and densities
+        with profile_phase("area and density", chip=chip_name):
+            for layer, values in get_area_and_density(static_cell, None, True).items():
+                if values["area"] != 0.0:
+                    layer_areas_and_densities[layer] = {
+                        "area": f"{values['area']:.2f}",
+                        "density": f"{values['density'] * 100:.2f}",
+                    }
+
+    if "layer_clusters" in extras and export_chip_layer_clusters:
+        print(f"{chip_name} - Exporting chip layer clusters")
+        with profile_phase("layer clusters", chip=chip_name):
+            _export_chip_layer_clusters(static_cell, chip_name, chip_dir)
+
+    # export drc report for the chip
+    if "drc" in extras and export_drc:
+        with profile_phase("drc", chip=chip_name):
+            export_drc_report(chip_name, chip_dir, export_drc)
+    return layer_areas_and_densities
+
+
+def export_static_chip_extras_from_file(extras_arg):
+    """Loads an exported chip and exports its static chip extras, possibly in a separate process.
+
+    The layer areas and densities are written into the existing chip .json file. See ``export_static_chip_extras``
+    for the other arguments.
+
+    Args:
+        extras_arg: tuple ``(chip_name, chip_dir, extras, export_chip_layer_clusters, export_drc)``
+
+    Returns:
+        profiling records of the export, see ``build_profile.py``
+    """
+    chip_name, chip_dir, extras, export_chip_layer_clusters, export_drc = extras_arg
+    first_record = record_count()
+    with profile_phase("static chip extras", chip=chip_name):
+        layout = pya.Layout()
+        load_layout(str(Path(chip_dir) / f"{chip_name}.oas"), layout)
+        layer_areas_and_densities = export_static_chip_extras(
+            layout.top_cell(), chip_name, chip_dir, extras, export_chip_layer_clusters, export_drc
+        )
+        if "area_and_density" in extras:
+            json_path = Path(chip_dir) / f"{chip_name}.json"
+            with open(json_path, "r", encoding="utf-8") as f:
+                chip_json = json.load(f)
+            chip_json["Layer areas and densities"] = layer_areas_and_densities
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(chip_json, f, cls=GeometryJsonEncoder, sort_keys=True, indent=4)
+    return take_records(first_record)
+
+
+def _export_chip_layer_clusters(static_cell, chip_name, chip_dir):
+    """Exports .gds files of the chip for each layer cluster in ``chip_export_layer_clusters``."""
+    layout = static_cell.layout()
+    # export .gds files for EBL or laser writer
+    for cluster_name, layer_cluster in chip_export_layer_clusters.items():
+        # If the chip has no shapes in the main layers of the layer cluster, should not export the chip with
+        # that layer cluster.
+        export_layer_cluster = False
+        for layer_name in layer_cluster.main_layers:
+            shapes_iter = static_cell.begin_shapes_rec(layout.layer(default_layers[layer_name]))
+            if not shapes_iter.at_end():
+                export_layer_cluster = True
+                break
+        if export_layer_cluster:
+            # To transform the exported layer cluster chip correctly (e.g. mirroring for top chip),
+            # an instance of the cell is inserted to a temporary cell with the correct transformation.
+            # Was not able to get this working by just using static_cell.transform_into().
+            temporary_cell = layout.create_cell(chip_name)
+            temporary_cell.insert(
+                pya.DCellInstArray(
+                    static_cell.cell_index(), default_mask_parameters[layer_cluster.face_id]["chip_trans"]
+                )
+            )
+            layers_to_export = {name: layout.layer(default_layers[name]) for name in layer_cluster.all_layers()}
+            path = chip_dir / f"{chip_name}-{cluster_name}.gds"
+            _export_cell(path, temporary_cell, layers_to_export)
+            temporary_cell.delete()
+
+
+def export_masks_of_face(export_dir, mask_layout, mask_set, manifest=None):
     """Exports masks for layers of a single face of a mask_set.
 
     Args:
         export_dir: directory for the face specific subdirectories
         mask_layout: MaskLayout object for the cell and face reference
         mask_set: MaskSet object for the name and version attributes to be included in the filename
+        manifest: ExportManifest used to skip unchanged files, or None to export everything
     """
     subdir_name_for_face = get_mask_layout_full_name(mask_set, mask_layout)
     export_dir_for_face = _get_directory(export_dir / str(subdir_name_for_face))
-    # export .oas file with all layers
     path = export_dir_for_face / f"{get_mask_layout_full_name(mask_set, mask_layout)}.oas"
-    _export_cell(path, mask_layout.top_cell, "all")
+    mask_layout_changed = manifest is None or manifest.mask_layout_changed(subdir_name_for_face) or not path.exists()
+    # export .oas file with all layers
+    if mask_layout_changed:
+        with profile_phase("mask layout oas", mask=subdir_name_for_face):
+            _export_cell(path, mask_layout.top_cell, "all")
+    layer_names = [
+        layer_name
+        for layer_name in mask_layout.mask_export_layers
+        if manifest is None
+        or manifest.mask_layer_changed(subdir_name_for_face, layer_name)
+        or not _mask_layer_path(export_dir_for_face, layer_name, mask_layout.face_id, subdir_name_for_face).exists()
+    ]
     # export .oas files for individual optical lithography layers
-    for layer_name in mask_layout.mask_export_layers:
-        export_mask(export_dir_for_face, layer_name, mask_layout, mask_set)
+    processes = min(mask_set.mask_export_processes, len(layer_names))
+    if processes > 1 and not mask_set._single_process:
+        # each process loads its own copy of the mask layout from the file exported above and shares the CPUs with the
+        # other processes when inverting layers
+        threads = max(1, (os.cpu_count() or 1) // processes)
+        layer_args = [
+            (
+                str(path),
+                export_dir_for_face,
+                layer_name,
+                mask_layout.face_id,
+                mask_layout.wafer_rad,
+                subdir_name_for_face,
+                threads,
+            )
+            for layer_name in layer_names
+        ]
+        with Pool(processes) as pool:
+            for records in pool.map(_export_mask_from_file, layer_args):
+                add_records(records)
+    else:
+        for layer_name in layer_names:
+            export_mask(export_dir_for_face, layer_name, mask_layout, mask_set)
+
+    if not mask_layout_changed:
+        return
 
     # Find area and density for the layers defined in mask_layout.mask_export_density_layers
     layer_infos = [
         resolve_default_layer_info(layer_name, mask_layout.face_id)
         for layer_name in mask_layout.mask_export_density_layers
     ]
-    area_data = get_area_and_density(mask_layout.top_cell, layer_infos)
+    with profile_phase("mask area and density", mask=subdir_name_for_face):
+        area_data = get_area_and_density(mask_layout.top_cell, layer_infos)
 
     wafer_area = pi * mask_layout.wafer_rad**2  # Use circular wafer area instead of rectangular bounding boxes
     layer_areas_and_densities = {
@@ -213,6 +368,33 @@ def export_mask(export_dir, layer_name, mask_layout, mask_set):
         mask_layout: MaskLayout object for the cell and face reference
         mask_set: MaskSet object for the name and version attributes to be included in the filename
     """
+    full_name = get_mask_layout_full_name(mask_set, mask_layout)
+    with profile_phase("mask layer", mask=full_name, layer=layer_name):
+        _export_mask_layer(
+            export_dir, layer_name, mask_layout.top_cell, mask_layout.face_id, mask_layout.wafer_rad, full_name
+        )
+
+
+def _export_mask_from_file(layer_arg):
+    """Loads a mask layout from file and exports a mask from a single layer of it, possibly in a separate process.
+
+    Returns:
+        profiling records of the export, see ``build_profile.py``
+    """
+    path, export_dir, layer_name, face_id, wafer_rad, full_name, threads = layer_arg
+    first_record = record_count()
+    with profile_phase("mask layer", mask=full_name, layer=layer_name):
+        layout = pya.Layout()
+        load_layout(path, layout)
+        _export_mask_layer(export_dir, layer_name, layout.top_cell(), face_id, wafer_rad, full_name, threads)
+    return take_records(first_record)
+
+
+def _export_mask_layer(export_dir, layer_name, cell_to_export, face_id, wafer_rad, full_name, threads=None):
+    """Exports a mask from a single layer of ``cell_to_export``, see ``export_mask``.
+
+    ``threads`` is the number of threads used for inverting the layer, by default the number of CPUs.
+    """
     invert = False
     if layer_name.startswith("-"):
         layer_name = layer_name[1:]
@@ -222,26 +404,23 @@ def export_mask(export_dir, layer_name, mask_layout, mask_set):
         layer_name = layer_name[1:]
         mirror = True
 
-    cell_to_export = mask_layout.top_cell
     layout = cell_to_export.layout()
-    layer_info = resolve_default_layer_info(layer_name, mask_layout.face_id)
+    layer_info = resolve_default_layer_info(layer_name, face_id)
     layer = layout.layer(layer_info)
-    tmp_layer = layout.layer()
+    tmp_cells = []
 
     if invert:
-        # TODO: collecting merged region of some layer and inverting it is slow,
-        # if it's a full wafer with ground grid. Consider some approach similar to mirror
-        wafer = pya.Region(cell_to_export.begin_shapes_rec(layer)).merged()
-        disc = pya.Region(circle_polygon(mask_layout.wafer_rad).to_itype(layout.dbu))
-        layout.copy_layer(layer, tmp_layer)
-        layout.clear_layer(layer)
-        cell_to_export.shapes(layer).insert(wafer ^ disc)
+        # Insert the inverted shapes into a separate cell, so that the original layer is left untouched.
+        inverted_cell = layout.create_cell(cell_to_export.name)
+        _insert_inverted_layer(cell_to_export, layer, inverted_cell, wafer_rad, threads=threads)
+        cell_to_export = inverted_cell
+        tmp_cells.append(inverted_cell)
 
     if mirror:
         # Copying shapes to separate cell, then applying mirror transformation to
         # entire cell is faster than collecting merged region.
         # Another option is to copy cell shapes into a separate temporary layout.
-        tmp_cell = layout.create_cell(mask_layout.top_cell.name)
+        tmp_cell = layout.create_cell(cell_to_export.name)
         cm = pya.CellMapping()
         cm.for_single_cell(tmp_cell, cell_to_export)
         lm = pya.LayerMapping()
@@ -250,20 +429,51 @@ def export_mask(export_dir, layer_name, mask_layout, mask_set):
         tmp_cell.copy_tree_shapes(cell_to_export, cm, lm)
         tmp_cell.transform(pya.Trans(2, True, 0, 0))
         cell_to_export = tmp_cell
+        tmp_cells.append(tmp_cell)
 
     layers_to_export = {layer_info.name: layer}
-    path = export_dir / (get_mask_layout_full_name(mask_set, mask_layout) + f"-{layer_info.name}.oas")
+    path = _mask_layer_path(export_dir, layer_name, face_id, full_name)
     _export_cell(path, cell_to_export, layers_to_export)
 
-    if invert:
-        layout.clear_layer(layer)
-        layout.copy_layer(tmp_layer, layer)
-    layout.delete_layer(tmp_layer)
-    if mirror:
-        # Delete temporary cell created for mirroring
+    # Delete temporary cells created for inverting and mirroring
+    for tmp_cell in tmp_cells:
         layout.delete_cell(tmp_cell.cell_index())
 
 
+def _mask_layer_path(export_dir, layer_name, face_id, full_name):
+    """Returns the path of the file exported by ``export_mask``, ``layer_name`` may have ``-`` and ``^`` prefixes."""
+    layer_info = resolve_default_layer_info(layer_name.lstrip("-^"), face_id)
+    return export_dir / (full_name + f"-{layer_info.name}.oas")
+
+
+def _insert_inverted_layer(source_cell, layer, target_cell, wafer_rad, tile_size=inversion_tile_size, threads=None):
+    """Inserts the XOR of ``layer`` in ``source_cell`` and the wafer disc into ``layer`` of ``target_cell``.
+
+    The wafer is processed tile by tile with ``pya.TilingProcessor`` using multiple threads, and the result of each
+    tile is inserted into ``target_cell`` directly. Only the shapes touching one tile are merged at a time, so the peak
+    memory usage does not depend on the wafer size. The resulting polygons are cut at tile boundaries.
+
+    Args:
+        source_cell: cell whose shapes are inverted, including the shapes of its child cells
+        layer: layer index of the inverted layer
+        target_cell: cell to which the inverted shapes are inserted as flat shapes
+        wafer_rad: radius of the wafer disc in µm
+        tile_size: side length of the tiles in µm
+        threads: number of threads processing the tiles, by default the number of CPUs
+    """
+    layout = source_cell.layout()
+    disc = pya.Region(circle_polygon(wafer_rad).to_itype(layout.dbu))  # must stay alive until execute() returns
+    processor = pya.TilingProcessor()
+    processor.input("shapes", layout, source_cell.cell_index(), layer)
+    processor.input("disc", disc)
+    processor.output("inverted", layout, target_cell.cell_index(), layer)
+    processor.dbu = layout.dbu
+    processor.tile_size(tile_size, tile_size)
+    processor.threads = threads or os.cpu_count()
+    processor.queue("_output(inverted, shapes ^ (_tile ? disc & _tile : disc))")
+    processor.execute(f"Inverting layer {layout.get_info(layer).name}")
+
+
 def export_docs(mask_set, filename="Mask_Documentation.md"):
     """Exports mask documentation containing mask layouts and parameters of all chips in the mask_set."""
     file_location = str(mask_set._mask_set_dir / filename)
@@ -360,34 +570,80 @@ def export_docs(mask_set, filename="Mask_Documentation.md"):
         f.close()
 
 
-def export_bitmaps(mask_set, spec_layers=mask_bitmap_export_layers):
-    """Exports bitmaps for the mask_set."""
-    # pylint: disable=dangerous-default-value
+def export_bitmaps(mask_set, spec_layers=mask_bitmap_export_layers, manifest=None):
+    """Exports bitmaps for the mask_set.
 
-    # export bitmaps for mask layouts
+    Bitmaps of mask layouts and chips that are unchanged according to ``manifest`` are not exported again.
+
+    If ``mask_set.mask_export_processes`` is more than one, the chip bitmaps are rendered by parallel processes, each
+    loading the exported chip .oas file into its own ``KLayoutView``, while this process renders the mask layout
+    bitmaps. The mask layouts are always rendered from ``mask_set.view``, because their polygons with holes would be
+    drawn with cut lines if loaded from a file.
+    """
+    # pylint: disable=dangerous-default-value
+    view = mask_set.view
+    mask_layouts = []
     for mask_layout in mask_set.mask_layouts:
         mask_layout_dir_name = get_mask_layout_full_name(mask_set, mask_layout)
         mask_layout_dir = _get_directory(mask_set._mask_set_dir / str(mask_layout_dir_name))
         filename = get_mask_layout_full_name(mask_set, mask_layout)
-        view = mask_set.view
-        if view:
-            view.focus(mask_layout.top_cell)
-            view.export_all_layers_bitmap(mask_layout_dir, mask_layout.top_cell, filename=filename)
-            view.export_layers_bitmaps(
-                mask_layout_dir,
-                mask_layout.top_cell,
-                filename=filename,
-                layers_set=spec_layers,
-                face_id=mask_layout.face_id,
-            )
-    # export bitmaps for chips
+        png_exists = (mask_layout_dir / f"{filename}.png").exists()
+        if manifest is not None and png_exists and not manifest.mask_layout_changed(filename):
+            continue
+        mask_layouts.append((mask_layout, mask_layout_dir, filename))
+    # chip_args are tuples ``(chip_name, chip_dir)``
+    chip_args = []
     chips_dir = _get_directory(mask_set._mask_set_dir / "Chips")
-    for name, cell in mask_set.used_chips.items():
+    for name in mask_set.used_chips:
         chip_dir = _get_directory(chips_dir / name)
-        if view:
-            view.export_all_layers_bitmap(chip_dir, cell, filename=name)
-    if view:
-        view.focus(mask_set.mask_layouts[0].top_cell)
+        if manifest is not None and not manifest.chip_changed(name) and (chip_dir / f"{name}.png").exists():
+            continue
+        chip_args.append((name, chip_dir))
+    if not view:
+        return
+
+    processes = min(mask_set.mask_export_processes, len(chip_args))
+    with Pool(processes) if processes > 1 and not mask_set._single_process else nullcontext() as pool:
+        if pool is not None:
+            chip_records = pool.imap_unordered(_export_chip_bitmap_from_file, chip_args)
+        # export bitmaps for mask layouts
+        for mask_layout, mask_layout_dir, filename in mask_layouts:
+            with profile_phase("mask bitmaps", mask=filename):
+                view.focus(mask_layout.top_cell)
+                view.export_all_layers_bitmap(mask_layout_dir, mask_layout.top_cell, filename=filename)
+                view.export_layers_bitmaps(
+                    mask_layout_dir,
+                    mask_layout.top_cell,
+                    filename=filename,
+                    layers_set=spec_layers,
+                    face_id=mask_layout.face_id,
+                )
+        # export bitmaps for chips
+        if pool is not None:
+            for records in chip_records:
+                add_records(records)
+        else:
+            for name, chip_dir in chip_args:
+                with profile_phase("chip bitmap", chip=name):
+                    view.export_all_layers_bitmap(chip_dir, mask_set.used_chips[name], filename=name)
+    view.focus(mask_set.mask_layouts[0].top_cell)
+
+
+def _export_chip_bitmap_from_file(chip_arg):
+    """Loads a chip from its exported .oas file and exports its bitmap, possibly in a separate process.
+
+    Returns:
+        profiling records of the export, see ``build_profile.py``
+    """
+    chip_name, chip_dir = chip_arg
+    first_record = record_count()
+    with profile_phase("chip bitmap", chip=chip_name):
+        view = KLayoutView(initialize=False)
+        view.add_default_layers()
+        view.load_layout(Path(chip_dir) / f"{chip_name}.oas")
+        view.export_all_layers_bitmap(chip_dir, view.layout.top_cell(), filename=chip_name)
+        view.close()
+    return take_records(first_record)
 
 
 def _export_cell(path, cell=None, layers_to_export=None):
@@ -17,13 +17,16 @@
 # and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
 
 import copy
+import heapq
+import json
 import os
 import logging
 import sys
 from sys import argv
 from time import perf_counter
+from contextlib import ExitStack
 from inspect import isclass
-from multiprocessing import Pool
+from multiprocessing import Pool, get_start_method
 from pathlib import Path
 
 from tqdm import tqdm
@@ -33,10 +36,35 @@ from kqcircuits.masks.multi_face_mask_layout import MultiFaceMaskLayout
 from kqcircuits.run import argument_parser
 from kqcircuits.util.log_router import route_log
 from kqcircuits.pya_resolver import pya, is_standalone_session
-from kqcircuits.defaults import default_bar_format, TMP_PATH, default_face_id
-from kqcircuits.masks.mask_export import export_chip, export_mask_set
+from kqcircuits.defaults import (
+    default_bar_format,
+    TMP_PATH,
+    default_face_id,
+    CHIP_CACHE_PATH,
+    default_chip_cache_size,
+)
+from kqcircuits.masks.build_profile import (
+    add_records,
+    profile_phase,
+    record_count,
+    save_profile,
+    save_trace,
+    take_records,
+)
+from kqcircuits.masks.chip_cache import ChipCache, chip_cache_key
+from kqcircuits.masks.mask_export import (
+    chip_extras as all_chip_extras,
+    export_chip,
+    export_mask_set,
+    export_static_chip_extras_from_file,
+    static_chip_extras,
+)
 from kqcircuits.masks.mask_layout import MaskLayout
 from kqcircuits.klayout_view import KLayoutView
+from kqcircuits.util.library_helper import load_libraries
+
+# profiling records of starting a chip worker process, returned with the first chip built by the worker
+_chip_worker_startup_records = []
 
 
 class MaskSet:
@@ -52,6 +80,33 @@ class MaskSet:
     the command line for debugging with a single process. It is also possible to manually limit the number of
     concurrently used CPUs for resource management purposes with the ``-c 4`` switch (to 4 in this example).
 
+    Exported chips are stored in a persistent chip cache, see ``chip_cache.py``. A chip variant whose class source
+    code, parameters, layer configuration and KLayout version are unchanged since an earlier build is copied from the
+    cache instead of being rebuilt. Use the ``--no-chip-cache`` switch or ``use_chip_cache=False`` to always rebuild.
+
+    The build time of each chip variant is recorded in ``chip_build_times.json`` in the mask set directory. Later runs
+    schedule the chips with the longest expected build time first to minimize the total build time.
+
+    With the ``--incremental`` switch or ``incremental_export=True``, only the mask layer files, bitmaps and
+    documentation affected by changed chips or mask layouts are exported again, see ``export_manifest.py``. Other
+    files of an earlier export are left untouched.
+
+    The wall time, CPU time and peak memory usage of each build phase, like building a chip or exporting a mask layer,
+    are written into ``mask_build_profile.json`` in the mask set directory, see ``build_profile.py``. With the
+    ``--profile-trace`` switch or ``profile_trace=True`` the phases are also written as a trace viewable as a flame
+    graph into ``mask_build_trace.json``.
+
+    The extras exported with each chip, like the netlist or the DRC report, can be selected with ``chip_extras``. With
+    ``parallel_chip_extras=True`` the extras computed from the static chip geometry are exported by a second round of
+    processes from the exported chip files, so that they run in parallel with the other chips instead of after each
+    chip in the same process.
+
+    The chips are built by a pool of worker processes, which is reused by consecutive ``add_chip`` calls with the same
+    number of processes. The workers load the KQCircuits libraries once when they start, or inherit them from this
+    process where processes are forked, instead of loading them for the first chip of every process. The workers are
+    stopped by ``build()``, or by ``close()`` if the mask set is not built. A mask set can also be used as a context
+    manager that stops the workers on exit. If building a chip fails, the workers are terminated.
+
     Example:
         mask = MaskSet(...)
         mask.add_mask_layout(...)
@@ -72,6 +127,21 @@ class MaskSet:
         mask_export_layers: list of names of the layers which are exported for each MaskLayout
         used_chips: similar to chips_map_legend, but only includes chips which are actually used in mask layouts
         export_path: The folder for mask files will be generated under this. TMP_PATH by default.
+        use_chip_cache: Boolean determining if exported chips are reused from and stored to the chip cache
+        chip_cache_path: The folder of the chip cache. CHIP_CACHE_PATH by default.
+        chip_cache_size: Maximum size of the chip cache in bytes. ``default_chip_cache_size`` by default.
+        mask_export_processes: Number of parallel processes used to export the mask layers of each face and the chip
+            bitmaps. Each process loads its own copy of the mask layout, so memory usage grows with this number. 1 by
+            default.
+        incremental_export: Boolean determining if only the files affected by changes since the previous export are
+            exported again. False by default.
+        profile_trace: Boolean determining if ``mask_build_trace.json`` is written in addition to
+            ``mask_build_profile.json``. False by default.
+        chip_extras: list of the extras exported with each chip, see ``mask_export.chip_extras``. All extras by
+            default. The ``-s`` switch skips all extras.
+        parallel_chip_extras: Boolean determining if the extras computed from the static chip geometry, see
+            ``mask_export.static_chip_extras``, are exported in separate processes after building the chips. Has no
+            effect when the chips are built in a single process. False by default.
     """
 
     def __init__(
@@ -85,9 +155,19 @@ class MaskSet:
         export_path=None,
         add_mask_name_to_chips=False,
         parse_sys_args=True,
+        use_chip_cache=True,
+        chip_cache_path=None,
+        chip_cache_size=None,
+        mask_export_processes=1,
+        incremental_export=False,
+        profile_trace=False,
+        chip_extras=None,
+        parallel_chip_extras=False,
     ):
 
         self._time = {"INIT": perf_counter(), "ADD_CHIPS": 0, "BUILD": 0, "EXPORT": 0, "END": 0}
+        self._makespan = {"predicted": 0.0, "actual": 0.0}
+        take_records()  # discard profiling records of earlier mask sets in this process
 
         if export_path is None:
             if parse_sys_args:
@@ -110,17 +190,44 @@ class MaskSet:
         self.used_chips = {}
         self.add_mask_name_to_chips = add_mask_name_to_chips
         self.parse_sys_args = parse_sys_args
+        self.mask_export_processes = mask_export_processes
+        self.incremental_export = incremental_export or (parse_sys_args and "--incremental" in argv)
+        self.profile_trace = profile_trace or (parse_sys_args and "--profile-trace" in argv)
+        self.parallel_chip_extras = parallel_chip_extras
         self._extra_params = {}
         self._mask_set_dir = Path(export_path) / f"{name}_v{version}"
         print(f"Exporting to: {str(self._mask_set_dir)}")
 
         self._mask_set_dir.mkdir(parents=True, exist_ok=True)
+        self._build_times_file = self._mask_set_dir / "chip_build_times.json"
+        self._build_times = {}
+        if self._build_times_file.exists():
+            with open(self._build_times_file, "r", encoding="utf-8") as f:
+                self._build_times = json.load(f)
 
         self._extra_params["enable_debug"] = parse_sys_args and "-d" in argv
         self._single_process = self._extra_params["enable_debug"] or not is_standalone_session()
 
         self._extra_params["mock_chips"] = parse_sys_args and "-m" in argv
         self._extra_params["skip_extras"] = parse_sys_args and "-s" in argv
+        unknown_extras = set(chip_extras or []) - set(all_chip_extras)
+        if unknown_extras:
+            raise ValueError(f"Unknown chip extras {sorted(unknown_extras)}, valid extras are {list(all_chip_extras)}")
+        self._extra_params["chip_extras"] = [
+            e for e in all_chip_extras if chip_extras is None or e in chip_extras
+        ]  # canonical order for the chip cache key
+        self._extra_params["deferred_chip_extras"] = []
+
+        self._chip_cache = None
+        if use_chip_cache and not (parse_sys_args and "--no-chip-cache" in argv):
+            self._chip_cache = ChipCache(
+                CHIP_CACHE_PATH if chip_cache_path is None else chip_cache_path,
+                default_chip_cache_size if chip_cache_size is None else chip_cache_size,
+            )
+
+        self._chip_pool = None
+        self._chip_pool_size = 0
+        self._chip_pool_stack = ExitStack()  # terminates the chip worker processes when closed
 
         self._cpu_override = 0
         if parse_sys_args and "-c" in argv and len(argv) > argv.index("-c") + 1:
@@ -199,6 +306,10 @@ class MaskSet:
         created for the chip containing only the layers defined per each non-empty LayerCluster
         defined in ``chip_export_layer_clusters``.
 
+        Chips are built in the order of decreasing expected build time. The expected build time of a chip is the
+        ``build_cost`` chip parameter in seconds if given, otherwise the build time recorded on an earlier run of this
+        mask set. Chips without either are built first.
+
         Args:
             chip: A chip class. Or a list of tuples, like ``[(QualityFactor, "QDG", parameters),...]``,
                   parameters are optional.
@@ -218,30 +329,146 @@ class MaskSet:
         if self._cpu_override > 0:
             cpus = self._cpu_override
 
-        # Pool.map() needs all arguments packed into a single list
-        xargs = (self.name, self.with_grid, self._mask_set_dir, self.export_drc, self._extra_params)
-        chip_args = ((chip, xargs) for chip in chips)
-        file_names = []
         print(f"Building chip variant(s) {[ch[1] for ch in chips]} using {cpus} process(es)")
         if cpus == 1 or self._single_process:
+            cpus = 1
+        # static chip extras are exported from the chip files by another round of processes in parallel chip extras mode
+        extra_params = dict(self._extra_params)
+        if self.parallel_chip_extras and cpus > 1 and not extra_params["skip_extras"]:
+            extra_params["deferred_chip_extras"] = [e for e in extra_params["chip_extras"] if e in static_chip_extras]
+        # Pool.map() needs all arguments packed into a single list
+        xargs = (self.name, self.with_grid, self._mask_set_dir, self.export_drc, extra_params, self._chip_cache)
+        scheduled_chips, predicted_makespan = self._schedule_chips(chips, cpus)
+        chip_args = ((chip, xargs) for chip in scheduled_chips)
+        start_time = perf_counter()
+        with profile_phase("add chips", chips=[ch[1] for ch in chips]):
+            if cpus == 1:
+                built_chips = self._load_chips_into_mask(map(self._create_chip, chip_args), chips)
+            else:
+                pool = self._chip_worker_pool(cpus)
+                try:
+                    built_chips = self._load_chips_into_mask(pool.imap_unordered(self._create_chip, chip_args), chips)
+                    self._export_deferred_chip_extras(pool, chips, built_chips, extra_params["deferred_chip_extras"])
+                except BaseException:
+                    self._close_chip_worker_pool(terminate=True)
+                    raise
+            if self._chip_cache:
+                for variant, cache_key in built_chips.items():
+                    with profile_phase("chip cache store", chip=variant):
+                        self._chip_cache.store(cache_key, self._mask_set_dir / "Chips" / variant)
+
+        self._makespan["actual"] += perf_counter() - start_time
+        if self._makespan["predicted"] is not None:
+            self._makespan["predicted"] = (
+                None if predicted_makespan is None else self._makespan["predicted"] + predicted_makespan
+            )
+        with open(self._build_times_file, "w", encoding="utf-8") as f:
+            json.dump(self._build_times, f, sort_keys=True, indent=4)
+
+    def _schedule_chips(self, chips, cpus):
+        """Orders chips by decreasing expected build time and predicts the resulting makespan.
+
+        Args:
+            chips: list of ``(chip, variant, parameters)`` tuples
+            cpus: number of parallel processes
+
+        Returns:
+            tuple ``(scheduled_chips, predicted_makespan)``, where ``predicted_makespan`` is None if the build time of
+            some chip is unknown
+        """
+        costs = {}
+        for chip in chips:
+            chip_params = chip[2] if len(chip) > 2 else {}
+            costs[chip[1]] = chip_params.get("build_cost", self._build_times.get(chip[1]))
+
+        # chips of unknown cost go first, since they may well be the largest ones
+        scheduled_chips = sorted(chips, key=lambda c: -float("inf") if costs[c[1]] is None else -costs[c[1]])
+        if any(cost is None for cost in costs.values()):
+            return scheduled_chips, None
+
+        # workers take the next chip when they become free, so each chip goes to the least loaded worker
+        worker_loads = [0.0] * min(cpus, len(chips))
+        for chip in scheduled_chips:
+            heapq.heapreplace(worker_loads, worker_loads[0] + costs[chip[1]])
+        return scheduled_chips, max(worker_loads)
+
+    def _chip_worker_pool(self, cpus):
+        """Returns a pool of ``cpus`` chip worker processes, reusing the pool of the previous call if it has as many.
+
+        With the ``fork`` start method the libraries are loaded into this process before starting the workers, so that
+        the workers inherit them instead of loading them each.
+        """
+        if self._chip_pool is not None and self._chip_pool_size != cpus:
+            self._close_chip_worker_pool()
+        if self._chip_pool is None:
+            if get_start_method() == "fork":
+                with profile_phase("load libraries"):
+                    load_libraries()
+            self._chip_pool = self._chip_pool_stack.enter_context(Pool(cpus, initializer=MaskSet._init_chip_worker))
+            self._chip_pool_size = cpus
+        return self._chip_pool
+
+    def _close_chip_worker_pool(self, terminate=False):
+        """Stops the chip worker processes.
+
+        Args:
+            terminate: if True, the workers are stopped immediately, otherwise after they have finished their tasks
+        """
+        if self._chip_pool is not None:
+            if not terminate:
+                self._chip_pool.close()
+                self._chip_pool.join()
+            self._chip_pool = None
+            self._chip_pool_size = 0
+        self._chip_pool_stack.close()
+
+    def close(self):
+        """Stops the chip worker processes. Not needed if ``build()`` is called, which stops them as well."""
+        self._close_chip_worker_pool()
+
+    def __enter__(self):
+        return self
 
-            file_names += map(self._create_chip, chip_args)
-        else:
-            with Pool(cpus) as pool:
-                file_names += pool.map(self._create_chip, chip_args)
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close_chip_worker_pool(terminate=exc_type is not None)
 
-        # import chip cells exported by the parallel processes into the mask
-        for variant, file_name in tqdm(file_names, desc="Add chips into mask", bar_format=default_bar_format):
-            self._load_chip_into_mask(file_name, variant)
+    def __del__(self):
+        if hasattr(self, "_chip_pool_stack"):
+            self._close_chip_worker_pool(terminate=True)
+
+    @staticmethod
+    def _init_chip_worker():
+        """Loads the libraries when a chip worker process starts, so that the chips built by it do not wait for it."""
+        first_record = record_count()
+        with profile_phase("load libraries"):
+            load_libraries()
+        _chip_worker_startup_records.extend(take_records(first_record))
 
     @staticmethod
     def _create_chip(chip_arg):
-        """Create chip, possibly in a separate process."""
+        """Create chip, possibly in a separate process.
+
+        Returns:
+            tuple ``(variant_name, file_name, build_time, cache_key, profile_records)``, where ``build_time`` is None
+            for chips from the cache and ``cache_key`` is None if the chip cache is not used. The chip is stored in the
+            cache by the main process.
+        """
+        first_record = record_count()
+        with profile_phase("chip", chip=chip_arg[0][1]):
+            result = MaskSet._build_chip(chip_arg)
+        records = _chip_worker_startup_records + take_records(first_record)
+        _chip_worker_startup_records.clear()
+        return *result, records
 
+    @staticmethod
+    def _build_chip(chip_arg):
+        start_time = perf_counter()
         chip, xargs = chip_arg
-        name, with_grid, _mask_set_dir, export_drc, _extra_params = xargs
+        name, with_grid, _mask_set_dir, export_drc, _extra_params, chip_cache = xargs
         chip_class, variant_name, *chip_params = chip
         chip_params = chip_params[0] if chip_params else {}
+        chip_params.pop("build_cost", None)
+        cache_key = chip_cache_key(chip, name, with_grid, export_drc, _extra_params) if chip_cache else None
         alt_netlists = chip_params.pop("alt_netlists", None)
 
         chip_path = _mask_set_dir / "Chips" / f"{variant_name}"
@@ -250,8 +477,15 @@ class MaskSet:
         logging.basicConfig(level=logging.DEBUG, force=True)  # this level is NOT actually used
         route_log(filename=chip_path / f"{variant_name}.log", stdout=_extra_params["enable_debug"])
 
+        with profile_phase("chip cache load", chip=variant_name):
+            cache_hit = chip_cache and chip_cache.load(cache_key, chip_path)
+        if cache_hit:
+            logging.info(f"Loaded chip {variant_name} from chip cache entry {cache_key}")
+            return variant_name, str(chip_path / f"{variant_name}.oas"), None, cache_key
+
         mock_chip = _extra_params["mock_chips"] or chip_params.pop("mock_chip", False)
         skip_extras = _extra_params["skip_extras"]
+        extras = [e for e in _extra_params["chip_extras"] if e not in _extra_params["deferred_chip_extras"]]
         export_chip_layer_clusters = chip_params.pop("export_chip_layer_clusters", False)
 
         view = KLayoutView()
@@ -278,28 +512,34 @@ class MaskSet:
                         "with_gnd_tsvs": False,
                     }
                 )
-                cell = Chip.create(layout, **mock_params)
+                with profile_phase("create cell", chip=variant_name):
+                    cell = Chip.create(layout, **mock_params)
             else:
                 if chip_params:
                     params.update(chip_params)
-                cell = chip_class.create(layout, **params)
+                with profile_phase("create cell", chip=variant_name):
+                    cell = chip_class.create(layout, **params)
         else:  # it's a file name, load it
             view.load_layout(chip_class)
             cell = layout.top_cells()[-1]
 
-        export_chip(
-            cell,
-            variant_name,
-            chip_path,
-            layout,
-            export_drc,
-            alt_netlists=alt_netlists,
-            skip_extras=skip_extras,
-            export_chip_layer_clusters=export_chip_layer_clusters,
-        )
+        with profile_phase("export chip", chip=variant_name):
+            export_chip(
+                cell,
+                variant_name,
+                chip_path,
+                layout,
+                export_drc,
+                alt_netlists=alt_netlists,
+                skip_extras=skip_extras,
+                export_chip_layer_clusters=export_chip_layer_clusters,
+                extras=extras,
+            )
         view.close()
 
-        return variant_name, str(chip_path / f"{variant_name}.oas")
+        build_time = perf_counter() - start_time
+        logging.info(f"Built chip {variant_name} in {build_time:.1f}s")
+        return variant_name, str(chip_path / f"{variant_name}.oas"), build_time, cache_key
 
     def build(self, remove_guiding_shapes=True):
         """Builds the mask set.
@@ -312,12 +552,14 @@ class MaskSet:
 
         """
         self._time["BUILD"] = perf_counter()
+        self._close_chip_worker_pool()  # all chips have been added
         # build mask layouts (without chip copy labels)
         for mask_layout in self.mask_layouts:
             # include face_id in mask_layout.name only for multi-face masks
             if len(self.mask_layouts) > 1:
                 mask_layout.name += "-" + mask_layout.face_id
-            mask_layout.build(self.chips_map_legend)
+            with profile_phase("mask layout build", mask=mask_layout.name):
+                mask_layout.build(self.chips_map_legend)
 
         chip_copy_label_layers = ["base_metal_gap", "base_metal_gap_wo_grid", "base_metal_gap_for_EBL"]
 
@@ -360,15 +602,17 @@ class MaskSet:
             labels_cell = mask_layout.layout.create_cell("ChipLabels")
             mask_layout.top_cell.insert(pya.DCellInstArray(labels_cell.cell_index(), pya.DTrans(pya.DVector(0, 0))))
             if mask_layout not in submask_layouts:
-                if isinstance(mask_layout.chips_map, dict):
-                    mask_layout.insert_chip_copy_labels(labels_cell, chip_copy_label_layers, mask_name_for_chip)
-                else:
-                    mask_layout.generate_and_insert_chip_copy_labels(
-                        labels_cell, chip_copy_label_layers, mask_name_for_chip
-                    )
+                with profile_phase("chip copy labels", mask=mask_layout.name):
+                    if isinstance(mask_layout.chips_map, dict):
+                        mask_layout.insert_chip_copy_labels(labels_cell, chip_copy_label_layers, mask_name_for_chip)
+                    else:
+                        mask_layout.generate_and_insert_chip_copy_labels(
+                            labels_cell, chip_copy_label_layers, mask_name_for_chip
+                        )
                 # remove "$1" or similar unnecessary postfix from cell name
                 mask_layout.top_cell.name = f"{mask_layout.name}"
-                mask_layout.insert_chips()
+                with profile_phase("insert chips", mask=mask_layout.name):
+                    mask_layout.insert_chips()
 
         # populate used_chips with chips which exist in some mask_layout
         for chip_name, cell in self.chips_map_legend.items():
@@ -389,10 +633,16 @@ class MaskSet:
         self._time["EXPORT"] = perf_counter()
 
         print("Exporting mask set...")
-        export_mask_set(self, self._extra_params["skip_extras"])
+        with profile_phase("export"):
+            export_mask_set(self, self._extra_params["skip_extras"])
 
         self._time["END"] = perf_counter()
 
+        profile_records = take_records()
+        save_profile(self._mask_set_dir / "mask_build_profile.json", profile_records)
+        if self.profile_trace:
+            save_trace(self._mask_set_dir / "mask_build_trace.json", profile_records)
+
         def tdiff(a, b):  # get elapsed time from "a" to "b"
             return f"{self._time[b] - self._time[a]:.1f}s" if self._time[a] and self._time[b] else "n/a"
 
@@ -400,6 +650,11 @@ class MaskSet:
             f"Runtime: {tdiff('INIT', 'END')} (add chips: {tdiff('ADD_CHIPS', 'BUILD')}, "
             f"build: {tdiff('BUILD', 'EXPORT')}, export: {tdiff('EXPORT', 'END')})"
         )
+        predicted = self._makespan["predicted"]
+        print(
+            f"Chip build makespan: {self._makespan['actual']:.1f}s "
+            f"(predicted: {'n/a' if predicted is None else f'{predicted:.1f}s'})"
+        )
 
     @staticmethod
     def chips_map_from_box_map(box_map, mask_map):
@@ -428,6 +683,70 @@ class MaskSet:
 
         return chips_map
 
+    def _load_chips_into_mask(self, created_chips, chips):
+        """Loads chips into the mask as soon as they are created.
+
+        Args:
+            created_chips: iterable of tuples returned by ``_create_chip``, which is consumed while the chips are still
+                being created by other processes
+            chips: list of ``(chip, variant, parameters)`` tuples given to ``add_chip``
+
+        Returns:
+            dictionary of the cache keys of the chips that were built instead of loaded from the chip cache, by variant
+        """
+        built_chips = {}
+        with tqdm(total=len(chips), desc="Build and add chips into mask", bar_format=default_bar_format) as progress:
+            for variant, file_name, build_time, cache_key, profile_records in created_chips:
+                progress.set_postfix_str(f"adding {variant}")
+                add_records(profile_records)
+                with profile_phase("load chip", chip=variant):
+                    self._load_chip_into_mask(file_name, variant)
+                if build_time is not None:
+                    self._build_times[variant] = round(build_time, 3)
+                    built_chips[variant] = cache_key
+                progress.update()
+
+        # keep chips in the order they were given, regardless of the order in which the processes finish
+        variants = [chip[1] for chip in chips]
+        self.chips_map_legend.update({variant: self.chips_map_legend.pop(variant) for variant in variants})
+        return built_chips
+
+    def _export_deferred_chip_extras(self, pool, chips, built_chips, extras):
+        """Exports the static chip extras of the built chips from the chip files using the worker processes of pool.
+
+        Each extra of each chip is a separate task, so that the slowest extras, like DRC, of different chips run in
+        parallel.
+
+        Args:
+            pool: multiprocessing Pool whose processes export the extras
+            chips: list of ``(chip, variant, parameters)`` tuples given to ``add_chip``
+            built_chips: dictionary of built chips as returned by ``_load_chips_into_mask``
+            extras: names of the static chip extras to export
+        """
+        extras_args = []
+        for _, variant, *chip_params in chips:
+            if variant not in built_chips:
+                continue
+            export_chip_layer_clusters = (
+                chip_params[0].get("export_chip_layer_clusters", False) if chip_params else False
+            )
+            for extra in extras:
+                if (extra == "layer_clusters" and not export_chip_layer_clusters) or (
+                    extra == "drc" and not self.export_drc
+                ):
+                    continue
+                chip_dir = self._mask_set_dir / "Chips" / variant
+                extras_args.append((variant, chip_dir, [extra], export_chip_layer_clusters, self.export_drc))
+        # start the DRC runs first, since they are usually the slowest
+        extras_args.sort(key=lambda extras_arg: extras_arg[2] != ["drc"])
+        for profile_records in tqdm(
+            pool.imap_unordered(export_static_chip_extras_from_file, extras_args),
+            total=len(extras_args),
+            desc="Export chip extras",
+            bar_format=default_bar_format,
+        ):
+            add_records(profile_records)
+
     def _load_chip_into_mask(self, file_name, variant_name):
         """Loads a chip from file_name to self.layout and adds it into self.chips_map_legend["variant_name"]"""
         self.view.load_layout(file_name)
@@ -91,6 +91,15 @@ def argument_parser():
     )
     mask_parser.add_argument("-s", "--skip_extras", action="store_true", help="Skip netlist and documentation export")
     mask_parser.add_argument("-c N", action="store_true", help="Limit the number of used CPUs to 'N'")
+    mask_parser.add_argument(
+        "--no-chip-cache", action="store_true", help="Rebuild all chips instead of reusing them from the chip cache"
+    )
+    mask_parser.add_argument(
+        "--incremental", action="store_true", help="Only export mask files affected by changes since the last export"
+    )
+    mask_parser.add_argument(
+        "--profile-trace", action="store_true", help="Write a flame graph compatible trace of the mask build phases"
+    )
     mask_parser.add_argument("-p", action="store", help="Path to export the mask to, defaults to TMP_PATH")
 
     singularity_parser.add_argument("--build", action="store_true", help="build singularity image locally")
@@ -20,7 +20,7 @@ import os
 import stat
 
 import logging
-from typing import Optional, Union, Sequence, Tuple
+from typing import Iterable, Optional, Union, Sequence, Sized, Tuple
 from pathlib import Path
 
 from kqcircuits.simulations.export.ansys.ansys_solution import AnsysSolution, get_ansys_solution
@@ -29,8 +29,12 @@ from kqcircuits.simulations.export.simulation_export import (
     get_post_process_command_lines,
     get_combined_parameters,
     export_simulation_json,
+    iter_and_release,
+    SimulationOasWriter,
+    SimulationSweep,
 )
-from kqcircuits.simulations.export.simulation_validate import validate_simulation
+from kqcircuits.simulations.export.simulation_handle import SimulationHandle
+from kqcircuits.simulations.export.simulation_validate import validate_simulation, validate_sweep
 from kqcircuits.util.export_helper import write_commit_reference_file
 from kqcircuits.util.load_save_layout import save_layout
 from kqcircuits.defaults import ANSYS_EXECUTABLE, ANSYS_SCRIPT_PATHS
@@ -39,19 +43,21 @@ from kqcircuits.simulations.cross_section_simulation import CrossSectionSimulati
 from kqcircuits.simulations.post_process import PostProcess
 
 
-def export_ansys_json(simulation: Union[Simulation, CrossSectionSimulation], solution: AnsysSolution, path: Path):
+def export_ansys_json(
+    simulation: Union[Simulation, CrossSectionSimulation, SimulationHandle], solution: AnsysSolution, path: Path
+):
     """
     Export Ansys simulation into json and gds files.
 
     Arguments:
-        simulation: The simulation to be exported.
+        simulation: The simulation or simulation handle to be exported.
         solution: The solution to be exported.
         path: Location where to write json and gds files.
 
     Returns:
          Path to exported json file.
     """
-    if simulation is None or not isinstance(simulation, (Simulation, CrossSectionSimulation)):
+    if simulation is None or not isinstance(simulation, (Simulation, CrossSectionSimulation, SimulationHandle)):
         raise ValueError("Cannot export without simulation")
 
     # write .gds file
@@ -143,7 +149,9 @@ def export_ansys_bat(
 
 
 def export_ansys(
-    simulations: Sequence[Union[Simulation, Tuple[Simulation, AnsysSolution]]],
+    simulations: Iterable[
+        Union[Simulation, Tuple[Simulation, AnsysSolution], SimulationHandle, Tuple[SimulationHandle, AnsysSolution]]
+    ],
     path: Path,
     script_folder: str = "scripts",
     file_prefix: str = "simulation",
@@ -152,13 +160,17 @@ def export_ansys(
     post_process: Optional[Union[PostProcess, Sequence[PostProcess]]] = None,
     use_rel_path: bool = True,
     skip_errors: bool = False,
+    oas_writer: Optional[SimulationOasWriter] = None,
     **solution_params,
 ) -> Path:
     """
     Export Ansys simulations by writing necessary scripts and json, gds, and bat files.
 
     Arguments:
-        simulations: List of Simulation objects or tuples containing Simulation and Solution objects.
+        simulations: List of Simulation objects or tuples containing Simulation and Solution objects. Simulation
+            handles returned by parallel simulation sweeps can be used in place of Simulation objects. A lazy
+            ``SimulationSweep`` is exported one simulation at a time, and each simulation is released after its
+            export. Other iterables that are not lists are first collected into a list.
         path: Location where to write export files.
         script_folder: Path to the Ansys-scripts folder.
         file_prefix: Name of the batch file to be created.
@@ -172,21 +184,30 @@ def export_ansys(
 
                **Use this carefully**, some of your simulations might not make sense physically and
                you might end up wasting time on bad simulations.
+        oas_writer: ``SimulationOasWriter`` into which each simulation is written before it is released, or None
         solution_params: AnsysSolution parameters if simulations is a list of Simulation objects.
 
     Returns:
         Path to exported bat file.
     """
+    if not isinstance(simulations, Sized):
+        simulations = list(simulations)
     if len(simulations) > 1 and not exit_after_run:
         logging.warning("Exporting a sweep of multiple Ansys simulations with `exit_after_run=False`.")
 
     write_commit_reference_file(path)
     copy_content_into_directory(ANSYS_SCRIPT_PATHS, path, script_folder)
     json_filenames = []
-    common_sol = None if all(isinstance(s, Sequence) for s in simulations) else get_ansys_solution(**solution_params)
-    for sim_sol in simulations:
+    all_tuples = isinstance(simulations, Sequence) and all(isinstance(s, Sequence) for s in simulations)
+    common_sol = None if all_tuples else get_ansys_solution(**solution_params)
+    if isinstance(simulations, SimulationSweep):
+        # check the parameters of the whole sweep before building any simulation geometry
+        validate_sweep(simulations.sim_class, simulations.parameter_sets, simulations.solutions or [common_sol])
+    for sim_sol in iter_and_release(simulations):
         simulation, solution = sim_sol if isinstance(sim_sol, Sequence) else (sim_sol, common_sol)
         validate_simulation(simulation, solution)
+        if oas_writer is not None:
+            oas_writer.write(simulation)
         try:
             json_filenames.append(export_ansys_json(simulation, solution, path))
         except (IndexError, ValueError, Exception) as e:  # pylint: disable=broad-except
@@ -24,18 +24,25 @@ import json
 import argparse
 import platform
 import copy
+import hashlib
 
 from dataclasses import replace
 from pathlib import Path
-from typing import Sequence, Union, Tuple, Dict, Optional
+from typing import Iterable, Sequence, Sized, Union, Tuple, Dict, Optional
 
 from kqcircuits.simulations.export.simulation_export import (
     copy_content_into_directory,
     get_post_process_command_lines,
     get_combined_parameters,
     export_simulation_json,
+    get_geometry_fingerprint,
+    iter_and_release,
+    SimulationOasWriter,
+    SimulationSweep,
 )
-from kqcircuits.simulations.export.simulation_validate import validate_simulation
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
+from kqcircuits.simulations.export.simulation_handle import SimulationHandle
+from kqcircuits.simulations.export.simulation_validate import validate_simulation, validate_sweep
 from kqcircuits.util.load_save_layout import save_layout
 from kqcircuits.util.export_helper import write_commit_reference_file
 from kqcircuits.defaults import ELMER_SCRIPT_PATHS, KQC_REMOTE_ACCOUNT, SIM_SCRIPT_PATH
@@ -46,28 +53,32 @@ from kqcircuits.simulations.post_process import PostProcess
 
 
 def export_elmer_json(
-    simulation: Union[Simulation, CrossSectionSimulation],
+    simulation: Union[Simulation, CrossSectionSimulation, SimulationHandle],
     solution: ElmerSolution,
     path: Path,
     workflow: dict,
     mesh_reuse_name: str | None = None,
+    mesh_fingerprint: str | None = None,
 ):
     """
     Export Elmer simulation into json and gds files.
 
     Args:
-        simulation: The simulation to be exported.
+        simulation: The simulation or simulation handle to be exported.
         solution: The solution to be exported.
         path: Location where to write json and gds files.
         workflow: Parameters for simulation workflow
         mesh_reuse_name: Name of a mesh to be reused from another simulation
+        mesh_fingerprint: Hash of the mesh inputs, see ``get_mesh_fingerprint``
 
     Returns:
          Path to exported json file.
     """
-    is_cross_section = isinstance(simulation, CrossSectionSimulation)
-
-    if simulation is None or not isinstance(simulation, (Simulation, CrossSectionSimulation)):
+    if isinstance(simulation, SimulationHandle):
+        is_cross_section = simulation.is_subclass_of(CrossSectionSimulation)
+    elif isinstance(simulation, (Simulation, CrossSectionSimulation)):
+        is_cross_section = isinstance(simulation, CrossSectionSimulation)
+    else:
         raise ValueError("Cannot export without simulation")
 
     # write .gds file
@@ -99,6 +110,7 @@ def export_elmer_json(
     json_data = {
         "name": full_name,
         "mesh_name": mesh_reuse_name if mesh_reuse_name else full_name,
+        "mesh_fingerprint": mesh_fingerprint,
         "workflow": workflow,
         **sim_data,
         **sol_data,
@@ -115,6 +127,103 @@ def export_elmer_json(
     return json_file_path
 
 
+def get_mesh_fingerprint(simulation, solution: ElmerSolution, geometry_fingerprint: str) -> str:
+    """Returns a hash of everything that the mesh of the simulation depends on.
+
+    Simulations with equal fingerprints can share a mesh even if they are different objects or exported in different
+    runs. The names of the simulation and solution and the material parameters are not included.
+
+    Args:
+        simulation: The simulation or simulation handle.
+        solution: The solution.
+        geometry_fingerprint: Hash of the simulation geometry, see ``get_geometry_fingerprint``.
+    """
+    sim_data = simulation.get_simulation_data()
+    mesh_data = {
+        "geometry": geometry_fingerprint,
+        **{k: v for k, v in sim_data.items() if k not in ("simulation_name", "parent_simulation", "material_dict")},
+        "tool": solution.tool,
+        "mesh_size": solution.mesh_size,
+        "mesh_optimizer": solution.mesh_optimizer,
+        "mesh_options": solution.mesh_options,
+        "min_mesh_quality": solution.min_mesh_quality,
+        "min_hole_size": solution.min_hole_size,
+    }
+    mesh_json = json.dumps(mesh_data, cls=GeometryJsonEncoder, sort_keys=True)
+    return hashlib.sha256(mesh_json.encode()).hexdigest()
+
+
+def get_elmer_jobs(json_filenames, path: Path, workflow: dict, python_run_cmd: list[str]) -> dict:
+    """
+    Returns the dependency graph of the jobs that run the given simulations, for ``job_scheduler.py``.
+
+    Each mesh is produced by a Gmsh job and converted by an ElmerGrid job, which all simulations using the mesh wait
+    for. The sif files of a simulation are written when its mesh is ready, and each sif is solved in its own job. A
+    simulation restarting from a parent simulation is solved after the parent. Project results are written when all
+    sifs of the simulation are solved.
+
+    Args:
+        json_filenames: List of paths to json files of the simulations.
+        path: Location of the simulations, from where the commands are run.
+        workflow: Parameters for simulation workflow
+        python_run_cmd: Command for running the execution script, without the json file
+
+    Returns:
+        Dictionary with the CPU budget in ``cpus`` and a list of ``jobs``, each with a unique ``name``, a ``cmd`` to
+        run, a ``log`` file for its output, the number of ``cpus`` it uses, and the names of the jobs it runs ``after``.
+    """
+    n_solver_cpus = workflow.get("elmer_n_processes", 1) * workflow.get("elmer_n_threads", 1)
+    json_datas = []
+    for json_filename in json_filenames:
+        with open(json_filename, encoding="utf-8") as f:
+            json_datas.append((Path(json_filename).relative_to(path).as_posix(), json.load(f)))
+
+    # Interpolating frequency sweeps have no sif names and are solved in a single job
+    solve_jobs = {
+        d["name"]: {sif: f"{d['name']}:solve" + (f":{sif}" if sif else "") for sif in d["sif_names"] or [None]}
+        for _, d in json_datas
+    }
+
+    jobs = []
+    for json_file, json_data in json_datas:
+        name, mesh_name = json_data["name"], json_data["mesh_name"]
+        run_cmd = python_run_cmd + [json_file]
+
+        def add_job(job_name, args, log, cpus=1, after=(), run_cmd=run_cmd):
+            jobs.append({"name": job_name, "cmd": run_cmd + args, "log": log, "cpus": cpus, "after": list(after)})
+
+        if mesh_name == name:
+            add_job(f"{name}:gmsh", ["--only-gmsh"], f"log_files/{name}.Gmsh.log", workflow.get("gmsh_n_threads", 1))
+            add_job(
+                f"{name}:elmergrid", ["--only-elmergrid"], f"log_files/{name}.ElmerGrid.log", after=[f"{name}:gmsh"]
+            )
+        add_job(
+            f"{name}:sifs", ["--only-elmer-sifs"], f"log_files/{name}.Elmer_sifs.log", after=[f"{mesh_name}:elmergrid"]
+        )
+
+        parent_solves = list(solve_jobs.get(json_data.get("parent_name"), {}).values())
+        for sif, solve_job in solve_jobs[name].items():
+            add_job(
+                solve_job,
+                ["--only-elmer"] + (["--sif-names", sif] if sif else []),
+                f"log_files/{sif or name}.ElmerSolver.log",
+                n_solver_cpus,
+                after=[f"{name}:sifs"] + parent_solves,
+            )
+        results_after = list(solve_jobs[name].values())
+        if workflow.get("run_paraview", False):
+            add_job(f"{name}:paraview", ["--only-paraview"], f"log_files/{name}.Paraview.log", after=results_after)
+            results_after = [f"{name}:paraview"]
+        add_job(
+            f"{name}:results",
+            ["--write-project-results"],
+            f"log_files/{name}.write_project_results.log",
+            after=results_after,
+        )
+
+    return {"cpus": workflow.get("n_workers", 1) * n_solver_cpus, "jobs": jobs}
+
+
 def export_elmer_script(
     json_filenames,
     path: Path,
@@ -477,7 +586,8 @@ def export_elmer_script(
     else:  # local workflow
         n_workers = workflow.get("n_workers", 1)
         parallelization_level = workflow["_parallelization_level"]
-        parallelize_workload = parallelization_level == "full_simulation" and n_workers > 1
+        use_dag_scheduler = workflow.get("dag_scheduler", False)
+        parallelize_workload = parallelization_level == "full_simulation" and n_workers > 1 and not use_dag_scheduler
 
         main_script_lines = []
 
@@ -528,6 +638,8 @@ def export_elmer_script(
             _write_script(script_filename, script_lines)
 
             script_path = Path(script_filename).relative_to(path)
+            if use_dag_scheduler:
+                continue  # the job scheduler runs the parts of the simulation as separate jobs
             if parallelize_workload:
                 script_cmd = f"./{script_path}" if use_sh else f"{script_path}"
                 if mesh_name == simulation_name:
@@ -542,6 +654,13 @@ def export_elmer_script(
                     f"{script_cmd}\n",
                 ]
 
+        if use_dag_scheduler:
+            jobs_fname = f"{file_prefix}_jobs.json"
+            with open(path / jobs_fname, "w", encoding="utf-8") as f:
+                json.dump(get_elmer_jobs(json_filenames, path, workflow, [python_executable, str(execution_script)]), f)
+            run_cmd = Path(script_folder) / "job_scheduler.py"
+            main_script_lines.append(f"{python_executable} {run_cmd} {jobs_fname}\n")
+
         if parallelize_workload:
             if full_sims:
                 _prepare_workload_manager(main_script_lines, full_sims, suffix="simlist_independent")
@@ -561,12 +680,14 @@ def export_elmer_script(
 
 
 def export_elmer(
-    simulations: Sequence[
+    simulations: Iterable[
         Union[
             Simulation,
             Tuple[Simulation, ElmerSolution],
             CrossSectionSimulation,
             Tuple[CrossSectionSimulation, ElmerSolution],
+            SimulationHandle,
+            Tuple[SimulationHandle, ElmerSolution],
         ]
     ],
     path: Path,
@@ -576,13 +697,17 @@ def export_elmer(
     workflow: Optional[Dict] = None,
     skip_errors: bool = False,
     post_process: Optional[Union[PostProcess, Sequence[PostProcess]]] = None,
+    oas_writer: Optional[SimulationOasWriter] = None,
     **solution_params,
 ) -> Path:
     """
     Exports an elmer simulation model to the simulation path.
 
     Args:
-        simulations: List of Simulation objects or tuples containing Simulation and Solution objects.
+        simulations: List of Simulation objects or tuples containing Simulation and Solution objects. Simulation
+            handles returned by parallel simulation sweeps can be used in place of Simulation objects. A lazy
+            ``SimulationSweep`` is exported one simulation at a time, and each simulation is released after its
+            export. Other iterables that are not lists are first collected into a list.
         path: Location where to output the simulation model
         script_folder: Path to the Elmer-scripts folder.
         file_prefix: File prefix of the script file to be created.
@@ -595,22 +720,24 @@ def export_elmer(
                **Use this carefully**, some of your simulations might not make sense physically and
                you might end up wasting time on bad simulations.
         post_process: List of PostProcess objects, a single PostProcess object, or None to be executed after simulations
+        oas_writer: ``SimulationOasWriter`` into which each simulation is written before it is released, or None
         solution_params: ElmerSolution parameters if simulations is a list of Simulation objects.
 
     Returns:
         Path to exported script file.
     """
 
-    common_sol = None if all(isinstance(s, Sequence) for s in simulations) else get_elmer_solution(**solution_params)
+    if not isinstance(simulations, Sized) or len(simulations) == 1:
+        simulations = list(simulations)
+    all_tuples = isinstance(simulations, Sequence) and all(isinstance(s, Sequence) for s in simulations)
+    common_sol = None if all_tuples else get_elmer_solution(**solution_params)
+    if isinstance(simulations, SimulationSweep):
+        # check the parameters of the whole sweep before building any simulation geometry
+        validate_sweep(simulations.sim_class, simulations.parameter_sets, simulations.solutions or [common_sol])
 
     workflow = _update_elmer_workflow(simulations, common_sol, workflow)
 
-    # If doing 3D epr simulations the custom Elmer energy integration module is compiled at runtime
-    epr_sim = _is_epr_sim(simulations, common_sol)
-    script_paths = ELMER_SCRIPT_PATHS + [Path(SIM_SCRIPT_PATH) / "elmer_modules"] if epr_sim else ELMER_SCRIPT_PATHS
-
     write_commit_reference_file(path)
-    copy_content_into_directory(script_paths, path, script_folder)
 
     def make_names_elmer_compatible(sim, sol):
         """Replace dots with dashes and make lowercase"""
@@ -624,36 +751,28 @@ def export_elmer(
 
         return (sim, replace(sol, name=sol_name))
 
-    simulations = [
-        make_names_elmer_compatible(*(sim_sol if isinstance(sim_sol, Sequence) else (sim_sol, common_sol)))
-        for sim_sol in simulations
-    ]
-    sim_objects, sol_objects = list(zip(*simulations))
-
-    n_sim = len(simulations)
-    mesh_reuse_name = n_sim * [None]
-    for i in range(n_sim):
-        for j in range(i):
-            if (
-                sim_objects[i] == sim_objects[j]
-                and sol_objects[i].mesh_size == sol_objects[j].mesh_size
-                and sol_objects[i].mesh_optimizer == sol_objects[j].mesh_optimizer
-                and sol_objects[i].tool == sol_objects[j].tool
-            ):
-                mesh_reuse_name[i] = (
-                    mesh_reuse_name[j] if mesh_reuse_name[j] else (sim_objects[j].name + sol_objects[j].name)
-                )
-                break
-
-    if workflow["delete_meshes"] and any(mesh_reuse_name):
-        raise NotImplementedError('workflow["delete_meshes"] is not supported with Solution sweeps')
-
+    geometry_fingerprints = {}  # (simulation, fingerprint) tuples by simulation identity
+    mesh_names = {}  # names of the exported meshes by mesh fingerprint
+    mesh_users = {}  # names of the simulations using each mesh by mesh name
+    epr_sim = False
     json_filenames = []
-    for simulation, solution, mesh_reuse in zip(sim_objects, sol_objects, mesh_reuse_name):
+    for sim_sol in iter_and_release(simulations):
+        simulation, solution = make_names_elmer_compatible(
+            *(sim_sol if isinstance(sim_sol, Sequence) else (sim_sol, common_sol))
+        )
+        epr_sim = epr_sim or isinstance(solution, ElmerEPR3DSolution)
         validate_simulation(simulation, solution)
+        if oas_writer is not None:
+            oas_writer.write(simulation)
 
         try:
-            json_filenames.append(export_elmer_json(simulation, solution, path, workflow, mesh_reuse))
+            if id(simulation) not in geometry_fingerprints:
+                geometry_fingerprints[id(simulation)] = (simulation, get_geometry_fingerprint(simulation))
+            mesh_fingerprint = get_mesh_fingerprint(simulation, solution, geometry_fingerprints[id(simulation)][1])
+            mesh_reuse = mesh_names.get(mesh_fingerprint)
+            json_filenames.append(export_elmer_json(simulation, solution, path, workflow, mesh_reuse, mesh_fingerprint))
+            mesh_name = mesh_names.setdefault(mesh_fingerprint, simulation.name + solution.name)
+            mesh_users.setdefault(mesh_name, []).append(simulation.name + solution.name)
         except (IndexError, ValueError, Exception) as e:  # pylint: disable=broad-except
             if skip_errors:
                 logging.warning(
@@ -668,6 +787,15 @@ def export_elmer(
                     "geometry files."
                 ) from e
 
+    if workflow.get("delete_meshes", False):
+        # the last simulation to finish deletes the mesh
+        with open(path.joinpath("mesh_users.json"), "w", encoding="utf-8") as f:
+            json.dump(mesh_users, f, indent=4)
+
+    # If doing 3D epr simulations the custom Elmer energy integration module is compiled at runtime
+    script_paths = ELMER_SCRIPT_PATHS + [Path(SIM_SCRIPT_PATH) / "elmer_modules"] if epr_sim else ELMER_SCRIPT_PATHS
+    copy_content_into_directory(script_paths, path, script_folder)
+
     return export_elmer_script(
         json_filenames,
         path,
@@ -680,18 +808,6 @@ def export_elmer(
     )
 
 
-def _is_epr_sim(simulations, common_sol):
-    """Helper to check if doing 3D epr simulation"""
-    epr_sim = False
-    if common_sol is None:
-        if any(isinstance(simsol[1], ElmerEPR3DSolution) for simsol in simulations):
-            epr_sim = True
-    elif isinstance(common_sol, ElmerEPR3DSolution):
-        epr_sim = True
-
-    return epr_sim
-
-
 def _update_elmer_workflow(simulations, common_solution, workflow):
     """
     Modify workflow based on number of simulations and available computing resources
@@ -718,10 +834,14 @@ def _update_elmer_workflow(simulations, common_solution, workflow):
             parallelization_level = "elmer"
             n_worker_lim = len(sol_obj.frequency)
     elif num_sims > 1:
-        # TODO enable Elmer level parallelism with solution sweep
+        # TODO enable Elmer level parallelism with solution sweep without the DAG scheduler
         n_worker_lim = num_sims
         parallelization_level = "full_simulation"
 
+    if workflow.get("dag_scheduler", False) and "sbatch_parameters" not in workflow:
+        # The job scheduler solves each sif in its own job, so the number of simulations does not limit the workers
+        n_worker_lim = os.cpu_count()
+
     workflow["_parallelization_level"] = parallelization_level
     workflow["_n_simulations"] = n_worker_lim
 
@@ -63,6 +63,9 @@ class ElmerSolution(Solution):
             cause performance issues if set too high. The aim of the remeshing is to prevent fatal errors due
             to degenerate elements in Elmer. The default value of 5e-7 is determined experimentally and might need
             adjustment. Setting this to 0 disables the feature.
+        min_hole_size: Holes of layer polygons with width and height both smaller than this are filled when the
+            geometry is imported into Gmsh. Useful for ground grids whose holes are much smaller than the mesh elements
+            around them. The default value 0 keeps all holes.
 
         linear_system_method: Method for solving the FEM linear system of equations in Elmer. For iterative methods use
                 "GCR", "bicgstab" or any other iterative solver mentioned in ElmerSolver manual section 4.3.1.
@@ -104,6 +107,7 @@ class ElmerSolution(Solution):
     vtu_output: bool = True
     save_elmer_data: bool = False
     min_mesh_quality: float = 5e-7
+    min_hole_size: float = 0.0
 
     linear_system_method: str = "GCR"
     convergence_tolerance: float = 1.0e-9
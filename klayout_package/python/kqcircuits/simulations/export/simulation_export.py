@@ -18,16 +18,23 @@
 
 import logging
 import json
+import hashlib
 from itertools import product
+from multiprocessing import Pool, get_start_method
 from pathlib import Path
 from shutil import copytree
 from typing import Sequence
 from scipy.stats import qmc
 import numpy as np
 
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.simulation_handle import SimulationHandle
 from kqcircuits.util.load_save_layout import save_layout
 from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
 
+# simulation class and parameter sets of the parallel sweep, inherited by forked worker processes
+_sweep_tasks = []
+
 
 def get_combined_parameters(simulation, solution):
     """Return parameters of Simulation and Solution in a combined dictionary.
@@ -91,16 +98,135 @@ def export_simulation_json(json_data, json_file_path):
 def export_simulation_oas(simulations, path: Path, file_prefix="simulation"):
     """
     Write single OASIS file containing all simulations in list.
+
+    The simulations may be on different layouts. See ``SimulationOasWriter``.
+    """
+    writer = SimulationOasWriter(path.joinpath(file_prefix + ".oas"))
+    for simulation in simulations:
+        writer.write(simulation[0] if isinstance(simulation, Sequence) else simulation)
+    return writer.close()
+
+
+class SimulationOasWriter:
+    """Collects simulation cells one at a time into a single compressed OASIS file.
+
+    Each written simulation cell is copied with its subcells into a layout owned by the writer, so the simulation can
+    be released right after writing. Subcells with identical content, such as the same element in every simulation of
+    a sweep, are stored only once. The file is written with CBLOCK compression when the writer is closed.
+
+    A writer can be given to ``export_elmer`` or ``export_ansys`` as ``oas_writer`` to write the batch OASIS file of a
+    lazy sweep while the sweep is exported.
+
+    Typical usage::
+
+        with SimulationOasWriter(dir_path / "simulation.oas") as writer:
+            sweep = cross_sweep_simulation(layout, SimClass, params, sweeps, lazy=True)
+            export_elmer(sweep, dir_path, oas_writer=writer)
     """
-    simulations = [simulation[0] if isinstance(simulation, Sequence) else simulation for simulation in simulations]
-    unique_layouts = {simulation.layout for simulation in simulations}
-    if len(unique_layouts) != 1:
-        raise ValueError("Cannot write batch OASIS file since not all simulations are on the same layout.")
 
-    cells = [simulation.cell for simulation in simulations]
-    oas_filename = str(path.joinpath(file_prefix + ".oas"))
-    save_layout(oas_filename, simulations[0].layout, cells, no_empty_cells=True)
-    return oas_filename
+    def __init__(self, filename, layers=None):
+        """
+        Args:
+            filename: name of the OASIS file to write
+            layers: list of ``pya.LayerInfo`` to write, or None to write all layers
+        """
+        self.filename = str(filename)
+        self.layers = None if layers is None else {(l.layer, l.datatype) for l in layers}
+        self.layout = None
+        self._names = set()
+        self._cells_by_content = {}  # index of a copied subcell by hash of its content
+
+    def write(self, simulation):
+        """Copies the cell of the simulation into the writer. A simulation with an already written name is skipped."""
+        if simulation.name in self._names:
+            return
+        source_layout = simulation.layout
+        if self.layout is None:
+            self.layout = pya.Layout()
+            self.layout.dbu = source_layout.dbu
+        elif self.layout.dbu != source_layout.dbu:
+            raise ValueError("Cannot write batch OASIS file since simulations have different database units.")
+
+        layers = []
+        for layer_index in source_layout.layer_indexes():
+            info = source_layout.get_info(layer_index)
+            if self.layers is None or (info.layer, info.datatype) in self.layers:
+                layers.append((layer_index, self.layout.layer(info)))
+        self._copy_cell(simulation.cell, layers, {}, is_top=True)
+        self._names.add(simulation.name)
+
+    def _copy_cell(self, cell, layers, copied, is_top=False):
+        """Returns the index of a copy of ``cell`` in the writer layout, reusing an identical copy for subcells.
+
+        Args:
+            cell: the cell to copy
+            layers: list of (source layer index, target layer index) tuples
+            copied: target cell indices by source cell index, of the cells copied during this write
+            is_top: True for the simulation cell, which is always copied under its own name
+        """
+        if cell.cell_index() in copied:
+            return copied[cell.cell_index()]
+        source_layout = cell.layout()
+        instances = []
+        for inst in cell.each_inst():
+            cell_inst = inst.cell_inst.dup()
+            cell_inst.cell_index = self._copy_cell(source_layout.cell(inst.cell_index), layers, copied)
+            instances.append(cell_inst)
+        shapes = [(target, cell.shapes(source)) for source, target in layers if not cell.shapes(source).is_empty()]
+
+        content_hash = None
+        if not is_top:
+            digest = hashlib.sha256()
+            for target, layer_shapes in shapes:
+                digest.update(f"layer {target}\n".encode())
+                digest.update("\n".join(str(shape) for shape in layer_shapes.each()).encode())
+            digest.update("\n".join(str(cell_inst) for cell_inst in instances).encode())
+            content_hash = digest.hexdigest()
+            if content_hash in self._cells_by_content:
+                copied[cell.cell_index()] = self._cells_by_content[content_hash]
+                return copied[cell.cell_index()]
+
+        target_cell = self.layout.create_cell(cell.name)
+        for target, layer_shapes in shapes:
+            target_cell.shapes(target).insert(layer_shapes)
+        for cell_inst in instances:
+            target_cell.insert(cell_inst)
+        if content_hash is not None:
+            self._cells_by_content[content_hash] = target_cell.cell_index()
+        copied[cell.cell_index()] = target_cell.cell_index()
+        return target_cell.cell_index()
+
+    def close(self):
+        """Writes the OASIS file and returns its name."""
+        if self.layout is not None:
+            save_layout(
+                self.filename, self.layout, no_empty_cells=True, oasis_write_cblocks=True, oasis_compression_level=10
+            )
+            self.layout = None
+            self._cells_by_content = {}
+        return self.filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_geometry_fingerprint(simulation):
+    """Returns a hash of the simulation layer shapes that does not depend on the name of the simulation.
+
+    The hash of a ``SimulationHandle`` is computed by the process that built the simulation.
+    """
+    if isinstance(simulation, SimulationHandle) and simulation.geometry_fingerprint is not None:
+        return simulation.geometry_fingerprint
+    layout, cell = simulation.layout, simulation.cell
+    digest = hashlib.sha256(f"dbu {layout.dbu}".encode())
+    for layer_info in sorted(simulation.get_layers(), key=lambda l: (l.layer, l.datatype)):
+        region = pya.Region(cell.begin_shapes_rec(layout.layer(layer_info))).merged()
+        digest.update(f"layer {layer_info.layer}/{layer_info.datatype}\n".encode())
+        digest.update("\n".join(sorted(str(polygon) for polygon in region.each())).encode())
+    return digest.hexdigest()
 
 
 def _join_flat_str(value):
@@ -115,35 +241,155 @@ def _join_flat_str(value):
         return str(value)  # convert any non-iterable to string
 
 
-def sweep_simulation(layout, sim_class, sim_parameters, sweeps):
-    """Create simulation sweep by varying one parameter at time. Return list of simulations."""
-    simulations = []
+class SimulationSweep:
+    """Sweep of simulations that are built one at a time while the sweep is iterated.
+
+    Only the parameters of the simulations are stored, so iterating the sweep into ``export_elmer`` or ``export_ansys``
+    keeps at most one simulation in memory at a time. The exported simulations are released by deleting their cells.
+
+    If ``processes > 1``, the simulations are built in worker processes, each on a layout of its own, and their cells
+    are saved into OASIS files in ``path``. Then the sweep yields ``SimulationHandle`` objects instead of simulations.
+    """
+
+    def __init__(self, layout, sim_class, parameter_sets, processes=1, path=None, solutions=None):
+        """
+        Args:
+            layout: layout for the simulations, or None for solution classes
+            sim_class: simulation class
+            parameter_sets: list of parameter dictionaries, one for each simulation
+            processes: number of parallel processes to build the simulations in
+            path: location where to save the simulation cells if ``processes > 1``
+            solutions: list of solutions to combine with each simulation, see ``cross_combine``
+        """
+        if processes > 1 and path is None:
+            raise ValueError("Parallel simulation sweep needs `path` where to save the simulation cells.")
+        self.layout = layout
+        self.sim_class = sim_class
+        self.parameter_sets = parameter_sets
+        self.processes = processes
+        self.path = path
+        self.solutions = solutions
+
+    def __len__(self):
+        return len(self.parameter_sets) * (1 if self.solutions is None else len(self.solutions))
+
+    def __iter__(self):
+        simulations = self._iter_simulations() if self.processes <= 1 else self._iter_simulation_handles()
+        for simulation in simulations:
+            if self.solutions is None:
+                yield simulation
+            else:
+                yield from ((simulation, solution) for solution in self.solutions)
+
+    def _iter_simulations(self):
+        for parameters in self.parameter_sets:
+            yield self.sim_class(**parameters) if self.layout is None else self.sim_class(self.layout, **parameters)
+
+    def _iter_simulation_handles(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        # the workers build each simulation on a layout of their own if the sweep has a layout, like _iter_simulations
+        with_layout = self.layout is not None
+        tasks = [(self.sim_class, parameters, with_layout, self.path) for parameters in self.parameter_sets]
+        if get_start_method() == "fork":
+            # forked workers inherit the tasks, so that the simulation class and parameters need not be pickled
+            _sweep_tasks[:] = tasks
+            tasks = range(len(tasks))
+        try:
+            with Pool(min(self.processes, len(self.parameter_sets))) as pool:
+                for state in pool.imap(_save_sweep_simulation, tasks):
+                    yield SimulationHandle.load(self.sim_class, state)
+        finally:
+            _sweep_tasks.clear()
+
+
+def _save_sweep_simulation(task):
+    """Builds a simulation of the parallel sweep and saves it. Returns the handle data of the simulation."""
+    sim_class, parameters, with_layout, path = _sweep_tasks[task] if isinstance(task, int) else task
+    simulation = sim_class(pya.Layout(), **parameters) if with_layout else sim_class(**parameters)
+    return SimulationHandle.save_simulation(simulation, path, get_geometry_fingerprint(simulation))
+
+
+def _create_simulations(layout, sim_class, parameter_sets, processes, path, lazy):
+    """Returns ``SimulationSweep`` if ``lazy`` is True and otherwise list of the simulations built by it."""
+    sweep = SimulationSweep(layout, sim_class, parameter_sets, processes, path)
+    return sweep if lazy else list(sweep)
+
+
+def release_simulation(simulation):
+    """Frees the memory of an exported simulation by deleting its cell and the subcells not used by other cells.
+
+    A ``SimulationHandle`` only drops its loaded layout, which is loaded again if needed.
+    """
+    if isinstance(simulation, SimulationHandle):
+        simulation.release()
+    elif simulation.cell is not None:
+        simulation.cell.prune_cell()
+        simulation.cell = None
+
+
+def iter_and_release(simulations):
+    """Yields the items of ``simulations`` and releases each simulation once the next item has another simulation.
+
+    Simulations given in a ``Sequence`` are not released, since the caller may use them after export. Lazy sweeps like
+    ``SimulationSweep`` yield all items of a simulation consecutively, so each simulation is released after its export.
+
+    Args:
+        simulations: iterable of simulations or tuples of simulation and solution
+    """
+    if isinstance(simulations, Sequence):
+        yield from simulations
+        return
+    previous = None
+    for sim_sol in simulations:
+        simulation = sim_sol[0] if isinstance(sim_sol, Sequence) else sim_sol
+        if previous is not None and simulation is not previous:
+            release_simulation(previous)
+        previous = simulation
+        yield sim_sol
+    if previous is not None:
+        release_simulation(previous)
+
+
+def sweep_simulation(layout, sim_class, sim_parameters, sweeps, processes=1, path=None, lazy=False):
+    """Create simulation sweep by varying one parameter at time. Return list of simulations.
+
+    The simulations are built in ``processes`` parallel processes if ``processes > 1``. Then the simulation cells are
+    saved into ``path``, and list of ``SimulationHandle`` objects is returned, which can be exported like simulations.
+    If ``lazy`` is True, a ``SimulationSweep`` is returned, which builds the simulations only when it is iterated.
+    """
     lengths = [len(l) for l in sweeps.values()]
     logging.info(f'Added simulations: {" + ".join([str(l) for l in lengths])} = {sum(lengths)}')
+    parameter_sets = []
     for param in sweeps:
         for value in sweeps[param]:
-            parameters = {
-                **sim_parameters,
-                param: value,
-                "name": _join_flat_str((sim_parameters.get("name", ""), param, value)),
-            }
-            simulations.append(sim_class(**parameters) if layout is None else sim_class(layout, **parameters))
-    return simulations
-
-
-def cross_sweep_simulation(layout, sim_class, sim_parameters, sweeps):
-    """Create simulation sweep by cross-varying all parameters. Return list of simulations."""
-    simulations = []
+            parameter_sets.append(
+                {
+                    **sim_parameters,
+                    param: value,
+                    "name": _join_flat_str((sim_parameters.get("name", ""), param, value)),
+                }
+            )
+    return _create_simulations(layout, sim_class, parameter_sets, processes, path, lazy)
+
+
+def cross_sweep_simulation(layout, sim_class, sim_parameters, sweeps, processes=1, path=None, lazy=False):
+    """Create simulation sweep by cross-varying all parameters. Return list of simulations.
+
+    The simulations are built in ``processes`` parallel processes if ``processes > 1``. Then the simulation cells are
+    saved into ``path``, and list of ``SimulationHandle`` objects is returned, which can be exported like simulations.
+    If ``lazy`` is True, a ``SimulationSweep`` is returned, which builds the simulations only when it is iterated.
+    """
     keys = list(sweeps)
     sets = [list(prod) for prod in product(*sweeps.values())]
     logging.info(f'Added simulations: {" * ".join([str(len(l)) for l in sweeps.values()])} = {len(sets)}')
+    parameter_sets = []
     for values in sets:
         parameters = {**sim_parameters}
         for i, key in enumerate(keys):
             parameters[key] = values[i]
         parameters["name"] = _join_flat_str((sim_parameters.get("name", ""), values))
-        simulations.append(sim_class(**parameters) if layout is None else sim_class(layout, **parameters))
-    return simulations
+        parameter_sets.append(parameters)
+    return _create_simulations(layout, sim_class, parameter_sets, processes, path, lazy)
 
 
 def sweep_solution(sol_class, sol_parameters, sweeps):
@@ -160,12 +406,22 @@ def cross_combine(simulations, solutions):
     """Combines simulations and solutions into list of tuples.
 
     Args:
-        simulations: A Simulation object or a list of Simulation objects.
+        simulations: A Simulation object, a list of Simulation objects, or a ``SimulationSweep``.
         solutions: A Solution object or a list of Solution objects.
     Returns:
-        A list of tuples containing all combinations of simulations and solutions.
+        A list of tuples containing all combinations of simulations and solutions. For a ``SimulationSweep``, returns
+        a ``SimulationSweep`` that yields the tuples lazily.
 
     """
+    if isinstance(simulations, SimulationSweep):
+        return SimulationSweep(
+            simulations.layout,
+            simulations.sim_class,
+            simulations.parameter_sets,
+            simulations.processes,
+            simulations.path,
+            solutions if isinstance(solutions, Sequence) else [solutions],
+        )
     return list(
         product(
             simulations if isinstance(simulations, Sequence) else [simulations],
@@ -175,11 +431,16 @@ def cross_combine(simulations, solutions):
 
 
 def unique_rows(a):
+    """Returns the distinct rows of a 2D array. Object arrays of numbers are compared as floats in NumPy."""
     if np.issubdtype(a.dtype, np.number):
         return np.unique(a, axis=0)
-    else:
-        # Object arrays
+    try:
+        numeric = a.astype(float)
+    except (TypeError, ValueError):
+        # Object arrays of other values
         return np.array(list({tuple(row) for row in a}), dtype=object)
+    _, index = np.unique(numeric, axis=0, return_index=True)
+    return a[np.sort(index)]
 
 
 def latin_hypercube_sampling(l_bounds, u_bounds, n, integers=True, add_edges=False, remove_duplicates=True):
@@ -251,7 +512,7 @@ def latin_hypercube_sampling_mixed_dtypes(
     return samples
 
 
-def combine_sweep_simulation(layout, sim_class, sim_parameters, keys, samples):
+def combine_sweep_simulation(layout, sim_class, sim_parameters, keys, samples, processes=1, path=None, lazy=False):
     """Creates a simulation sweep from created samples. Returns a list of simulations.
     Args:
         layout: Layout for simulation
@@ -259,15 +520,18 @@ def combine_sweep_simulation(layout, sim_class, sim_parameters, keys, samples):
         sim_parameters: Simulation parameters which are not in the sweep
         keys: List of parameter names corresponding to samples
         samples: List of samples for sweep parameters
+        processes: Number of parallel processes to build the simulations in
+        path: Location where to save the simulation cells if ``processes > 1``
+        lazy: Return a ``SimulationSweep`` that builds the simulations only when it is iterated
     Returns:
-        A list of simulations
+        A list of simulations, or a list of ``SimulationHandle`` objects if ``processes > 1``
     """
     assert len(samples[0]) == len(keys), "Samples don't have same dimension as keys"
-    simulations = []
+    parameter_sets = []
     for values in samples:
         parameters = {**sim_parameters}
         for i, key in enumerate(keys):
             parameters[key] = values[i]
         parameters["name"] = _join_flat_str((sim_parameters.get("name", ""), values))
-        simulations.append(sim_class(**parameters) if layout is None else sim_class(layout, **parameters))
-    return simulations
+        parameter_sets.append(parameters)
+    return _create_simulations(layout, sim_class, parameter_sets, processes, path, lazy)
@@ -0,0 +1,145 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+from pathlib import Path
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.simulation import Simulation
+from kqcircuits.simulations.partition_region import PartitionRegion
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder, GeometryJsonDecoder
+from kqcircuits.util.load_save_layout import load_layout, save_layout
+
+
+class SimulationHandle:
+    """Lightweight stand-in for a simulation that was built and saved in another process.
+
+    The handle holds the parameters and simulation data of the simulation, and the simulation cell is stored in an
+    OASIS file. The handle can be given to ``export_elmer`` and ``export_ansys`` in place of the simulation object, so
+    that the simulation geometry is not built again. The OASIS file is loaded into a layout of its own only when
+    ``layout`` or ``cell`` is accessed.
+
+    Other simulation parameters are available as attributes of the handle.
+    """
+
+    def __init__(
+        self,
+        sim_class,
+        name,
+        parameters,
+        simulation_data,
+        oas_file,
+        port_types=(),
+        partition_region_names=(),
+        geometry_fingerprint=None,
+    ):
+        """
+        Args:
+            sim_class: class of the simulation
+            name: name of the simulation
+            parameters: simulation parameters as returned by ``get_parameters``
+            simulation_data: simulation data as returned by ``get_simulation_data``
+            oas_file: path to OASIS file containing the simulation cell as the only top cell
+            port_types: class names of the simulation ports
+            partition_region_names: names of the partition regions of the simulation
+            geometry_fingerprint: hash of the simulation geometry, see ``get_geometry_fingerprint``
+        """
+        self.sim_class = sim_class
+        self.name = name
+        self.parameters = parameters
+        self.simulation_data = simulation_data
+        self.oas_file = oas_file
+        self.port_types = list(port_types)
+        self.partition_region_names = list(partition_region_names)
+        self.geometry_fingerprint = geometry_fingerprint
+        self._layout = None
+
+    @classmethod
+    def save_simulation(cls, simulation, path: Path, geometry_fingerprint=None):
+        """Saves simulation cell into an OASIS file in ``path`` and returns the data of its handle as a string.
+
+        The returned string is passed to ``SimulationHandle.load`` in the process that uses the handle.
+        """
+        oas_file = str(path.joinpath(simulation.name + ".oas"))
+        save_layout(oas_file, simulation.layout, [simulation.cell], simulation.get_layers(), no_empty_cells=True)
+        state = {
+            "name": simulation.name,
+            "parameters": simulation.get_parameters(),
+            "simulation_data": simulation.get_simulation_data(),
+            "oas_file": oas_file,
+            "port_types": [type(port).__name__ for port in getattr(simulation, "ports", [])],
+            "partition_region_names": (
+                [p.name for p in simulation.get_partition_regions()] if isinstance(simulation, Simulation) else []
+            ),
+            "geometry_fingerprint": geometry_fingerprint,
+        }
+        return json.dumps(state, cls=GeometryJsonEncoder)
+
+    @classmethod
+    def load(cls, sim_class, state):
+        """Returns handle of class ``sim_class`` simulation from a string returned by ``save_simulation``."""
+        return cls(sim_class, **json.loads(state, cls=GeometryJsonDecoder))
+
+    def __getattr__(self, name):
+        parameters = self.__dict__.get("parameters", {})
+        if name in parameters:
+            return parameters[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def layout(self):
+        """Layout into which the simulation cell is loaded on first access."""
+        if self._layout is None:
+            self._layout = pya.Layout()
+            load_layout(self.oas_file, self._layout)
+        return self._layout
+
+    def release(self):
+        """Drops the loaded layout to free its memory."""
+        self._layout = None
+
+    @property
+    def cell(self):
+        return self.layout.top_cell()
+
+    @property
+    def layers(self):
+        return self.simulation_data["layers"]
+
+    get_layers = Simulation.get_layers
+    is_metal = Simulation.is_metal
+
+    def get_parameters(self):
+        """Return dictionary with all parameters and their values."""
+        return self.parameters
+
+    def get_simulation_data(self):
+        """Return the simulation data in dictionary form."""
+        return {**self.simulation_data, "simulation_name": self.name}
+
+    def get_material_dict(self):
+        """Return material_dict as dictionary."""
+        return self.simulation_data["material_dict"]
+
+    def get_partition_regions(self):
+        """Returns partition regions of the simulation. Only the names of the partition regions are preserved."""
+        return [PartitionRegion(name=name) for name in self.partition_region_names]
+
+    def is_subclass_of(self, cls):
+        """Returns True if the simulation class of the handle is ``cls`` or its subclass."""
+        return issubclass(self.sim_class, cls)
@@ -15,10 +15,12 @@
 # (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
 # Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
 # and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+import ast
 import logging
 
 from kqcircuits.simulations.simulation import Simulation
 from kqcircuits.simulations.cross_section_simulation import CrossSectionSimulation
+from kqcircuits.simulations.export.simulation_handle import SimulationHandle
 from kqcircuits.simulations.export.ansys.ansys_solution import (
     AnsysEigenmodeSolution,
     AnsysCurrentSolution,
@@ -51,7 +53,7 @@ def validate_simulation(simulation, solution):
     check_elmer_solver_options(solution)
 
     # Run these checks only for 3D simulations
-    if isinstance(simulation, Simulation):
+    if is_3d_simulation(simulation):
         has_no_ports_when_required(simulation, solution)
         has_edgeport_when_forbidden(simulation, solution)
         check_partition_region_naming(simulation, solution)
@@ -59,6 +61,59 @@ def validate_simulation(simulation, solution):
         check_tls_sheets_by_solution(simulation, solution)
 
 
+def validate_simulation_parameters(simulation, solution):
+    """Runs the checks of ``validate_simulation`` that depend only on the simulation parameters.
+
+    The checks of ports, layers and partition regions computed in ``build`` are skipped, so the simulation can be a
+    ``SimulationParameters`` object of a simulation that is not built yet.
+
+    Args:
+        simulation: A Simulation object, a simulation handle or a SimulationParameters object.
+        solution: A Solution object.
+    Raises:
+        Errors when validation criteria are not met.
+    """
+    simulation_and_solution_types_match(simulation, solution)
+    london_penetration_depth_with_ansys(simulation, solution)
+
+    check_elmer_solver_options(solution)
+
+    if is_3d_simulation(simulation):
+        if not isinstance(simulation, SimulationParameters) or simulation.has_parameter_partition_regions():
+            check_partition_region_naming(simulation, solution)
+        check_tls_sheet_generation(simulation)
+        check_tls_sheets_by_solution(simulation, solution)
+
+
+def validate_sweep(sim_class, parameter_sets, solutions):
+    """Validates every combination of simulation parameters and solutions before any simulation geometry is built.
+
+    Runs the checks of ``validate_simulation_parameters`` for the whole sweep and reports all failures at once. The
+    checks take no geometry work, so even large sweeps are validated in a fraction of a second.
+
+    Args:
+        sim_class: The simulation class.
+        parameter_sets: List of parameter dictionaries, one for each simulation.
+        solutions: List of Solution objects, each combined with every parameter set.
+    Raises:
+        ValidateSimError listing all failed simulation and solution combinations.
+    """
+    failures = []
+    for parameters in parameter_sets:
+        simulation = SimulationParameters(sim_class, parameters)
+        for solution in solutions:
+            try:
+                validate_simulation_parameters(simulation, solution)
+            except ValidateSimError as e:
+                failures.append(f"{simulation.name} with {type(solution).__name__}: {e}")
+    if failures:
+        raise ValidateSimError(
+            f"{len(failures)} simulation and solution combinations of the sweep failed validation:\n"
+            + "\n".join(failures),
+            validation_type=validate_sweep.__name__,
+        )
+
+
 def simulation_and_solution_types_match(simulation, solution):
     """Validation check: ensures that a simulation and solution types match.
     Args:
@@ -67,7 +122,7 @@ def simulation_and_solution_types_match(simulation, solution):
     Raises:
         Errors when validation criteria are not met.
     """
-    if isinstance(simulation, CrossSectionSimulation) != isinstance(
+    if is_cross_section_simulation(simulation) != isinstance(
         solution, (ElmerCrossSectionSolution, AnsysCrossSectionSolution)
     ):
         raise ValidateSimError(
@@ -284,6 +339,20 @@ def recursive_all(l, condition):
         return all((recursive_all(e, condition) for e in l))
 
 
+def is_3d_simulation(simulation):
+    """Returns True if simulation is a Simulation object, a handle of one or its parameters."""
+    if isinstance(simulation, (SimulationHandle, SimulationParameters)):
+        return simulation.is_subclass_of(Simulation)
+    return isinstance(simulation, Simulation)
+
+
+def is_cross_section_simulation(simulation):
+    """Returns True if simulation is a CrossSectionSimulation object, a handle of one or its parameters."""
+    if isinstance(simulation, (SimulationHandle, SimulationParameters)):
+        return simulation.is_subclass_of(CrossSectionSimulation)
+    return isinstance(simulation, CrossSectionSimulation)
+
+
 def get_port_names(simulation):
     """Helper function that returns a list of port names in a Simulation object.
     Args:
@@ -291,6 +360,8 @@ def get_port_names(simulation):
     Returns:
         port_names: A list of names related to the ports present in simulation.
     """
+    if isinstance(simulation, SimulationHandle):
+        return list(simulation.port_types)
     port_list = simulation.ports if isinstance(simulation, Simulation) else []
     port_names = []
     for port in port_list:
@@ -298,6 +369,39 @@ def get_port_names(simulation):
     return port_names
 
 
+class SimulationParameters:
+    """Parameters of a simulation that is not built yet, used in place of the simulation in validation.
+
+    Every parameter in the schema of the simulation class is an attribute, with its default value unless given.
+    """
+
+    def __init__(self, sim_class, parameters):
+        """
+        Args:
+            sim_class: The simulation class.
+            parameters: Dictionary of simulation parameters.
+        """
+        self.sim_class = sim_class
+        for name, param in sim_class.get_schema().items():
+            setattr(self, name, parameters.get(name, param.default))
+
+    def get_material_dict(self):
+        """Return material_dict as dictionary."""
+        return ast.literal_eval(self.material_dict) if isinstance(self.material_dict, str) else self.material_dict
+
+    def get_partition_regions(self):
+        """Returns partition regions given as the ``partition_regions`` parameter."""
+        return Simulation.get_partition_regions(self)
+
+    def has_parameter_partition_regions(self):
+        """Returns True if the simulation class takes its partition regions from parameters only."""
+        return self.sim_class.get_partition_regions is Simulation.get_partition_regions
+
+    def is_subclass_of(self, cls):
+        """Returns True if the simulation class is ``cls`` or its subclass."""
+        return issubclass(self.sim_class, cls)
+
+
 class ValidateSimError(Exception):
     """Custom exception class for specific error handling."""
 
@@ -0,0 +1,211 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+"""Planning of sampled parameter sweeps.
+
+A ``SweepPlanner`` generates space-filling Latin hypercube designs over mixed integer, float and categorical
+parameters, and proposes further samples where the finished results vary the most. The samples are lists of parameter
+values in the order of ``SweepPlanner.keys``, so they can be given directly to ``combine_sweep_simulation``.
+
+Typical usage::
+
+    planner = SweepPlanner([SweepParameter("finger_length", 0, 100), SweepParameter("finger_number", 2, 8, True)])
+    samples = planner.initial_samples(50, add_edges=True)
+    simulations = combine_sweep_simulation(layout, SimClass, sim_parameters, planner.keys, samples)
+    ...  # run the simulations and collect one result per sample
+    more_samples = planner.next_samples(20, samples, results)
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SweepParameter:
+    """A swept simulation parameter.
+
+    Args:
+        name: Name of the simulation parameter
+        lower: Lower bound of a numeric parameter
+        upper: Upper bound of a numeric parameter
+        integer: Sample only integers between the bounds, including both bounds
+        choices: Values of a categorical parameter. If given, the bounds are ignored.
+    """
+
+    name: str
+    lower: float = 0.0
+    upper: float = 1.0
+    integer: bool = False
+    choices: Sequence[Any] = ()
+
+    @property
+    def is_categorical(self):
+        return len(self.choices) > 0
+
+    def codes_from_unit(self, unit):
+        """Maps values in [0, 1) into codes, which are choice indices of categorical parameters and values otherwise."""
+        if self.is_categorical:
+            return np.minimum(np.floor(unit * len(self.choices)), len(self.choices) - 1)
+        if self.integer:
+            return np.minimum(np.floor(self.lower + unit * (self.upper - self.lower + 1)), self.upper)
+        return self.lower + unit * (self.upper - self.lower)
+
+    def edge_codes(self):
+        """Returns codes of the bounds, or of all choices of a categorical parameter."""
+        return list(range(len(self.choices))) if self.is_categorical else [self.lower, self.upper]
+
+    def scale(self):
+        """Returns the range of the codes used to normalize distances."""
+        return 1.0 if self.is_categorical else max(self.upper - self.lower, 1e-300)
+
+    def value(self, code):
+        if self.is_categorical:
+            return self.choices[int(code)]
+        return int(code) if self.integer else float(code)
+
+    def code(self, value):
+        return self.choices.index(value) if self.is_categorical else float(value)
+
+
+class SweepPlanner:
+    """Plans samples of a parameter space in batches.
+
+    Samples are handled internally as float arrays of codes, see ``SweepParameter.codes_from_unit``. Every sample
+    proposed by the planner is remembered, so that later batches never repeat an earlier sample.
+
+    Args:
+        parameters: List of ``SweepParameter`` objects
+        seed: Seed of the random number generator, for reproducible designs
+    """
+
+    def __init__(self, parameters: Sequence[SweepParameter], seed=None):
+        self.parameters = list(parameters)
+        self.rng = np.random.default_rng(seed)
+        self._planned = np.empty((0, len(self.parameters)))
+        self._categorical = np.array([p.is_categorical for p in self.parameters], dtype=bool)
+        self._scales = np.array([p.scale() for p in self.parameters])
+
+    @property
+    def keys(self):
+        """Parameter names in the order of the sample values."""
+        return [p.name for p in self.parameters]
+
+    def initial_samples(self, n: int, add_edges: bool = False) -> list[list]:
+        """Returns a Latin hypercube design of at most ``n`` distinct samples.
+
+        Args:
+            n: Number of samples in the design. Duplicates, possible with integer and categorical parameters, are
+                removed.
+            add_edges: Also add the corners of the parameter space. Categorical parameters take all their choices.
+        """
+        codes = self._latin_hypercube(n)
+        if add_edges:
+            edges = np.array(list(product(*(p.edge_codes() for p in self.parameters))), dtype=float)
+            codes = np.vstack((codes, edges))
+        return self._rows(self._plan(codes))
+
+    def next_samples(
+        self,
+        n: int,
+        samples: Sequence[Sequence],
+        results: Sequence,
+        n_candidates: int | None = None,
+        exploration: float = 0.1,
+    ) -> list[list]:
+        """Proposes at most ``n`` new samples based on finished results.
+
+        Candidates are drawn from a Latin hypercube. The local variation of a candidate is the largest difference
+        between the results of its nearest finished samples. Candidates are scored by their distance to the nearest
+        already-chosen sample, weighted by the local variation plus ``exploration``.
+        The best candidates are chosen one at a time, so that a batch also spreads out.
+
+        Args:
+            n: Number of new samples
+            samples: Finished samples, as lists of values in the order of ``keys``
+            results: One result per sample. A result can be a number or a list or array of numbers, like a capacitance
+                matrix.
+            n_candidates: Number of candidate samples to choose from. Default is ``50 * n``.
+            exploration: Weight of pure space filling compared to the refinement of varying regions
+        """
+        x = np.array([[p.code(v) for p, v in zip(self.parameters, sample)] for sample in samples], dtype=float)
+        y = np.asarray(results, dtype=float).reshape(len(x), -1)
+        std = y.std(axis=0)
+        y = y / np.where(std > 0, std, 1.0)
+
+        self._planned = self._unique(np.vstack((self._planned, x)))
+        candidates = self._new(self._unique(self._latin_hypercube(n_candidates or 50 * n)))
+        if len(candidates) == 0:
+            return []
+
+        # variation of results among the nearest finished samples of each candidate
+        k = min(len(self.parameters) + 1, len(x))
+        neighbours = y[np.argpartition(self._distances(candidates, x), k - 1, axis=1)[:, :k]]
+        variation = np.linalg.norm(neighbours[:, :, None, :] - neighbours[:, None, :, :], axis=3).max(axis=(1, 2))
+        if variation.max() > 0:
+            variation /= variation.max()
+        weights = exploration + variation
+        nearest = np.min(self._distances(candidates, self._planned), axis=1)
+
+        chosen = []
+        for _ in range(n):
+            scores = nearest * weights
+            best = int(np.argmax(scores))
+            if scores[best] <= 0:
+                break
+            chosen.append(best)
+            nearest = np.minimum(nearest, self._distances(candidates, candidates[best : best + 1])[:, 0])
+        return self._rows(self._plan(candidates[chosen]))
+
+    def _latin_hypercube(self, n):
+        """Returns codes of ``n`` samples with exactly one sample in each of the ``n`` strata of every parameter."""
+        d = len(self.parameters)
+        strata = self.rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T
+        unit = (strata + self.rng.random((n, d))) / n
+        return np.column_stack([p.codes_from_unit(unit[:, i]) for i, p in enumerate(self.parameters)])
+
+    def _distances(self, a, b):
+        """Returns the matrix of normalized distances between the rows of code arrays ``a`` and ``b``."""
+        diff = np.abs(a[:, None, :] - b[None, :, :]) / self._scales
+        diff[:, :, self._categorical] = diff[:, :, self._categorical] > 0
+        return np.sqrt(np.sum(diff**2, axis=2))
+
+    @staticmethod
+    def _unique(codes):
+        """Returns the distinct rows of ``codes`` in the order of their first occurrence."""
+        _, index = np.unique(codes, axis=0, return_index=True)
+        return codes[np.sort(index)]
+
+    def _new(self, codes):
+        """Returns the rows of ``codes`` that have not been planned before."""
+        if len(self._planned) == 0 or len(codes) == 0:
+            return codes
+        _, index, counts = np.unique(np.vstack((self._planned, codes)), axis=0, return_index=True, return_counts=True)
+        new_index = np.sort(index[(counts == 1) & (index >= len(self._planned))])
+        return codes[new_index - len(self._planned)]
+
+    def _plan(self, codes):
+        """Removes duplicates and earlier samples from ``codes`` and remembers the rest as planned."""
+        codes = self._new(self._unique(codes))
+        self._planned = np.vstack((self._planned, codes))
+        return codes
+
+    def _rows(self, codes):
+        return [[p.value(code) for p, code in zip(self.parameters, row)] for row in codes]
@@ -0,0 +1,169 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+"""Persistent on-disk cache for the geometry of simulations.
+
+Building a simulation runs ``build``, ``create_simulation_layers`` and ``produce_layers``, which dominate the time
+of large sweeps. A ``GeometryCache`` given to the simulation as ``geometry_cache`` keyword argument stores the
+resulting cell as an OASIS file and the layer dictionary, ports and refpoints as JSON. A later simulation with the same
+key restores them instead of running the geometry pipeline again.
+
+The key is a hash of the simulation class, its parameters, the source code of all KQCircuits modules the class and its
+class-valued parameters refer to, and the KQCircuits and KLayout versions. Changing any element source file therefore
+invalidates the affected entries automatically.
+
+Typical usage::
+
+    cache = GeometryCache()
+    simulations = sweep_simulation(layout, MySim, {**sim_parameters, "geometry_cache": cache}, sweeps)
+"""
+
+import hashlib
+import importlib
+import importlib.metadata
+import json
+import os
+from inspect import isclass, isfunction
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from kqcircuits.defaults import GEOMETRY_CACHE_PATH, default_geometry_cache_size
+from kqcircuits.masks.chip_cache import ChipCache, CacheKeyEncoder, module_tree_hash
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.export_helper import get_klayout_version
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder, GeometryJsonDecoder
+from kqcircuits.util.load_save_layout import load_layout, save_layout
+
+
+class GeometryCache(ChipCache):
+    """Content-addressed store of simulation geometry with a least-recently-used size bound.
+
+    Each entry is a directory named by ``geometry_cache_key`` containing ``simulation.oas`` and ``simulation.json``.
+    Entries are written atomically, so the cache can be shared by parallel processes.
+
+    Attributes:
+        path: directory containing the cache entries
+        max_size: maximum total size of the cache in bytes
+    """
+
+    def __init__(self, path=GEOMETRY_CACHE_PATH, max_size=default_geometry_cache_size):
+        super().__init__(path, max_size)
+
+    def load_simulation(self, simulation):
+        """Restores the geometry of ``simulation`` from the cache into its empty cell.
+
+        Restores the cell shapes and the ``layers``, ``ports`` and ``refpoints`` attributes.
+
+        Returns:
+            True if the cache contained the simulation, False otherwise
+        """
+        entry = self.path / geometry_cache_key(simulation)
+        if not entry.is_dir():
+            return False
+        layout = pya.Layout()
+        try:
+            with open(entry / "simulation.json", encoding="utf-8") as f:
+                data = json.load(f, cls=GeometryJsonDecoder)
+            load_layout(entry / "simulation.oas", layout)
+            os.utime(entry)
+        except FileNotFoundError:  # entry evicted by another process while reading
+            return False
+        simulation.cell.copy_tree(layout.top_cell())
+        simulation.layers = data["layers"]
+        simulation.ports = [_decode_port(port) for port in data["ports"]]
+        simulation.refpoints = data["refpoints"]
+        return True
+
+    def store_simulation(self, simulation):
+        """Stores the cell, layers, ports and refpoints of a built simulation into the cache."""
+        key = geometry_cache_key(simulation)
+        if (self.path / key).is_dir():
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            save_layout(tmp_path / "simulation.oas", simulation.layout, [simulation.cell])
+            data = {
+                "layers": simulation.layers,
+                "ports": [_encode_port(port) for port in simulation.ports],
+                "refpoints": simulation.refpoints,
+            }
+            with open(tmp_path / "simulation.json", "w", encoding="utf-8") as f:
+                json.dump(data, f, cls=GeometryJsonEncoder)
+            self.store(key, tmp_path)
+
+
+def geometry_cache_key(simulation):
+    """Returns the geometry cache key of a simulation as a hex digest string."""
+    sim_class = type(simulation)
+    parameters = simulation.get_parameters()
+    # classes created at runtime, like the ones of get_single_element_sim_class, differ only by their closures
+    closures = {
+        f"{cls.__qualname__}.{name}": _value_key(attr)
+        for cls in sim_class.__mro__
+        for name, attr in vars(cls).items()
+        if isfunction(attr) and attr.__closure__
+    }
+    key_data = {
+        "class": _value_key(sim_class),
+        "closures": closures,
+        "parameters": {k: _value_key(v) if isclass(v) or isfunction(v) else v for k, v in parameters.items()},
+        "dbu": simulation.layout.dbu,
+        "kqcircuits": _kqcircuits_version(),
+        "klayout": get_klayout_version(),
+    }
+    key_json = json.dumps(key_data, cls=CacheKeyEncoder, sort_keys=True)
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+def _kqcircuits_version():
+    try:
+        return importlib.metadata.version("kqcircuits")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+def _value_key(value):
+    """Returns a stable representation of a class, function or other value for the cache key."""
+    if isclass(value):
+        return {"class": f"{value.__module__}.{value.__qualname__}", "sources": module_tree_hash(value.__module__)}
+    if isfunction(value):
+        code = value.__code__
+        return {
+            "function": f"{value.__module__}.{value.__qualname__}",
+            "sources": module_tree_hash(value.__module__),
+            "code": hashlib.sha256(code.co_code + repr(code.co_consts).encode("utf-8")).hexdigest(),
+            "closure": [_value_key(cell.cell_contents) for cell in value.__closure__ or ()],
+        }
+    try:
+        return json.loads(json.dumps(value, cls=CacheKeyEncoder, sort_keys=True))
+    except (TypeError, ValueError):  # e.g. dictionaries with non-string keys
+        return type(value).__qualname__
+
+
+def _encode_port(port):
+    return {"class": f"{type(port).__module__}.{type(port).__qualname__}", "attributes": vars(port)}
+
+
+def _decode_port(data):
+    module_name, class_name = data["class"].rsplit(".", 1)
+    port_class = getattr(importlib.import_module(module_name), class_name)
+    port = port_class.__new__(port_class)
+    port.__dict__.update(data["attributes"])
+    return port
@@ -34,6 +34,7 @@ from kqcircuits.util.geometry_helper import (
     region_with_merged_polygons,
     region_with_merged_points,
     merge_points_and_match_on_edges,
+    overlapping_box_pairs,
 )
 from kqcircuits.util.parameters import Param, pdt, add_parameters_from
 from kqcircuits.simulations.export.util import find_edge_from_point_in_polygons
@@ -276,12 +277,13 @@ class Simulation:
         docstring="This field may be used to store 'virtual' parameters useful for your simulations",
     )
 
-    def __init__(self, layout, ports=None, **kwargs):
+    def __init__(self, layout, ports=None, geometry_cache=None, **kwargs):
         """Initialize a Simulation.
 
         The initializer parses parameters, creates a top cell, and then calls `self.build` to create
         the simulation geometry, followed by `self.create_simulation_layers` to process the geometry
-        so it is ready for exporting.
+        so it is ready for exporting. If `geometry_cache` contains the simulation, the geometry is restored from
+        the cache instead.
 
         Args:
             layout: the layout on which to create the simulation
@@ -290,6 +292,8 @@ class Simulation:
                 `Simulation.from_cell`. When given, the list replaces `self.ports` after `build` has
                 run and before the simulation layers are created. Leave as None for subclasses that
                 populate `self.ports` inside `build`.
+            geometry_cache: optional `GeometryCache` to restore the built geometry from, or to store it into. Not used
+                with an existing `cell` or with `ports`.
 
         Keyword arguments:
             `**kwargs`:
@@ -330,10 +334,16 @@ class Simulation:
             self.cell = layout.create_cell(self.name)
 
         self.layers = {}
-        self.build()
-        if ports is not None:
-            self.ports = ports
-        self.create_simulation_layers()
+        # the cache key does not cover an existing cell or explicitly given ports
+        if "cell" in kwargs or ports is not None:
+            geometry_cache = None
+        if geometry_cache is None or not geometry_cache.load_simulation(self):
+            self.build()
+            if ports is not None:
+                self.ports = ports
+            self.create_simulation_layers()
+            if geometry_cache is not None:
+                geometry_cache.store_simulation(self)
         self.warn_of_small_shapes()
 
     @classmethod
@@ -597,18 +607,6 @@ class Simulation:
         This function should be called before `produce_layers`.
         """
 
-        def are_connected(part1, part2):
-            """Return True only if part1 and part2 are connected."""
-            for n1, r1 in part1.items():
-                l1 = self.layers[n1]
-                for n2, r2 in part2.items():
-                    if n1 == n2:
-                        continue
-                    l2 = self.layers[n2]
-                    if l1["bottom"] <= l2["top"] and l2["bottom"] <= l1["top"] and not r1.interacting(r2).is_empty():
-                        return True
-            return False
-
         def merge_parts(part1, part2):
             """Merge part1 into part2 and clear part1."""
             for n, r in part1.items():
@@ -622,23 +620,46 @@ class Simulation:
             """Return the first part from parts that covers the point of pos and height. Return empty dictionary if
             such part does not exist.
             """
-            for p in parts:
-                for n, r in p.items():
-                    layer = self.layers[n]
-                    if layer["bottom"] <= height <= layer["top"] and not r.interacting(pya.Edge(pos, pos)).is_empty():
-                        return p
-            return {}
-
-        # create individual part for each metal polygon
-        metal_names = [n for n, l in self.layers.items() if self.is_metal(l.get("material"))]
-        parts = [{n: pya.Region(p)} for n in metal_names for p in self.layers[n]["region"].each()]
+            covering_parts = [
+                polygon_parts[i]
+                for i, (n, p) in enumerate(polygons)
+                if p.bbox().contains(pos)
+                and self.layers[n]["bottom"] <= height <= self.layers[n]["top"]
+                and parts[polygon_parts[i]]
+                and not pya.Region(p).interacting(pya.Edge(pos, pos)).is_empty()
+            ]
+            return parts[min(covering_parts)] if covering_parts else {}
 
-        # combine connected parts
-        for i in range(1, len(parts)):
-            for j in range(i):
-                if are_connected(parts[i], parts[j]):
-                    merge_parts(parts[j], parts[i])
-        parts = [p for p in parts if p]
+        # find connected metal polygons among the polygons with overlapping bounding boxes
+        metal_names = [n for n, l in self.layers.items() if self.is_metal(l.get("material"))]
+        polygons = [(n, p) for n in metal_names for p in self.layers[n]["region"].each()]
+        roots = list(range(len(polygons)))
+
+        def find_root(i):
+            while roots[i] != i:
+                roots[i] = roots[roots[i]]
+                i = roots[i]
+            return i
+
+        for i, j in overlapping_box_pairs([p.bbox() for _, p in polygons]):
+            (n1, p1), (n2, p2) = polygons[i], polygons[j]
+            l1, l2 = self.layers[n1], self.layers[n2]
+            if n1 != n2 and l1["bottom"] <= l2["top"] and l2["bottom"] <= l1["top"] and p1.touches(p2):
+                roots[find_root(i)] = find_root(j)
+
+        # combine connected polygons into parts, which are ordered by their last polygon
+        components = {}
+        for i in range(len(polygons)):
+            components.setdefault(find_root(i), []).append(i)
+        parts = []
+        polygon_parts = [0] * len(polygons)
+        for component in sorted(components.values(), key=lambda c: c[-1]):
+            part = {}
+            for i in component:
+                n, p = polygons[i]
+                part.setdefault(n, pya.Region()).insert(p)
+                polygon_parts[i] = len(parts)
+            parts.append(part)
 
         # assign excitation to parts
         if self.parent_simulation is not None:
@@ -955,10 +976,18 @@ class Simulation:
         subtract_keys of vacuum or dielectric object.
         """
         layers = []
+        shrunk_regions = {}  # regions shrunk by one database unit by id of the original region
+        sub_layers_cache = {}  # sub-layers of objects in layers by (index, bottom, top)
 
         def can_modify(obj):
             return obj.get("material") is not None and not self.is_metal(obj["material"])
 
+        def shrunk(region):
+            """Returns the region shrunk by one database unit. The result is cached, so region must not be modified."""
+            if id(region) not in shrunk_regions:
+                shrunk_regions[id(region)] = (region, region.sized(-1))  # keep region alive to keep its id unique
+            return shrunk_regions[id(region)][1]
+
         def are_separate(obj, tool):
             """Returns True if obj and tool do not overlap"""
             if obj["bottom"] == obj["top"] and tool["bottom"] == tool["top"]:
@@ -966,7 +995,9 @@ class Simulation:
                     return True
             elif obj["top"] <= tool["bottom"] or tool["top"] <= obj["bottom"]:
                 return True
-            return tool["region"].overlapping(obj["region"].sized(-1)).is_empty()
+            if not tool["region"].bbox().overlaps(obj["region"].bbox().enlarged(-1, -1)):
+                return True  # the regions cannot overlap if their bounding boxes do not
+            return tool["region"].overlapping(shrunk(obj["region"])).is_empty()
 
         def subtract(obj, lay):
             """Subtracts layers[lay] from obj."""
@@ -985,7 +1016,9 @@ class Simulation:
             """Subtracts the tool region from the object region unless the subtraction creates lots of holes. Avoiding
             subtraction with plenty of holes is important for the performance for example in case of lots of vias.
             """
-            if tool_region.inside(obj_region).count() <= 10 * obj_region.count():
+            if not tool_region.bbox().overlaps(obj_region.bbox()):
+                obj_region.merge()  # the subtraction would only merge the object region
+            elif tool_region.inside(obj_region).count() <= 10 * obj_region.count():
                 obj_region -= tool_region
 
         def sub_layers(obj, bottom=-inf, top=inf):
@@ -999,7 +1032,7 @@ class Simulation:
                 return []
 
             # Get sub-layer divisions for all subtracted objects
-            subtracts_layers = [sub_layers(layers[s], bottom, top) for s in obj.get("subtract", set())]
+            subtracts_layers = [cached_sub_layers(s, bottom, top) for s in obj.get("subtract", set())]
 
             # Special case for sheet object
             if obj["bottom"] == obj["top"]:
@@ -1034,6 +1067,15 @@ class Simulation:
                     _layers.append((_bottom, _top, region))
             return _layers
 
+        def cached_sub_layers(index, bottom, top):
+            """Returns ``sub_layers(layers[index], bottom, top)``. The objects in layers are not modified anymore, so
+            their sub-layers can be reused.
+            """
+            key = (index, bottom, top)
+            if key not in sub_layers_cache:
+                sub_layers_cache[key] = sub_layers(layers[index], bottom, top)
+            return sub_layers_cache[key]
+
         def exists(obj):
             """Hardens subtractions and returns True if geometry exists."""
             if "subtract" in obj:
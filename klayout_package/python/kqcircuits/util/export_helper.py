@@ -464,6 +464,15 @@ def get_klayout_version():
 
 def export_drc_report(name, path, drc_script):
     """Run a DRC script on ``path/name.oas`` and export results in ``path/name_drc_report.lyrdb``."""
+    wait_drc_report(start_drc_report(name, path, drc_script))
+
+
+def start_drc_report(name, path, drc_script):
+    """Start ``export_drc_report`` in a subprocess without waiting for it to finish.
+
+    Returns:
+        the ``subprocess.Popen`` object of the DRC, to be passed to ``wait_drc_report``
+    """
 
     drc_runset_path = os.path.join(DRC_PATH, drc_script)
     if not os.path.exists(drc_runset_path):
@@ -473,20 +482,22 @@ def export_drc_report(name, path, drc_script):
     output_file = os.path.join(path, f"{name}_drc_report.lyrdb")
     logging.info("Exporting DRC report to %s", output_file)
 
-    try:
-        subprocess.run(
-            [
-                klayout_executable_command(),
-                "-b",
-                "-i",
-                "-r",
-                drc_runset_path,
-                "-rd",
-                f"output={output_file}",
-                input_file,
-            ],
-            check=True,
-            startupinfo=STARTUPINFO,
-        )
-    except subprocess.CalledProcessError as e:
-        logging.error(e.output)
+    return subprocess.Popen(
+        [
+            klayout_executable_command(),
+            "-b",
+            "-i",
+            "-r",
+            drc_runset_path,
+            "-rd",
+            f"output={output_file}",
+            input_file,
+        ],
+        startupinfo=STARTUPINFO,
+    )
+
+
+def wait_drc_report(process):
+    """Wait for a DRC started with ``start_drc_report`` to finish and log an error if it failed."""
+    if process.wait() != 0:
+        logging.error(subprocess.CalledProcessError(process.returncode, process.args))
@@ -19,10 +19,12 @@
 
 """Helper module for general geometric functions"""
 
+from itertools import chain
 from math import cos, sin, radians, atan2, degrees, pi, ceil
 from typing import List
 import numpy as np
-from scipy import spatial
+from scipy import sparse, spatial
+from scipy.sparse import csgraph
 from kqcircuits.defaults import default_layers, default_path_length_layers
 from kqcircuits.pya_resolver import pya
 
@@ -217,6 +219,35 @@ def region_with_merged_polygons(region, tolerance, expansion=0.0):
     return new_region
 
 
+def overlapping_box_pairs(boxes, enlargement=0):
+    """Returns the index pairs of the boxes that overlap or touch each other.
+
+    The boxes are sorted by their left edges and swept from left to right, so that each box is only compared with the
+    boxes whose x-range overlaps its own. This avoids comparing all pairs of boxes.
+
+    Args:
+        boxes: list of Box or DBox
+        enlargement: distance by which the boxes are enlarged in each direction before comparing them
+
+    Returns:
+        list of index pairs ``(i, j)`` with ``i < j``
+    """
+    if not boxes:
+        return []
+    coords = np.array([(b.left, b.bottom, b.right, b.top) for b in boxes], dtype=float)
+    coords[:, :2] -= enlargement
+    coords[:, 2:] += enlargement
+    order = np.argsort(coords[:, 0], kind="stable")
+    lefts = coords[order, 0]
+    ends = np.searchsorted(lefts, coords[order, 2], side="right")
+    pairs = []
+    for k, i in enumerate(order.tolist()):
+        candidates = order[k + 1 : ends[k]]
+        candidates = candidates[(coords[candidates, 1] <= coords[i, 3]) & (coords[i, 1] <= coords[candidates, 3])]
+        pairs += [(min(i, j), max(i, j)) for j in candidates.tolist()]
+    return pairs
+
+
 def merge_points_and_match_on_edges(regions, tolerance=2):
     """Merges adjacent points of regions.
     Also goes through each polygon edge and splits the edge whenever it passes close to existing point.
@@ -275,13 +306,21 @@ def merge_points_and_match_on_edges(regions, tolerance=2):
         if len(intersection) < 2:
             return []
 
+        # Create mappings from common point to list of indices
+        instances1 = {pt: [] for pt in intersection}
+        for i, p in enumerate(pts1):
+            if p in instances1:
+                instances1[p].append(i)
+        instances2 = {pt: [] for pt in intersection}
+        for i, p in enumerate(pts2):
+            if p in instances2:
+                instances2[p].append(i)
+
         size1, size2 = len(pts1), len(pts2)
         i1, i2, length = 0, 0, 0
         for pt in intersection:
-            instances1 = [i for i, p in enumerate(pts1) if p == pt]
-            instances2 = [i for i, p in enumerate(pts2) if p == pt]
-            for inst1 in instances1:
-                for inst2 in instances2:
+            for inst1 in instances1[pt]:
+                for inst2 in instances2[pt]:
                     n = 1
                     while n < len(intersection) and pts1[(inst1 + n) % size1] == pts2[(inst2 - n) % size2]:
                         n += 1
@@ -295,37 +334,71 @@ def merge_points_and_match_on_edges(regions, tolerance=2):
             pts2[(i2 + k) % size2] for k in range((j2 - i2) % size2)
         ]
 
-    # Gather points from regions to `all_points` dictionary. This ignores duplicate points.
-    all_points = {}
-    for region in regions:
-        for polygon in region.each():
-            all_points.update({point: [] for point in polygon.to_simple_polygon().each_point()})
-    if not all_points:
+    def edges_near_points(starts, ends):
+        """Returns boolean array telling for each edge from coords[starts] to coords[ends] whether any other point is
+        closer than tolerance + 1 to the edge. The margin of one covers the rounding of `pya.Edge.distance_abs`.
+        The distance is tested only for the points found by KD-tree queries around the edge, which is divided into
+        pieces of about the mean edge length for the queries.
+        """
+        p0, p1 = coords[starts], coords[ends]
+        lengths = np.hypot(*(p1 - p0).T)
+        pieces = np.maximum(1, np.ceil(lengths / max(np.mean(lengths), tolerance))).astype(int)
+        piece_edges = np.repeat(np.arange(len(starts)), pieces)
+        piece_numbers = np.arange(len(piece_edges)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        fractions = (piece_numbers + 0.5) / pieces[piece_edges]
+        centers = p0[piece_edges] + (p1 - p0)[piece_edges] * fractions[:, None]
+        radii = lengths[piece_edges] / pieces[piece_edges] / 2 + tolerance + 1
+
+        # Only the pieces having points other than the edge end points are listed
+        counts = tree.query_ball_point(centers, radii, return_length=True)
+        listed = np.flatnonzero((counts > 2) | ((pieces[piece_edges] > 1) & (counts > 0)))
+        found = tree.query_ball_point(centers[listed], radii[listed], return_sorted=False)
+        counts = np.fromiter(map(len, found), dtype=int, count=len(found))
+        edges = np.repeat(piece_edges[listed], counts)
+        pts = np.fromiter(chain.from_iterable(found), dtype=int, count=np.sum(counts))
+
+        # Compute the distances between the found points and the edges
+        other = (pts != starts[edges]) & (pts != ends[edges])
+        edges, pts = edges[other], pts[other]
+        d = (p1 - p0)[edges]
+        v = coords[pts] - p0[edges]
+        t = np.clip(np.sum(v * d, axis=1) / np.maximum(np.sum(d * d, axis=1), 1.0), 0.0, 1.0)
+        near = np.zeros(len(starts), dtype=bool)
+        near[edges[np.hypot(*(v - d * t[:, None]).T) <= tolerance + 1]] = True
+        return near
+
+    # Gather points from regions to `point_list`. This ignores duplicate points.
+    region_points = [[list(p.to_simple_polygon().each_point()) for p in region.each()] for region in regions]
+    point_list = list(dict.fromkeys(p for polygons in region_points for points in polygons for p in points))
+    if not point_list:
         return  # nothing is done if no points exist
-
-    # For each point, assign a list of surrounding points using Voronoi diagram
-    # Create point sets to merge adjacent points into single point
-    merge_sets = []
-    point_list = list(all_points)
-    vor = spatial.Voronoi([(p.x, p.y) for p in point_list])
-    for link in vor.ridge_points:
-        p = [point_list[i] for i in link]
-        all_points[p[0]].append(p[1])
-        all_points[p[1]].append(p[0])
-        if p[0].sq_distance(p[1]) <= tolerance**2:
-            current_set = set(link)
-            other_sets = []
-            for merge_set in merge_sets:
-                if current_set.intersection(merge_set):
-                    current_set.update(merge_set)
-                else:
-                    other_sets.append(merge_set)
-            merge_sets = [current_set] + other_sets
+    point_index = {p: i for i, p in enumerate(point_list)}
+    xs, ys = [p.x for p in point_list], [p.y for p in point_list]
+    coords = np.array([xs, ys], dtype=float).T
+
+    # For each point, assign an array of surrounding points using Voronoi diagram. The surrounding points of point i are
+    # neighbors[neighbor_start[i]:neighbor_start[i + 1]] in the order of the Voronoi ridges.
+    vor = spatial.Voronoi(coords)
+    ridges = vor.ridge_points
+    sources = np.concatenate((ridges[:, 0], ridges[:, 1]))
+    order = np.lexsort((np.tile(np.arange(len(ridges)), 2), sources))
+    neighbors = np.concatenate((ridges[:, 1], ridges[:, 0]))[order].tolist()
+    neighbor_start = np.searchsorted(sources[order], np.arange(len(point_list) + 1)).tolist()
+
+    # Merge adjacent points into single point. The merge sets are the connected components of the Voronoi neighbors
+    # closer than the tolerance.
+    ridge_vectors = coords[ridges[:, 1]] - coords[ridges[:, 0]]
+    close = ridges[np.sum(ridge_vectors * ridge_vectors, axis=1) <= tolerance**2]
+    graph = sparse.coo_matrix((np.ones(len(close)), (close[:, 0], close[:, 1])), shape=(len(point_list),) * 2)
+    set_count, labels = csgraph.connected_components(graph, directed=False)
+    merge_sets = [[] for _ in range(set_count)]
+    for i in np.flatnonzero(np.bincount(labels)[labels] > 1).tolist():
+        merge_sets[labels[i]].append(i)
 
     # Create dictionary of moved points: includes the point to be moved as key and the new position as value
     moved = {}
-    if merge_sets:
-        for merge_set in merge_sets:
+    for merge_set in merge_sets:
+        if merge_set:
             average = pya.Point()
             for i in merge_set:
                 average += point_list[i]
@@ -334,43 +407,75 @@ def merge_points_and_match_on_edges(regions, tolerance=2):
                 if point_list[i] != average:
                     moved[point_list[i]] = average
 
+    # Find the edges passing close to other points. Other edges are kept as they are.
+    polygon_indices = [[[point_index[p] for p in points] for points in polygons] for polygons in region_points]
+    edge_ends = [i for polygons in polygon_indices for indices in polygons for i in indices]
+    edge_starts = [i for polygons in polygon_indices for indices in polygons for i in indices[-1:] + indices[:-1]]
+    tree = spatial.cKDTree(coords)
+    near = iter(edges_near_points(np.array(edge_starts, dtype=int), np.array(edge_ends, dtype=int)).tolist())
+
     # Travel through polygon edges and split edge whenever it passes close to a point
     # Possibly move some points into new location
-    for region in regions:
-        polygons = []
-        for polygon in region.each():
-            points = list(polygon.to_simple_polygon().each_point())
+    for region, polygons in zip(regions, region_points):
+        new_polygons = []
+        for points in polygons:
             new_points = []
             for i, p1 in enumerate(points):
                 p0 = points[i - 1]
+                if not next(near):
+                    if p0 != p1:
+                        new_points.append(moved.get(p1, p1))
+                    continue
                 edge = pya.Edge(p0, p1)
+                dx, dy = p1.x - p0.x, p1.y - p0.y
+                k, k1 = point_index[p0], point_index[p1]
                 # Travel from p0 to p1 in Voronoi diagram
-                while p0 != p1:
+                while k != k1:
                     # Find the next Voronoi cell through which the edge passes
                     next_cell = []
-                    for p in all_points[p0]:
-                        dot = edge.d().sprod(p - p0)  # dot product between the edge vector and (p - p0)
-                        if dot <= 0.0:
+                    x0, y0 = xs[k] - p1.x, ys[k] - p1.y
+                    for j in neighbors[neighbor_start[k] : neighbor_start[k + 1]]:
+                        x, y = xs[j] - p1.x, ys[j] - p1.y
+                        dot = dx * (x - x0) + dy * (y - y0)  # dot product between the edge vector and (p - p0)
+                        if dot <= 0:
                             continue
-                        t = (p.sq_distance(edge.p1) - p0.sq_distance(edge.p1)) / dot  # distance to the Voronoi cell
+                        t = (x * x + y * y - x0 * x0 - y0 * y0) / dot  # distance to the Voronoi cell
                         if not next_cell or t < next_cell[1]:
-                            next_cell = [p, t]
+                            next_cell = [j, t]
                     # The next_cell is found unless the Voronoi diagram is badly broken
-                    p0 = next_cell[0]
-                    if edge.distance_abs(p0) <= tolerance:
-                        # Point is close to edge, so add the point to the polygon. Finally, p0 is equal to p1 here.
-                        new_points.append(moved[p0] if p0 in moved else p0)
+                    k = next_cell[0]
+                    p = point_list[k]
+                    if edge.distance_abs(p) <= tolerance:
+                        # Point is close to edge, so add the point to the polygon. Finally, p is equal to p1 here.
+                        new_points.append(moved.get(p, p))
 
             # Remove consecutive duplicate points and update list of polygons by fixed polygons
-            polygons += fixed_polygon([p for i, p in enumerate(new_points) if p != new_points[i - 1]])
+            new_polygons += fixed_polygon([p for i, p in enumerate(new_points) if p != new_points[i - 1]])
 
-        # Replace region with merged polygons
+        # Replace region with merged polygons. Only the polygons having a common edge in opposite direction are tried
+        # to be merged, so the polygon indices are mapped by the edges whose opposite edge exists. Merging does not
+        # create new edges, so the mapped edges are found at the beginning.
         region.clear()
-        for i, polygon in enumerate(polygons):
-            for j in range(i + 1, len(polygons)):
-                merged = merged_polygon(polygon, polygons[j])
+        all_edges = {edge for polygon in new_polygons for edge in zip(polygon, polygon[1:] + polygon[:1])}
+        edge_map = {edge: set() for edge in all_edges if edge[::-1] in all_edges}
+        for j, polygon in enumerate(new_polygons):
+            for edge in zip(polygon, polygon[1:] + polygon[:1]):
+                if edge in edge_map:
+                    edge_map[edge].add(j)
+        for i, polygon in enumerate(new_polygons):
+            edges = [edge for edge in zip(polygon, polygon[1:] + polygon[:1]) if edge in edge_map]
+            for edge in edges:
+                edge_map[edge].discard(i)
+            for j in sorted({j for p0, p1 in edges for j in edge_map[(p1, p0)]}):
+                merged = merged_polygon(polygon, new_polygons[j])
                 if merged:
-                    polygons[j] = merged
+                    for edge in zip(new_polygons[j], new_polygons[j][1:] + new_polygons[j][:1]):
+                        if edge in edge_map:
+                            edge_map[edge].discard(j)
+                    for edge in zip(merged, merged[1:] + merged[:1]):
+                        if edge in edge_map:
+                            edge_map[edge].add(j)
+                    new_polygons[j] = merged
                     break
             else:
                 region.insert(pya.SimplePolygon(polygon, True))
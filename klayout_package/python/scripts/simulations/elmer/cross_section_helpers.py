@@ -32,8 +32,7 @@ from elmer_helpers import (
 )
 
 from gmsh_helpers import (
-    separated_hull_and_holes,
-    add_polygon,
+    add_region,
     get_recursive_children,
     set_meshing,
     apply_elmer_layer_prefix,
@@ -80,26 +79,7 @@ def produce_cross_section_mesh(json_data: dict[str, Any], msh_file: Path | str)
     dim_tags = {}
     for name, data in layers.items():
         reg = pya.Region(cell.shapes(layout.layer(data["layer"], 0)))
-        layer_dim_tags = []
-        for simple_poly in reg.each():
-            poly = separated_hull_and_holes(simple_poly)
-            hull_point_coordinates = [
-                (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hull()
-            ]
-            hull_plane_surface_id, _ = add_polygon(hull_point_coordinates)
-            hull_dim_tag = (2, hull_plane_surface_id)
-            hole_dim_tags = []
-            for hole in range(poly.holes()):
-                hole_point_coordinates = [
-                    (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hole(hole)
-                ]
-                hole_plane_surface_id, _ = add_polygon(hole_point_coordinates)
-                hole_dim_tags.append((2, hole_plane_surface_id))
-            if hole_dim_tags:
-                layer_dim_tags += gmsh.model.occ.cut([hull_dim_tag], hole_dim_tags)[0]
-            else:
-                layer_dim_tags.append(hull_dim_tag)
-        dim_tags[name] = layer_dim_tags
+        dim_tags[name] = add_region(reg, layout.dbu, json_data.get("min_hole_size", 0.0))
 
     # Call fragment and get updated dim_tags as new_tags. Then synchronize.
     all_dim_tags = [tag for tags in dim_tags.values() for tag in tags]
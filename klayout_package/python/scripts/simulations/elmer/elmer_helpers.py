@@ -1993,14 +1993,38 @@ def delete_meshes(path, simname):
         (sif_folder / ef).unlink(missing_ok=True)
     for part_folder in sif_folder.glob("partitioning.*"):
         if part_folder.is_dir():
-            shutil.rmtree(part_folder)
+            shutil.rmtree(part_folder, ignore_errors=True)
+
+
+def delete_unused_meshes(json_data: dict[str, Any], path: Path) -> None:
+    """
+    Deletes the Gmsh and Elmer meshes used by the simulation, once every simulation sharing the mesh has written
+    its results.
+
+    The users of each mesh are listed in 'mesh_users.json' written at export. Without the file the mesh is assumed
+    to be used only by this simulation.
+
+    Args:
+        json_data: Complete parameter json for simulation
+        path: Location of the simulation folder
+    """
+    simname = json_data["name"]
+    mesh_name = json_data.get("mesh_name", simname)
+    users = [simname]
+    users_file = path / "mesh_users.json"
+    if users_file.exists():
+        with open(users_file, encoding="utf-8") as f:
+            users = json.load(f).get(mesh_name, users)
+    if all(user == simname or (path / f"{user}_project_results.json").exists() for user in users):
+        delete_meshes(path, mesh_name)
 
 
 def write_project_results_json(json_data: dict[str, Any], path: Path, polar_form: bool = True) -> None:
     """
     Writes the solution data in '_project_results.json' format for one Elmer simulation.
 
-    Deletes Gmsh and Elmer mesh files if json_data["workflow"]["delete_meshes"] is True
+    Deletes Gmsh and Elmer mesh files if json_data["workflow"]["delete_meshes"] is True and no other simulation
+    still needs the mesh
 
     If tool is capacitance, writes capacitance matrix
     If tool is epr_3d or capacitance with integrate energies=True, writes energies
@@ -2015,8 +2039,6 @@ def write_project_results_json(json_data: dict[str, Any], path: Path, polar_form
     simname = json_data["name"]
     sif_folder = path / simname
     result_json_path = path / (simname + "_project_results.json")
-    if json_data["workflow"]["delete_meshes"]:
-        delete_meshes(path, simname)
 
     if tool in ("capacitance", "epr_3d"):
         results = {}
@@ -2108,6 +2130,9 @@ def write_project_results_json(json_data: dict[str, Any], path: Path, polar_form
         )
         filter_resonant_vtus(frequencies, smatrix_arr, sif_folder, simname, polar_form=polar_form)
 
+    if json_data["workflow"]["delete_meshes"]:
+        delete_unused_meshes(json_data, path)
+
 
 def filter_resonant_vtus(
     frequencies: list[float] | np.ndarray, smatrix_arr: np.ndarray, sif_folder: Path, simname: str, polar_form=True
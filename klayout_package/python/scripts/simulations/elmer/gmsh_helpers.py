@@ -15,9 +15,12 @@
 # (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
 # Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
 # and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+import json
 import logging
 import itertools
 import re
+import time
+from collections import Counter
 from pathlib import Path
 from typing import Any, Sequence, Iterable
 import gmsh
@@ -62,6 +65,8 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
 
     # Initialize gmsh
     gmsh.initialize()
+    timings: dict[str, float] = {}
+    stage_start = time.perf_counter()
 
     # Read geometry from gds file
     layout = pya.Layout()
@@ -83,6 +88,7 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
     gmsh.model.add("3D-mesh")
     dim_tags = {}
     layers = json_data["layers"]
+    min_hole_size = json_data.get("min_hole_size", 0.0)
     for name, data in layers.items():
         # Get layer region
         if "layer" in data:
@@ -93,29 +99,8 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
         else:
             reg = pya.Region(bbox)
 
-        # Convert layer region to polygons
-        layer_dim_tags = []
-        layer_edge_ids = []
-        for simple_poly in reg.each():
-            poly = separated_hull_and_holes(simple_poly)
-            hull_point_coordinates = [
-                (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hull()
-            ]
-            hull_plane_surface_id, hull_edge_ids = add_polygon(hull_point_coordinates)
-            layer_edge_ids += hull_edge_ids
-            hull_dim_tag = (2, hull_plane_surface_id)
-            hole_dim_tags = []
-            for hole in range(poly.holes()):
-                hole_point_coordinates = [
-                    (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hole(hole)
-                ]
-                hole_plane_surface_id, hole_edge_ids = add_polygon(hole_point_coordinates)
-                layer_edge_ids += hole_edge_ids
-                hole_dim_tags.append((2, hole_plane_surface_id))
-            if hole_dim_tags:
-                layer_dim_tags += gmsh.model.occ.cut([hull_dim_tag], hole_dim_tags)[0]
-            else:
-                layer_dim_tags.append(hull_dim_tag)
+        # Convert layer region to plane surfaces
+        layer_dim_tags = add_region(reg, layout.dbu, min_hole_size)
 
         # Move to correct height
         z = data.get("z", 0.0)
@@ -138,6 +123,7 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
                 # add port polygon and store its dim_tag
                 surface_id, _ = add_polygon(port["polygon"])
                 dim_tags[f'port_{port["number"]}'] = [(2, surface_id)]
+    stage_start = record_stage(timings, "geometry", stage_start)
 
     # Subtract layers
     for name, data in layers.items():
@@ -145,7 +131,7 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
         if subtract:
             tool_dim_tags = [t for n in subtract for t in dim_tags[n]]
             dim_tags[name] = gmsh.model.occ.cut(dim_tags[name], tool_dim_tags, removeTool=False)[0]
-            gmsh.model.occ.synchronize()
+    stage_start = record_stage(timings, "subtract", stage_start)
 
     # Call fragment and get updated dim_tags as new_tags. Then synchronize.
     all_dim_tags = [tag for tags in dim_tags.values() for tag in tags]
@@ -155,54 +141,69 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
         name: [new_tag for old_tag in tags for new_tag in dim_tags_map[old_tag]] for name, tags in dim_tags.items()
     }
     gmsh.model.occ.synchronize()
+    stage_start = record_stage(timings, "fragment", stage_start)
 
     # Set meshing
     mesh_size = json_data.get("mesh_size", {})
     workflow = json_data.get("workflow", {})
     mesh_options = json_data.get("mesh_options", {})
     mesh_field_ids, global_max_mesh_size = set_meshing(mesh_size, new_tags, workflow, mesh_options)
+    stage_start = record_stage(timings, "mesh_fields", stage_start)
 
     # Remove layers without material
     for name, data in layers.items():
         if name in new_tags and data.get("material") is None:
             del new_tags[name]
 
+    # Query the boundary surfaces of each volume once and use them in the classification below
+    volume_boundaries = get_volume_boundaries(gmsh.model.getEntities(3))
+
     # Modify new_tags for wave equation simulations
     edge_ports_dts = set()
     if json_data["tool"] == "wave_equation":
         # Split edge ports into parts by intersecting layers
+        surface_owners: dict[DimTag, list[str]] = {}
+        for name, dts in new_tags.items():
+            for dt in get_surfaces(dts, volume_boundaries):
+                surface_owners.setdefault(dt, []).append(name)
         for port in json_data["ports"]:
             port_name = f'port_{port["number"]}'
             if port_name in new_tags and port["type"] == "EdgePort":
                 port_dts = set(new_tags[port_name])
                 edge_ports_dts.update(port_dts)
-                for name, dts in list(new_tags.items()):
-                    part_dts = [(d, t) for d, t in port_dts.intersection(get_recursive_children(dts)) if d == 2]
-                    if part_dts:
-                        new_tags[f"{port_name}_{name}"] = part_dts
+                parts: dict[str, list[DimTag]] = {}
+                for dt in port_dts:
+                    for name in surface_owners.get(dt, []):
+                        parts.setdefault(name, []).append(dt)
+                for name in [n for n in new_tags if n in parts]:
+                    new_tags[f"{port_name}_{name}"] = parts[name]
                 del new_tags[port_name]
 
     metal_layers = get_metal_layers(layers)
     excitations = {d["excitation"] for d in metal_layers.values()}
+    excitation_names: dict[int, list[str]] = {}
+    for n, d in metal_layers.items():
+        if n in new_tags:
+            excitation_names.setdefault(d["excitation"], []).append(n)
     metal_boundary_dts = set()
     for excitation in excitations:
-        excitation_names = [n for n, d in metal_layers.items() if d["excitation"] == excitation and n in new_tags]
-        excitation_dts = [dt for n in excitation_names for dt in new_tags[n]]
-        excitation_boundary = [(d, t) for d, t in get_recursive_children(excitation_dts, True) if d == 2]
-        excitation_boundary = [dt for dt in excitation_boundary if dt not in edge_ports_dts]
+        names = excitation_names.get(excitation, [])
+        excitation_dts = [dt for n in names for dt in new_tags[n]]
+        excitation_boundary = [
+            dt for dt in get_surfaces(excitation_dts, volume_boundaries, True) if dt not in edge_ports_dts
+        ]
         metal_boundary_dts.update(excitation_boundary)
         # Add excitation boundaries and remove those from original metal layers
         if json_data["tool"] != "epr_3d":
             new_tags[f"excitation_{excitation}_boundary"] = excitation_boundary
-            for n in excitation_names:
+            for n in names:
                 new_tags[n] = [(d, t) for d, t in new_tags[n] if d == 3]
 
-    # Set domain boundary as ground
+    # Set domain boundary as ground. These are the surfaces bounding exactly one solid.
     solid_dts = [(d, t) for dts in new_tags.values() for d, t in dts if d == 3]
-    face_dts = [(d, t) for dt in solid_dts for d, t in get_recursive_children([dt]) if d == 2]
-    new_tags["domain_boundary"] = [
-        d for d in face_dts if face_dts.count(d) == 1 and d not in edge_ports_dts.union(metal_boundary_dts)
-    ]
+    face_counts = Counter(dt for solid_dt in solid_dts for dt in volume_boundaries[solid_dt])
+    non_domain_dts = edge_ports_dts | metal_boundary_dts
+    new_tags["domain_boundary"] = [dt for dt, n in face_counts.items() if n == 1 and dt not in non_domain_dts]
 
     # Create physical groups from each object in new_tags
     for name, dts in new_tags.items():
@@ -212,17 +213,18 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
             )
 
     # Warn about overlapping boundaries
-    boundary_tags = {k: {dt for dt in dts if dt[0] == 2} for k, dts in new_tags.items()}
-    for n1, n2 in itertools.combinations([k for k, dts in boundary_tags.items() if dts], 2):
-        if boundary_tags[n1].intersection(boundary_tags[n2]):
-            logging.warning(f"Detected overlapping mesh boundaries: {n1} and {n2}")
+    for n1, n2 in get_overlapping_boundaries(new_tags):
+        logging.warning(f"Detected overlapping mesh boundaries: {n1} and {n2}")
+    stage_start = record_stage(timings, "boundaries", stage_start)
 
     # Generate and save mesh
     gmsh.model.mesh.generate(1)
     gmsh.model.mesh.generate(2)
     gmsh.model.mesh.generate(3)
+    stage_start = record_stage(timings, "generate", stage_start)
 
     optimize_mesh(json_data.get("mesh_optimizer"))
+    stage_start = record_stage(timings, "optimize", stage_start)
 
     min_quality = json_data["min_mesh_quality"]
     if min_quality > 0:
@@ -250,8 +252,11 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
             else:
                 logging.warning(f"Iterative refinement: Failed to improve the mesh in {max_iter} iterations")
             print_mesh_quality_metrics()
+    stage_start = record_stage(timings, "refine", stage_start)
 
     gmsh.write(str(msh_file))
+    record_stage(timings, "write", stage_start)
+    write_mesh_timings(timings, msh_file)
 
     # Open mesh viewer
     if workflow.get("run_gmsh_gui", False):
@@ -260,6 +265,33 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
     gmsh.finalize()
 
 
+def record_stage(timings: dict[str, float], stage: str, start: float) -> float:
+    """Adds the wall time elapsed since `start` to the duration of a meshing stage
+
+    Args:
+        timings: durations of the stages in seconds, updated in place
+        stage: name of the stage
+        start: value of `time.perf_counter()` at the start of the stage
+
+    Returns:
+        value of `time.perf_counter()` at the end of the stage, to be used as the start of the next stage
+    """
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + now - start
+    return now
+
+
+def write_mesh_timings(timings: dict[str, float], msh_file: Path) -> None:
+    """Writes the durations of the meshing stages next to the mesh file as `<mesh_name>.timing.json`
+
+    Args:
+        timings: durations of the stages in seconds
+        msh_file: mesh file name
+    """
+    with open(Path(msh_file).with_suffix(".timing.json"), "w", encoding="utf-8") as f:
+        json.dump({"stages": timings, "total": sum(timings.values())}, f, indent=4)
+
+
 def get_element_qualities(element_type: int | None = None) -> dict[int, float]:
     """Get element quality metrics in dictionary format ElementTag -> Quality.
     `element_type` can be used to filter by element type, for example tetras=4"""
@@ -377,6 +409,59 @@ def add_polygon(point_coordinates: Sequence[Sequence[float]], mesh_size: float =
     return gmsh.model.occ.addPlaneSurface(loops), lines
 
 
+def add_curve_loop(points: Iterable[pya.Point], dbu: float) -> int:
+    """
+    Adds a closed curve loop of line segments through the given points in the OpenCASCADE model.
+
+    The loop is oriented clockwise regardless of the order of the points, because the outer loop and the hole loops of
+    an OpenCASCADE plane surface must have the same orientation.
+
+    Args:
+        points: points of the loop in database units
+        dbu: database unit in µm
+
+    Returns:
+        entity id of the curve loop
+    """
+    points = list(points)
+    if sum(p1.x * p2.y - p2.x * p1.y for p1, p2 in zip(points, points[1:] + points[:1])) > 0:
+        points.reverse()
+    point_ids = [gmsh.model.occ.addPoint(point.x * dbu, point.y * dbu, 0) for point in points]
+    lines = [gmsh.model.occ.addLine(p1, p2) for p1, p2 in zip(point_ids, point_ids[1:] + point_ids[:1])]
+    return gmsh.model.occ.addCurveLoop(lines)
+
+
+def add_region(region: pya.Region, dbu: float, min_hole_size: float = 0.0) -> list[DimTag]:
+    """
+    Adds the polygons of a region as plane surfaces in the OpenCASCADE model.
+
+    The holes of each polygon are given as inner curve loops of its plane surface, so that no boolean operations are
+    needed for the holes. The OpenCASCADE model is not synchronized.
+
+    Args:
+        region: polygons to add, in database units
+        dbu: database unit in µm
+        min_hole_size: holes whose width and height are both smaller than this (in µm) are filled. Such holes, for
+            example in a ground grid, are not resolved by a mesh much coarser than the holes.
+
+    Returns:
+        list of dim tags of the plane surfaces
+    """
+    dim_tags = []
+    for simple_poly in region.each():
+        poly = separated_hull_and_holes(simple_poly)
+        loops = [add_curve_loop(poly.each_point_hull(), dbu)]
+        for hole in range(poly.holes()):
+            hole_points = list(poly.each_point_hole(hole))
+            hole_box = pya.Box()
+            for point in hole_points:
+                hole_box += point
+            if max(hole_box.width(), hole_box.height()) * dbu >= min_hole_size:
+                loops.append(add_curve_loop(hole_points, dbu))
+        dim_tags.append((2, gmsh.model.occ.addPlaneSurface(loops)))
+    return dim_tags
+
+
 def separated_hull_and_holes(polygon: pya.Polygon | pya.SimplePolygon) -> pya.Polygon | pya.SimplePolygon:
     """Returns Polygon with holes separated from hull. Takes Polygon or SimplePolygon as the argument."""
     bbox = polygon.bbox().enlarged(10, 10)
@@ -403,6 +488,10 @@ def set_mesh_size(
     Set the mesh size such that it is `min_mesh_size` when near the curves of boundaries defined by the entities of
     dim_tags and gradually increasing to `max_mesh_size`.
 
+    The entities share one Distance field and one Threshold field for each group of entities with equal sampling, so
+    that the number of fields does not grow with the number of entities. Volumes are replaced by their boundary
+    surfaces.
+
     .. code-block:: text
 
       max_mesh_size -                     /------------------
@@ -429,38 +518,53 @@ def set_mesh_size(
                   In that case, the value is determined by 1.5 times the maximum reachable distance in the bounding box
                   of the entity (curve) divided by the minimum mesh size. The sampling value is forced to be at least 3
                   to avoid bug in line-based mesh refinement. At the moment there is no obvious way to implement
-                  curve_length/min_mesh_size type of algorithm.
+                  curve_length/min_mesh_size type of algorithm. To group the entities, the value is rounded up to the
+                  nearest power of 2^(1/4).
 
     Returns:
         list of the threshold field ids that were defined in this function
     """
-    mesh_field_ids = []
-    for dim_tag in dim_tags:
-        if dim_tag[0] > 2:
-            dim_tags += gmsh.model.getBoundary([dim_tag], combined=False, oriented=False, recursive=False)
-            continue
-        tag_distance_field = gmsh.model.mesh.field.add("Distance")
-        key_dict = {0: "PointsList", 1: "CurvesList", 2: "SurfacesList"}
-        gmsh.model.mesh.field.setNumbers(tag_distance_field, key_dict[dim_tag[0]], [dim_tag[1]])
-
-        # Sample the object with points
-        if dim_tag[0] > 0:
+    # Replace volumes by their boundaries and drop duplicates
+    entity_dts = [dt for dt in dim_tags if dt[0] <= 2]
+    volume_dts = [dt for dt in dim_tags if dt[0] > 2]
+    if volume_dts:
+        entity_dts += gmsh.model.getBoundary(volume_dts, combined=False, oriented=False, recursive=False)
+
+    # Group the entities by sampling. Points are not sampled.
+    key_dict = {0: "PointsList", 1: "CurvesList", 2: "SurfacesList"}
+    groups: dict[int, dict[int, list[int]]] = {}
+    for dim, tag in dict.fromkeys(entity_dts):
+        group_sampling = 0
+        if dim > 0:
             if sampling is None:
-                bbox = gmsh.model.occ.getBoundingBox(*dim_tag)
+                bbox = gmsh.model.occ.getBoundingBox(dim, tag)
                 bbox_diam = coord_dist(bbox[0:3], bbox[3:6])  # diameter of bounding box
-                final_sampling = np.ceil(1.5 * bbox_diam / min_mesh_size)
+                entity_sampling = max(3, 1.5 * bbox_diam / min_mesh_size)
+                group_sampling = int(np.ceil(2 ** (np.ceil(4 * np.log2(entity_sampling)) / 4)))
             else:
-                final_sampling = sampling
-            gmsh.model.mesh.field.setNumber(tag_distance_field, "Sampling", max(3, final_sampling))
+                group_sampling = max(3, sampling)
+        groups.setdefault(group_sampling, {}).setdefault(dim, []).append(tag)
+
+    mesh_field_ids = []
+    for group_sampling, group_tags in groups.items():
+        distance_field = gmsh.model.mesh.field.add("Distance")
+        for dim, tags in group_tags.items():
+            gmsh.model.mesh.field.setNumbers(distance_field, key_dict[dim], tags)
+
+        # Sample the objects with points
+        if group_sampling:
+            gmsh.model.mesh.field.setNumber(distance_field, "Sampling", group_sampling)
 
         mesh_field_id = gmsh.model.mesh.field.add("Threshold")
-        gmsh.model.mesh.field.setNumber(mesh_field_id, "InField", tag_distance_field)
+        gmsh.model.mesh.field.setNumber(mesh_field_id, "InField", distance_field)
         gmsh.model.mesh.field.setNumber(mesh_field_id, "SizeMin", min_mesh_size)
         gmsh.model.mesh.field.setNumber(mesh_field_id, "SizeMax", max_mesh_size)
         gmsh.model.mesh.field.setNumber(mesh_field_id, "DistMin", dist_min)
         gmsh.model.mesh.field.setNumber(mesh_field_id, "DistMax", dist_max)
         mesh_field_ids.append(mesh_field_id)
 
+    n_entities = sum(len(tags) for group_tags in groups.values() for tags in group_tags.values())
+    logging.info(f"Mesh size {min_mesh_size} near {n_entities} entities is set with {len(mesh_field_ids)} fields")
     return mesh_field_ids
 
 
@@ -493,8 +597,18 @@ def set_mesh_size_field(
     Returns:
         list of the threshold field ids that were defined in this function
     """
+    return set_mesh_size(dim_tags, *get_mesh_size_thresholds(global_max, size, distance, slope))
+
+
+def get_mesh_size_thresholds(
+    global_max: float, size: float, distance: float | None = None, slope: float = 1.0
+) -> tuple[float, float, float, float]:
+    """
+    Returns the arguments `min_mesh_size`, `max_mesh_size`, `dist_min` and `dist_max` of `set_mesh_size` corresponding
+    to the arguments of `set_mesh_size_field`.
+    """
     dist = size if distance is None else distance
-    return set_mesh_size(dim_tags, size, global_max, dist, dist + (global_max - size) / slope)
+    return size, global_max, dist, dist + (global_max - size) / slope
 
 
 def get_recursive_children(dim_tags: Iterable[DimTag], include_parent: bool = False) -> set[DimTag]:
@@ -514,6 +628,61 @@ def get_recursive_children(dim_tags: Iterable[DimTag], include_parent: bool = Fa
     return children
 
 
+def get_volume_boundaries(volume_dts: Iterable[DimTag]) -> dict[DimTag, list[DimTag]]:
+    """Returns the boundary surfaces of each volume
+
+    Args:
+        volume_dts: list of dim tags of volumes
+
+    Returns:
+        dictionary mapping each volume dim tag to the list of its distinct boundary surface dim tags
+    """
+    return {dt: list(dict.fromkeys(gmsh.model.getBoundary([dt], combined=False, oriented=False))) for dt in volume_dts}
+
+
+def get_surfaces(
+    dim_tags: Iterable[DimTag], volume_boundaries: dict[DimTag, list[DimTag]], include_parent: bool = False
+) -> set[DimTag]:
+    """Returns the surfaces among the recursive children of given entities.
+
+    Equals the surfaces of `get_recursive_children(dim_tags, include_parent)`, but uses the boundaries given by
+    `get_volume_boundaries` instead of querying Gmsh.
+
+    Args:
+        dim_tags: list of dim tags of parent entities
+        volume_boundaries: boundary surfaces of each volume
+        include_parent: whether to include the parent surfaces into the output
+
+    Returns:
+        set of dim tags of surfaces
+    """
+    surfaces = set()
+    for dt in dim_tags:
+        if dt[0] == 3:
+            surfaces.update(volume_boundaries[dt])
+        elif dt[0] == 2 and include_parent:
+            surfaces.add(dt)
+    return surfaces
+
+
+def get_overlapping_boundaries(layer_dts: dict[str, list[DimTag]]) -> list[tuple[str, str]]:
+    """Returns the pairs of layers sharing at least one surface
+
+    Args:
+        layer_dts: dictionary of layer names and their dim tags
+
+    Returns:
+        list of pairs of layer names, in the order of `layer_dts`
+    """
+    surface_owners: dict[DimTag, list[str]] = {}
+    for name, dts in layer_dts.items():
+        for dt in dict.fromkeys(dt for dt in dts if dt[0] == 2):
+            surface_owners.setdefault(dt, []).append(name)
+    order = {name: i for i, name in enumerate(layer_dts)}
+    pairs = {pair for names in surface_owners.values() for pair in itertools.combinations(names, 2)}
+    return sorted(pairs, key=lambda pair: (order[pair[0]], order[pair[1]]))
+
+
 def set_meshing(
     mesh_size: dict[str, float | list[float]],
     layer_dts: dict[str, list[DimTag]],
@@ -543,8 +712,8 @@ def set_meshing(
         bboxes = [gmsh.model.occ.getBoundingBox(d, t) for d, t in all_dts]
         mesh_global_max_size = max(coord_dist(bbox[0:3], bbox[3:6]) for bbox in bboxes) if bboxes else 1.0
 
-    # Refine mesh
-    mesh_field_ids = []
+    # Refine mesh. Entities with equal refinement thresholds share the mesh size fields.
+    refinements: dict[tuple[float, float, float, float], list[DimTag]] = {}
     for keys, size in mesh_size.items():
         size_dts: set[DimTag] = set(gmsh.model.getEntities())
         for key in keys.split("&"):
@@ -560,11 +729,12 @@ def set_meshing(
             else:
                 size_dts &= family
 
-        mesh_field_ids += set_mesh_size_field(
-            list(size_dts - get_recursive_children(size_dts)),
-            mesh_global_max_size,
-            *(size if isinstance(size, list) else [size]),
-        )
+        thresholds = get_mesh_size_thresholds(mesh_global_max_size, *(size if isinstance(size, list) else [size]))
+        refinements.setdefault(thresholds, []).extend(size_dts - get_recursive_children(size_dts))
+
+    mesh_field_ids = []
+    for thresholds, dts in refinements.items():
+        mesh_field_ids += set_mesh_size(dts, *thresholds)
 
     # Set meshing options
     n_threads_dict = workflow["sbatch_parameters"] if "sbatch_parameters" in workflow else workflow
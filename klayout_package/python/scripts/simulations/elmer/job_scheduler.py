@@ -0,0 +1,177 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import os
+import sys
+import json
+import queue
+import argparse
+import logging
+import subprocess
+import threading
+from pathlib import Path
+
+_description = """
+Run the jobs of Elmer simulations in the order of their dependencies.
+The jobs are read from the jobs file written at export, in which each job lists the jobs it must run after and the
+number of CPUs it uses. A job is started as soon as its dependencies are done and enough CPUs are free, so that for
+example meshes of later simulations are produced while earlier simulations are solved. Among the jobs that are ready
+to start, the jobs with the longest chain of dependent jobs are started first.
+
+Usage: "python job_scheduler.py simulation_jobs.json"
+"""
+
+
+def get_dependents(jobs: list[dict]) -> dict[str, list[str]]:
+    """Returns the names of the jobs that run after each job."""
+    dependents = {job["name"]: [] for job in jobs}
+    unknown = {dep for job in jobs for dep in job["after"] if dep not in dependents}
+    if unknown:
+        raise ValueError(f"Jobs depend on unknown jobs {sorted(unknown)}")
+    for job in jobs:
+        for dep in set(job["after"]):
+            dependents[dep].append(job["name"])
+    return dependents
+
+
+def get_job_priorities(dependents: dict[str, list[str]]) -> dict[str, int]:
+    """
+    Returns the length of the longest chain of jobs starting from each job, the job itself included.
+
+    The jobs are visited in reverse topological order, starting from the jobs no other job runs after, so that the
+    priorities of the dependents of a job are known before the job is visited.
+
+    Raises:
+        ValueError: if the jobs depend on each other in a cycle
+    """
+    n_dependents = {name: len(deps) for name, deps in dependents.items()}
+    dependencies = {name: [] for name in dependents}
+    for name, deps in dependents.items():
+        for dep in deps:
+            dependencies[dep].append(name)
+
+    priorities = {}
+    to_visit = [name for name, n in n_dependents.items() if n == 0]
+    while to_visit:
+        name = to_visit.pop()
+        priorities[name] = 1 + max((priorities[d] for d in dependents[name]), default=0)
+        for dep in dependencies[name]:
+            n_dependents[dep] -= 1
+            if n_dependents[dep] == 0:
+                to_visit.append(dep)
+
+    if len(priorities) < len(dependents):
+        raise ValueError(f"Jobs depend on each other in a cycle: {' -> '.join(_find_cycle(dependents, priorities))}")
+    return priorities
+
+
+def _find_cycle(dependents: dict[str, list[str]], visited: dict[str, int]) -> list[str]:
+    """Returns the names of jobs forming a cycle among the jobs not in visited, the first job repeated at the end."""
+    # every job left over runs before another left-over job, so following those jobs must eventually repeat one
+    name = next(name for name in dependents if name not in visited)
+    path = []
+    while name not in path:
+        path.append(name)
+        name = next(d for d in dependents[name] if d not in visited)
+    return path[path.index(name) :] + [name]
+
+
+def run_job(job: dict, cwd: Path | str, done: queue.Queue) -> None:
+    """Runs the command of the job, appending its output to the log file, and puts the job and exit code to done."""
+    try:
+        with open(Path(cwd) / job["log"], "a", encoding="utf-8") as f:
+            code = subprocess.call(job["cmd"], stdout=f, stderr=subprocess.STDOUT, cwd=cwd)
+    except OSError as err:
+        logging.warning(f"Could not run {job['name']}: {err}")
+        code = -1
+    done.put((job, code))
+
+
+def run_jobs(jobs: list[dict], n_cpus: int, cwd: Path | str | None = None) -> list[str]:
+    """
+    Runs the jobs in parallel respecting their dependencies and the number of CPUs.
+
+    A job requesting more than n_cpus CPUs is run alone. If a job fails, the jobs depending on it are skipped, but all
+    other jobs are run.
+
+    Args:
+        jobs   : list of jobs, each a dictionary with ``name``, ``cmd``, ``log``, ``cpus`` and ``after``
+        n_cpus : number of CPUs available for the jobs
+        cwd    : working directory where the commands are run
+
+    Returns:
+        names of the jobs that failed or were skipped
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+    jobs_by_name = {job["name"]: job for job in jobs}
+    dependents = get_dependents(jobs)
+    priorities = get_job_priorities(dependents)
+    order = {job["name"]: i for i, job in enumerate(jobs)}
+    n_waiting_for = {job["name"]: len(set(job["after"])) for job in jobs}
+    ready = [name for name, n in n_waiting_for.items() if n == 0]
+    done = queue.Queue()
+    failed = []
+    free_cpus = n_cpus
+    n_running = 0
+    n_finished = 0
+
+    while ready or n_running:
+        ready.sort(key=lambda name: (-priorities[name], order[name]))
+        for name in list(ready):
+            cpus = min(jobs_by_name[name]["cpus"], n_cpus)
+            if cpus <= free_cpus:
+                ready.remove(name)
+                free_cpus -= cpus
+                n_running += 1
+                logging.info(f"Starting {name}")
+                threading.Thread(target=run_job, args=(jobs_by_name[name], cwd, done), daemon=True).start()
+
+        job, code = done.get()
+        free_cpus += min(job["cpus"], n_cpus)
+        n_running -= 1
+        n_finished += 1
+        if code == 0:
+            logging.info(f"Finished {job['name']} ({n_finished}/{len(jobs)})")
+            for name in dependents[job["name"]]:
+                n_waiting_for[name] -= 1
+                if n_waiting_for[name] == 0:
+                    ready.append(name)
+        else:
+            logging.warning(f"Job {job['name']} exited with code {code}. See {job['log']}")
+            failed.append(job["name"])
+
+    # jobs that never became ready depend on a failed job
+    skipped = [name for name, n in n_waiting_for.items() if n > 0]
+    for name in skipped:
+        logging.warning(f"Skipped {name} because a job it depends on failed")
+    return failed + skipped
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=_description)
+    parser.add_argument("jobs_file", type=str, help="Jobs file written at export")
+    parser.add_argument("--cpus", type=int, help="Number of CPUs to use instead of the one in the jobs file")
+    args = parser.parse_args()
+
+    with open(args.jobs_file, encoding="utf-8") as file:
+        jobs_data = json.load(file)
+    not_done = run_jobs(jobs_data["jobs"], args.cpus or jobs_data["cpus"], Path(args.jobs_file).parent)
+    if not_done:
+        sys.exit(1)
@@ -17,6 +17,7 @@
 # and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
 import json
 import logging
+import os
 import sys
 from pathlib import Path
 import argparse
@@ -24,7 +25,17 @@ import argparse
 from interpolating_frequency_sweep import interpolating_frequency_sweep
 from gmsh_helpers import produce_mesh
 from elmer_helpers import produce_sif_files, write_project_results_json, get_energy_integrals
-from run_helpers import run_elmer_grid, run_elmer_solver, run_paraview, write_simulation_machine_versions_file
+from run_helpers import (
+    run_elmer_grid,
+    run_elmer_solver,
+    run_paraview,
+    write_simulation_machine_versions_file,
+    get_mesh_store_entry,
+    fetch_stored_mesh,
+    store_mesh,
+    fetch_stored_elmer_mesh,
+    store_elmer_mesh,
+)
 from cross_section_helpers import (
     produce_cross_section_mesh,
     produce_cross_section_sif_files,
@@ -57,6 +68,8 @@ parser.add_argument("--only-elmer-sifs", action="store_true", help="Only write t
 parser.add_argument("--only-elmer", action="store_true", help="Run only Elmer")
 parser.add_argument("--only-paraview", action="store_true", help="Run only Paraview")
 
+parser.add_argument("--sif-names", type=str, nargs="+", help="Run Elmer only for the given sif files")
+
 parser.add_argument("-q", action="store_true", help="Quiet operation: no GUIs are launched")
 
 parser.add_argument(
@@ -80,6 +93,8 @@ name = Path(Path(json_filename).stem)
 with open(json_filename, encoding="utf-8") as f:
     json_data = json.load(f)
 workflow = json_data["workflow"]
+if args.sif_names:
+    json_data["sif_names"] = args.sif_names
 
 if args.write_project_results:
     args.skip_gmsh = True
@@ -143,15 +158,25 @@ elmer_n_processes = workflow.get("elmer_n_processes", 1)
 tool = json_data["tool"]
 mesh_name = json_data["mesh_name"]
 msh_file = f"{mesh_name}.msh"
+mesh_store = workflow.get("mesh_store") or os.environ.get("KQC_MESH_STORE")
+mesh_entry = get_mesh_store_entry(json_data.get("mesh_fingerprint"), path.joinpath(mesh_store) if mesh_store else None)
+
+# Gmsh is not needed if the Elmer mesh is found in the mesh store
+elmer_mesh_fetched = workflow.get("run_elmergrid", True) and fetch_stored_elmer_mesh(
+    path.joinpath(mesh_name), elmer_n_processes, mesh_entry
+)
 
 if tool == "cross-section":
     # Generate mesh
-    if workflow.get("run_gmsh", True):
+    if workflow.get("run_gmsh", True) and not elmer_mesh_fetched:
+        fetch_stored_mesh(path.joinpath(msh_file), mesh_entry)
         produce_cross_section_mesh(json_data, path.joinpath(msh_file))
+        store_mesh(path.joinpath(msh_file), mesh_entry)
 
     # Run sub-processes
     if workflow.get("run_elmergrid", True):
-        run_elmer_grid(msh_file, elmer_n_processes, path)
+        run_elmer_grid(msh_file, elmer_n_processes, path, elmer_mesh_fetched)
+        store_elmer_mesh(path.joinpath(mesh_name), elmer_n_processes, mesh_entry)
 
     if workflow.get("write_elmer_sifs", True):
         produce_cross_section_sif_files(json_data, path.joinpath(name))
@@ -172,12 +197,15 @@ if tool == "cross-section":
 
 else:
     # Generate mesh
-    if workflow.get("run_gmsh", True):
+    if workflow.get("run_gmsh", True) and not elmer_mesh_fetched:
+        fetch_stored_mesh(path.joinpath(msh_file), mesh_entry)
         produce_mesh(json_data, path.joinpath(msh_file))
+        store_mesh(path.joinpath(msh_file), mesh_entry)
 
     # Run sub-processes
     if workflow.get("run_elmergrid", True):
-        run_elmer_grid(msh_file, elmer_n_processes, path)
+        run_elmer_grid(msh_file, elmer_n_processes, path, elmer_mesh_fetched)
+        store_elmer_mesh(path.joinpath(mesh_name), elmer_n_processes, mesh_entry)
 
     if workflow.get("write_elmer_sifs", True):
         produce_sif_files(json_data, path.joinpath(name))
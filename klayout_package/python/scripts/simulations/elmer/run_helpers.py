@@ -71,16 +71,134 @@ def write_simulation_machine_versions_file(path: Path) -> None:
         json.dump(versions, file)
 
 
-def run_elmer_grid(msh_path: Path | str, n_processes: int, exec_path_override: Path | None = None) -> None:
-    """Run ElmerGrid to process meshes from .msh format to Elmer's mesh format. Partitions mesh if n_processes > 1"""
+def get_mesh_store_entry(mesh_fingerprint: str | None, mesh_store: Path | None) -> Path | None:
+    """
+    Returns the folder in the mesh store for the meshes with the given fingerprint, or None if no mesh store is used.
+
+    The folder name contains the Gmsh version in addition to the fingerprint, because different Gmsh versions may
+    produce different meshes from the same geometry. The folder holds the Gmsh mesh as ``mesh.msh`` and the ElmerGrid
+    mesh in ``elmer``, with a ``partitioning.<n>`` sub-folder for each number of processes it has been partitioned for.
+    """
+    if mesh_store is None or mesh_fingerprint is None:
+        return None
+    return mesh_store / f"{mesh_fingerprint}_gmsh_{gmsh.__version__}"
+
+
+def _store_atomically(source: Path, target: Path, ignore=None) -> None:
+    """
+    Copies a file or folder to target unless target already exists.
+
+    The copy is first written under a temporary name and then renamed, so that concurrent simulations never see
+    partially written files.
+    """
+    if target.exists():
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # the temporary name is hidden so that it does not match patterns like mesh.* of the complete files
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    if source.is_dir():
+        shutil.copytree(source, tmp, ignore=ignore)
+    else:
+        shutil.copyfile(source, tmp)
+    try:
+        os.replace(tmp, target)
+    except OSError:  # another simulation stored the folder first
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            tmp.unlink(missing_ok=True)
+
+
+def fetch_stored_mesh(msh_path: Path, mesh_entry: Path | None) -> None:
+    """Copies the Gmsh mesh from the mesh store entry to msh_path, unless msh_path already exists."""
+    if msh_path.exists() or mesh_entry is None:
+        return
+    stored_msh = mesh_entry / "mesh.msh"
+    if stored_msh.exists():
+        logging.info(f"Copying stored mesh {stored_msh}")
+        shutil.copyfile(stored_msh, msh_path)
+
+
+def store_mesh(msh_path: Path, mesh_entry: Path | None) -> None:
+    """Saves the Gmsh mesh into the mesh store entry."""
+    if mesh_entry is not None and msh_path.exists():
+        _store_atomically(msh_path, mesh_entry / "mesh.msh")
+
+
+def _replace_atomically(source: Path, target: Path) -> None:
+    """Copies a file or folder to target through a temporary name, replacing an earlier target."""
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    if source.is_dir():
+        shutil.copytree(source, tmp)
+        shutil.rmtree(target, ignore_errors=True)
+    else:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+def fetch_stored_elmer_mesh(mesh_dir: Path, n_processes: int, mesh_entry: Path | None) -> bool:
+    """
+    Copies the ElmerGrid mesh and its partitioning for n_processes from the mesh store entry to mesh_dir.
+
+    A mesh left in mesh_dir by an earlier run may come from a different geometry, so it is replaced by the stored mesh.
+    Its partitioning for n_processes is removed if the mesh store entry has none, so that ElmerGrid partitions the
+    stored mesh again.
+
+    Returns:
+        True if the ElmerGrid mesh was fetched from the mesh store entry, so that only partitioning may be needed
+    """
+    if mesh_entry is None:
+        return False
+    stored_dir = mesh_entry / "elmer"
+    if not stored_dir.joinpath("mesh.elements").exists():
+        return False
+    logging.info(f"Copying stored Elmer mesh {stored_dir}")
+    mesh_dir.mkdir(parents=True, exist_ok=True)
+    # mesh.elements marks a complete mesh, so it is copied last
+    for file in sorted(stored_dir.glob("mesh.*"), key=lambda f: f.name == "mesh.elements"):
+        _replace_atomically(file, mesh_dir / file.name)
+    if n_processes > 1:
+        partitioning = f"partitioning.{n_processes}"
+        if stored_dir.joinpath(partitioning).exists():
+            logging.info(f"Copying stored Elmer mesh partitioning {stored_dir / partitioning}")
+            _replace_atomically(stored_dir / partitioning, mesh_dir / partitioning)
+        else:
+            shutil.rmtree(mesh_dir / partitioning, ignore_errors=True)
+    return True
+
+
+def store_elmer_mesh(mesh_dir: Path, n_processes: int, mesh_entry: Path | None) -> None:
+    """Saves the ElmerGrid mesh and its partitioning for n_processes into the mesh store entry."""
+    if mesh_entry is None or not mesh_dir.joinpath("mesh.elements").exists():
+        return
+    # Leave out partitionings and any results of earlier runs
+    _store_atomically(
+        mesh_dir, mesh_entry / "elmer", ignore=lambda d, names: [n for n in names if not n.startswith("mesh.")]
+    )
+    partitioning = f"partitioning.{n_processes}"
+    if n_processes > 1 and mesh_dir.joinpath(partitioning).exists():
+        _store_atomically(mesh_dir / partitioning, mesh_entry / "elmer" / partitioning)
+
+
+def run_elmer_grid(
+    msh_path: Path | str, n_processes: int, exec_path_override: Path | None = None, mesh_fetched: bool = False
+) -> None:
+    """
+    Run ElmerGrid to process meshes from .msh format to Elmer's mesh format. Partitions mesh if n_processes > 1.
+
+    If mesh_fetched is True, the Elmer mesh was fetched from the mesh store and is only partitioned, so that the Gmsh
+    mesh is not needed for a new number of processes.
+    """
     mesh_dir = Path(msh_path).stem
+    mesh_path = Path(exec_path_override or "").joinpath(mesh_dir)
     mesh_exists_identifier = f"partitioning.{n_processes}" if n_processes > 1 else "mesh.elements"
-    if Path(mesh_dir).joinpath(mesh_exists_identifier).exists():
+    if mesh_path.joinpath(mesh_exists_identifier).exists():
         logging.info(f"Reusing existing mesh from {str(mesh_dir)}/")
         return
     elmergrid_executable = shutil.which("ElmerGrid")
     if elmergrid_executable is not None:
-        subprocess.check_call([elmergrid_executable, "14", "2", msh_path], cwd=exec_path_override)
+        if not mesh_fetched:
+            subprocess.check_call([elmergrid_executable, "14", "2", msh_path], cwd=exec_path_override)
         if n_processes > 1:
             subprocess.check_call(
                 [
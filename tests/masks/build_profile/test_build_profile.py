@@ -0,0 +1,76 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.build_profile import profile_phase, record_count, save_trace, take_records
+from kqcircuits.masks.mask_set import MaskSet
+
+
+def test_nested_phases_are_recorded_with_their_stack():
+    first_record = record_count()
+    with profile_phase("outer"):
+        with profile_phase("inner", chip="CH1"):
+            pass
+    records = take_records(first_record)
+    assert len(records) == 2
+    inner, outer = records[0], records[1]
+    assert (inner["name"], inner["stack"], inner["info"]) == ("inner", "outer;inner", {"chip": "CH1"})
+    assert (outer["name"], outer["stack"], outer["info"]) == ("outer", "outer", {})
+    assert outer["wall_time"] >= inner["wall_time"] >= 0
+    if outer["peak_rss_increase"] is not None:
+        assert outer["peak_rss_increase"] >= inner["peak_rss_increase"] >= 0
+    assert record_count() == first_record
+
+
+def test_trace_has_an_event_for_each_phase(tmp_path):
+    first_record = record_count()
+    with profile_phase("outer"):
+        with profile_phase("inner"):
+            pass
+    save_trace(tmp_path / "trace.json", take_records(first_record))
+    with open(tmp_path / "trace.json", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert [e["name"] for e in events] == ["inner", "outer"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[1]["ts"] <= events[0]["ts"]
+
+
+def test_mask_set_export_writes_profile(tmp_path):
+    mask_set = MaskSet(
+        export_path=tmp_path,
+        parse_sys_args=False,
+        use_chip_cache=False,
+        mask_export_layers=["base_metal_gap_wo_grid"],
+        profile_trace=True,
+    )
+    chips_map = [["---"] * 15 for _ in range(15)]
+    chips_map[7][7] = "CH1"
+    mask_set.add_mask_layout(chips_map, "1t1")
+    mask_set.add_chip(Chip, "CH1")
+    mask_set.build()
+    mask_set.export()
+
+    with open(tmp_path / "MaskSet_v1" / "mask_build_profile.json", encoding="utf-8") as f:
+        profile = json.load(f)
+    for name in ["chip", "export chip", "static oas", "netlist", "mask layer", "bitmaps", "docs"]:
+        assert profile["totals"][name]["count"] >= 1
+    mask_layers = [p for p in profile["phases"] if p["name"] == "mask layer"]
+    assert mask_layers[0]["info"] == {"mask": "MaskSet_v1-1t1", "layer": "base_metal_gap_wo_grid"}
+    assert (tmp_path / "MaskSet_v1" / "mask_build_trace.json").exists()
@@ -0,0 +1,95 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import os
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.chips.demo import Demo
+from kqcircuits.masks import mask_set
+from kqcircuits.masks.chip_cache import ChipCache, chip_cache_key
+from kqcircuits.masks.mask_set import MaskSet
+from kqcircuits.pya_resolver import pya
+
+
+def _key(chip, with_grid=False, **extra_params):
+    return chip_cache_key(chip, "Mask", with_grid, "", extra_params)
+
+
+def test_key_is_stable():
+    assert _key((Demo, "DE1", {"readout_res_lengths": [5400, 5500]})) == _key(
+        (Demo, "DE1", {"readout_res_lengths": [5400, 5500]})
+    )
+
+
+def test_key_depends_on_chip_definition():
+    reference = _key((Demo, "DE1"))
+    assert _key((Chip, "DE1")) != reference
+    assert _key((Demo, "DE2")) != reference
+    assert _key((Demo, "DE1", {"box": pya.DBox(0, 0, 5000, 5000)})) != reference
+    assert _key((Demo, "DE1"), with_grid=True) != reference
+    assert _key((Demo, "DE1"), mock_chips=True) != reference
+
+
+def test_store_and_load(tmp_path):
+    cache = ChipCache(tmp_path / "cache", 10**6)
+    chip_path = tmp_path / "CH1"
+    chip_path.mkdir()
+    (chip_path / "CH1.oas").write_bytes(b"oas")
+    (chip_path / "CH1.json").write_text("{}")
+    (chip_path / "CH1.log").write_text("log")
+
+    assert not cache.load("key", tmp_path)
+    cache.store("key", chip_path)
+
+    target_path = tmp_path / "target"
+    target_path.mkdir()
+    assert cache.load("key", target_path)
+    assert sorted(f.name for f in target_path.iterdir()) == ["CH1.json", "CH1.oas"]
+    assert (target_path / "CH1.oas").read_bytes() == b"oas"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ChipCache(tmp_path / "cache", 250)
+    for i, key in enumerate(["a", "b", "c"]):
+        chip_path = tmp_path / key
+        chip_path.mkdir()
+        (chip_path / "chip.oas").write_bytes(bytes(100))
+        if key == "c":
+            assert cache.load("a", tmp_path)  # "a" becomes the most recently used entry
+        cache.store(key, chip_path)
+        os.utime(cache.path / key, (i, i))
+
+    assert sorted(e.name for e in cache.path.iterdir()) == ["a", "c"]
+
+
+def test_mask_set_reuses_cached_chip(tmp_path, monkeypatch):
+    export_calls = []
+    original_export_chip = mask_set.export_chip
+
+    def counting_export_chip(*args, **kwargs):
+        export_calls.append(args[1])
+        original_export_chip(*args, **kwargs)
+
+    monkeypatch.setattr(mask_set, "export_chip", counting_export_chip)
+    for export_dir in ("first", "second"):
+        mask = MaskSet(export_path=tmp_path / export_dir, parse_sys_args=False, chip_cache_path=tmp_path / "cache")
+        mask.add_chip(Chip, "CH1")
+        assert (tmp_path / export_dir / "MaskSet_v1" / "Chips" / "CH1" / "CH1.oas").exists()
+        assert "CH1" in mask.chips_map_legend
+
+    assert export_calls == ["CH1"]
@@ -0,0 +1,56 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+import pytest
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.mask_set import MaskSet
+
+
+def _build_chips(export_path, cpus=1, **kwargs):
+    mask_set = MaskSet(export_path=export_path, parse_sys_args=False, use_chip_cache=False, **kwargs)
+    mask_set.add_chip([(Chip, "CH1"), (Chip, "CH2", {"frames_dice_width": [100, 140]})], cpus=cpus)
+    return export_path / "MaskSet_v1" / "Chips"
+
+
+def _chip_json(chips_dir, variant):
+    with open(chips_dir / variant / f"{variant}.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_only_selected_chip_extras_are_exported(tmp_path):
+    chips_dir = _build_chips(tmp_path, chip_extras=["bump_count"])
+    chip_json = _chip_json(chips_dir, "CH1")
+    assert chip_json["Bump count"] == 0
+    assert chip_json["Layer areas and densities"] == {}
+
+
+def test_unknown_chip_extra_raises_error(tmp_path):
+    with pytest.raises(ValueError):
+        MaskSet(export_path=tmp_path, parse_sys_args=False, use_chip_cache=False, chip_extras=["netlists"])
+
+
+def test_parallel_chip_extras_match_serial_chip_extras(tmp_path):
+    serial_dir = _build_chips(tmp_path / "serial", cpus=2)
+    parallel_dir = _build_chips(tmp_path / "parallel", cpus=2, parallel_chip_extras=True)
+    for variant in ("CH1", "CH2"):
+        serial_json = _chip_json(serial_dir, variant)
+        assert serial_json["Layer areas and densities"]
+        assert _chip_json(parallel_dir, variant) == serial_json
@@ -0,0 +1,94 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.mask_set import MaskSet
+from kqcircuits.pya_resolver import pya
+
+mask_export_layers = ["-base_metal_gap", "base_metal_gap_wo_grid", "underbump_metallization"]
+# files that are written on every export
+bookkeeping_files = {"chip_build_times.json", "export_manifest.json", "mask_build_profile.json"}
+
+
+def _export_mask(export_path, dice_width=200, **mask_layout_kwargs):
+    mask_set = MaskSet(
+        export_path=export_path,
+        parse_sys_args=False,
+        use_chip_cache=False,
+        mask_export_layers=mask_export_layers,
+        incremental_export=True,
+    )
+    chips_map = [["---"] * 15 for _ in range(15)]
+    chips_map[7][6:9] = ["CH1", "CH2", "CH1"]
+    mask_set.add_mask_layout(chips_map, "1t1", **mask_layout_kwargs)
+    mask_set.add_chip(Chip, "CH1")
+    mask_set.add_chip(Chip, "CH2", frames_dice_width=[dice_width, 140])
+    mask_set.build()
+    mask_set.export()
+    return export_path / "MaskSet_v1"
+
+
+def _modification_times(mask_set_dir):
+    return {str(p.relative_to(mask_set_dir)): p.stat().st_mtime_ns for p in mask_set_dir.rglob("*") if p.is_file()}
+
+
+def _rewritten_files(export_path, **kwargs):
+    mask_set_dir = export_path / "MaskSet_v1"
+    before = _modification_times(mask_set_dir)
+    _export_mask(export_path, **kwargs)
+    after = _modification_times(mask_set_dir)
+    return {
+        name
+        for name in before
+        if after[name] != before[name] and not name.startswith("Chips") and name not in bookkeeping_files
+    }
+
+
+def test_unchanged_mask_set_is_not_exported_again(tmp_path):
+    _export_mask(tmp_path)
+    assert _rewritten_files(tmp_path) == set()
+
+
+def test_only_layers_of_changed_chips_are_exported_again(tmp_path):
+    _export_mask(tmp_path)
+    assert _rewritten_files(tmp_path, dice_width=100) == {
+        "MaskSet_v1-1t1/MaskSet_v1-1t1.oas",
+        "MaskSet_v1-1t1/MaskSet_v1-1t1.json",
+        "MaskSet_v1-1t1/MaskSet_v1-1t1-1t1_base_metal_gap.oas",
+        "MaskSet_v1-1t1/MaskSet_v1-1t1-1t1_base_metal_gap_wo_grid.oas",
+        "MaskSet_v1-1t1/MaskSet_v1-1t1.png",
+        "MaskSet_v1-1t1/MaskSet_v1-1t1-mask_graphical_rep.png",
+        "Mask_Documentation.md",
+    }
+
+
+def test_deleted_files_are_exported_again(tmp_path):
+    mask_set_dir = _export_mask(tmp_path)
+    layer_file = mask_set_dir / "MaskSet_v1-1t1" / "MaskSet_v1-1t1-1t1_underbump_metallization.oas"
+    content = layer_file.read_bytes()
+    layer_file.unlink()
+    _export_mask(tmp_path)
+    assert layer_file.read_bytes() == content
+
+
+def test_changed_pya_attribute_of_mask_layout_is_exported_again(tmp_path):
+    mask_set_dir = _export_mask(tmp_path)
+    layer_file = mask_set_dir / "MaskSet_v1-1t1" / "MaskSet_v1-1t1-1t1_base_metal_gap_wo_grid.oas"
+    content = layer_file.read_bytes()
+    _export_mask(tmp_path, chip_trans=pya.DTrans(2, False, 10000, 10000))
+    assert layer_file.read_bytes() != content
@@ -0,0 +1,50 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.mask_set import MaskSet
+from kqcircuits.pya_resolver import lay
+
+
+def _export_mask(export_path, mask_export_processes):
+    mask_set = MaskSet(
+        export_path=export_path,
+        parse_sys_args=False,
+        use_chip_cache=False,
+        mask_export_layers=["base_metal_gap_wo_grid"],
+        mask_export_processes=mask_export_processes,
+    )
+    chips_map = [["---"] * 15 for _ in range(15)]
+    chips_map[7][6:8] = ["CH1", "CH2"]
+    mask_set.add_mask_layout(chips_map, "1t1")
+    mask_set.add_chip([(Chip, "CH1"), (Chip, "CH2", {"frames_dice_width": [100, 140]})], cpus=2)
+    mask_set.build()
+    mask_set.export()
+    return export_path / "MaskSet_v1"
+
+
+def test_parallel_bitmaps_are_equal_to_serial_bitmaps(tmp_path):
+    serial_dir = _export_mask(tmp_path / "serial", 1)
+    parallel_dir = _export_mask(tmp_path / "parallel", 2)
+    bitmaps = sorted(p.relative_to(serial_dir) for p in serial_dir.rglob("*.png"))
+    assert len(bitmaps) > 2
+    for bitmap in bitmaps:
+        # compare pixels, the png metadata contains the cell name, which differs between the mask set and chip files
+        serial = lay.PixelBuffer.read_png(str(serial_dir / bitmap))
+        parallel = lay.PixelBuffer.read_png(str(parallel_dir / bitmap))
+        assert serial == parallel, bitmap
@@ -0,0 +1,96 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks import mask_export
+from kqcircuits.masks.mask_set import MaskSet
+from kqcircuits.pya_resolver import pya
+
+mask_export_layers = ["-base_metal_gap_wo_grid", "^airbridge_pads", "indium_bump"]
+
+
+def _export_mask(export_path, mask_export_processes):
+    mask_set = MaskSet(
+        export_path=export_path,
+        parse_sys_args=False,
+        use_chip_cache=False,
+        mask_export_layers=mask_export_layers,
+        mask_export_processes=mask_export_processes,
+    )
+    chips_map = [["---"] * 15 for _ in range(15)]
+    for row in chips_map[5:10]:
+        row[5:10] = ["CH1"] * 5
+    mask_set.add_mask_layout(chips_map, "1t1")
+    mask_set.add_chip(Chip, "CH1")
+    mask_set.build()
+    mask_set.export()
+    return export_path / "MaskSet_v1" / "MaskSet_v1-1t1"
+
+
+def _layer_area(path, other_path):
+    """Returns the areas of the layer in ``path`` and of its XOR with the layer in ``other_path`` shrunk by one dbu."""
+    layouts = [pya.Layout(), pya.Layout()]
+    regions = []
+    for layout, p in zip(layouts, [path, other_path]):
+        layout.read(str(p))
+        regions.append(pya.Region(layout.top_cell().begin_shapes_rec(layout.layer_indexes()[0])))
+    return regions[0].area(), (regions[0] ^ regions[1]).sized(-1).area()
+
+
+def test_parallel_export_matches_serial_export(tmp_path):
+    serial_dir = _export_mask(tmp_path / "serial", 1)
+    parallel_dir = _export_mask(tmp_path / "parallel", 3)
+    for layer_name in ["base_metal_gap_wo_grid", "airbridge_pads", "indium_bump"]:
+        file_name = f"MaskSet_v1-1t1-1t1_{layer_name}.oas"
+        # the parallel export loads the mask from file, where off-grid instance placements are rounded to dbu
+        area, xor_area = _layer_area(serial_dir / file_name, parallel_dir / file_name)
+        assert area > 0
+        assert xor_area == 0
+
+
+class _SerialPool:
+    """Stand-in for ``multiprocessing.Pool`` that runs the tasks in the calling process."""
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def map(self, func, iterable):
+        return [func(arg) for arg in iterable]
+
+
+def test_parallel_export_shares_cpus_between_inversions(tmp_path, monkeypatch):
+    recorded_threads = []
+    insert_inverted_layer = mask_export._insert_inverted_layer
+
+    def record_threads(*args, threads=None, **kwargs):
+        recorded_threads.append(threads)
+        insert_inverted_layer(*args, threads=threads, **kwargs)
+
+    monkeypatch.setattr(mask_export, "_insert_inverted_layer", record_threads)
+    monkeypatch.setattr(mask_export, "Pool", _SerialPool)
+    monkeypatch.setattr(mask_export.os, "cpu_count", lambda: 8)
+    _export_mask(tmp_path / "serial", 1)
+    _export_mask(tmp_path / "parallel", 2)
+    # the serial export uses all CPUs, while each of the two processes of the parallel export uses half of them
+    assert recorded_threads == [None, 4]
@@ -0,0 +1,57 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.masks.mask_export import _insert_inverted_layer
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.geometry_helper import circle_polygon
+
+wafer_rad = 1000
+
+
+def _inverted_regions(layout, tile_size):
+    layer = layout.layer(pya.LayerInfo(1, 0))
+    top_cell = layout.create_cell("top")
+    child_cell = layout.create_cell("child")
+    child_cell.shapes(layer).insert(pya.DBox(0, 0, 70, 30))
+    for i in range(-10, 10):
+        top_cell.insert(pya.DCellInstArray(child_cell.cell_index(), pya.DTrans(i * 90.0, i * 45.0)))
+    top_cell.shapes(layer).insert(pya.DBox(-1200, -50, 1200, 50))  # extends outside the wafer
+
+    flat = pya.Region(top_cell.begin_shapes_rec(layer)).merged() ^ pya.Region(
+        circle_polygon(wafer_rad).to_itype(layout.dbu)
+    )
+    inverted_cell = layout.create_cell("inverted")
+    _insert_inverted_layer(top_cell, layer, inverted_cell, wafer_rad, tile_size)
+    return flat, pya.Region(inverted_cell.begin_shapes_rec(layer))
+
+
+def test_tiled_inversion_matches_flat_inversion():
+    layout = pya.Layout()
+    flat, tiled = _inverted_regions(layout, tile_size=300)
+    assert tiled.area() > 0
+    # the polygons are cut at tile boundaries, where the cut points on circle edges are rounded to dbu
+    assert (tiled ^ flat).sized(-1).is_empty()
+
+
+def test_tiled_inversion_leaves_source_untouched():
+    layout = pya.Layout()
+    layer = layout.layer(pya.LayerInfo(1, 0))
+    top_cell = layout.create_cell("top")
+    top_cell.shapes(layer).insert(pya.DBox(-100, -100, 100, 100))
+    _insert_inverted_layer(top_cell, layer, layout.create_cell("inverted"), wafer_rad, 300)
+    assert top_cell.shapes(layer).size() == 1
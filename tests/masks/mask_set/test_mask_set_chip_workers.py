@@ -0,0 +1,59 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import pytest
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.build_profile import take_records
+from kqcircuits.masks.mask_set import MaskSet
+
+
+def test_chip_worker_pool_is_reused_and_loads_libraries_once_per_worker(tmp_path):
+    mask_set = MaskSet(export_path=tmp_path, parse_sys_args=False, use_chip_cache=False)
+    mask_set.add_chip([(Chip, "CH1"), (Chip, "CH2")], cpus=2)
+    pool = mask_set._chip_pool
+    mask_set.add_chip([(Chip, "CH3"), (Chip, "CH4")], cpus=2)
+    assert mask_set._chip_pool is pool
+    assert set(mask_set.chips_map_legend) == {"CH1", "CH2", "CH3", "CH4"}
+
+    records = take_records()
+    worker_pids = {r["pid"] for r in records if r["name"] == "chip"}
+    library_loads = [r for r in records if r["name"] == "load libraries" and r["pid"] in worker_pids]
+    assert len(library_loads) == len(worker_pids)
+    mask_set._close_chip_worker_pool()
+
+
+def _fail_to_create_chip(chip_arg):
+    raise ValueError(f"Failed to create {chip_arg[0][1]}")
+
+
+def test_chip_worker_pool_is_terminated_if_a_chip_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(MaskSet, "_create_chip", staticmethod(_fail_to_create_chip))
+    mask_set = MaskSet(export_path=tmp_path, parse_sys_args=False, use_chip_cache=False)
+    with pytest.raises(ValueError):
+        mask_set.add_chip([(Chip, "CH1"), (Chip, "CH2")], cpus=2)
+    assert mask_set._chip_pool is None
+
+
+def test_chip_worker_pool_is_closed_when_leaving_mask_set_context(tmp_path):
+    with MaskSet(export_path=tmp_path, parse_sys_args=False, use_chip_cache=False) as mask_set:
+        mask_set.add_chip([(Chip, "CH1"), (Chip, "CH2")], cpus=2)
+        pool = mask_set._chip_pool
+    assert mask_set._chip_pool is None
+    with pytest.raises(ValueError):  # the pool is not running anymore
+        pool.apply(len, ([],))
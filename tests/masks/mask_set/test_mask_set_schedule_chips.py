@@ -0,0 +1,61 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.chips.chip import Chip
+from kqcircuits.masks.mask_set import MaskSet
+
+
+def _mask_set(tmp_path, build_times=None):
+    if build_times is not None:
+        (tmp_path / "MaskSet_v1").mkdir()
+        with open(tmp_path / "MaskSet_v1" / "chip_build_times.json", "w", encoding="utf-8") as f:
+            json.dump(build_times, f)
+    return MaskSet(export_path=tmp_path, parse_sys_args=False, use_chip_cache=False)
+
+
+def test_chips_are_scheduled_largest_first(tmp_path):
+    mask_set = _mask_set(tmp_path, {"A": 1.0, "B": 5.0, "C": 3.0})
+    chips = [(Chip, "A"), (Chip, "B"), (Chip, "C")]
+    scheduled_chips, predicted_makespan = mask_set._schedule_chips(chips, 2)
+    assert [chip[1] for chip in scheduled_chips] == ["B", "C", "A"]
+    assert predicted_makespan == 5.0
+
+
+def test_build_cost_overrides_recorded_build_time(tmp_path):
+    mask_set = _mask_set(tmp_path, {"A": 1.0, "B": 5.0})
+    chips = [(Chip, "A", {"build_cost": 10.0}), (Chip, "B")]
+    scheduled_chips, predicted_makespan = mask_set._schedule_chips(chips, 1)
+    assert [chip[1] for chip in scheduled_chips] == ["A", "B"]
+    assert predicted_makespan == 15.0
+
+
+def test_chips_with_unknown_cost_are_scheduled_first(tmp_path):
+    mask_set = _mask_set(tmp_path, {"A": 1.0})
+    scheduled_chips, predicted_makespan = mask_set._schedule_chips([(Chip, "A"), (Chip, "B")], 2)
+    assert [chip[1] for chip in scheduled_chips] == ["B", "A"]
+    assert predicted_makespan is None
+
+
+def test_build_times_are_recorded(tmp_path):
+    mask_set = _mask_set(tmp_path)
+    mask_set.add_chip(Chip, "A", build_cost=1.0)
+    with open(tmp_path / "MaskSet_v1" / "chip_build_times.json", "r", encoding="utf-8") as f:
+        assert list(json.load(f)) == ["A"]
+    assert _mask_set(tmp_path)._schedule_chips([(Chip, "A")], 1)[1] is not None
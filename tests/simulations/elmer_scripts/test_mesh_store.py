@@ -0,0 +1,113 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import sys
+import types
+
+import pytest
+
+from kqcircuits.defaults import SIM_SCRIPT_PATH
+
+MESH_FILES = ["mesh.header", "mesh.nodes", "mesh.elements", "mesh.boundary", "mesh.names"]
+
+
+@pytest.fixture
+def run_helpers(monkeypatch):
+    """The `run_helpers` script module, imported like during a simulation run.
+
+    Gmsh is only needed by `run_helpers` for its version, so it is replaced by a stand-in module. This keeps the tests
+    focused on the file operations of the mesh store.
+    """
+    monkeypatch.setitem(sys.modules, "gmsh", types.SimpleNamespace(__version__="4.0.0"))
+    monkeypatch.delitem(sys.modules, "run_helpers", raising=False)
+    monkeypatch.syspath_prepend(str(SIM_SCRIPT_PATH / "elmer"))
+    import run_helpers  # pylint: disable=import-outside-toplevel,import-error
+
+    return run_helpers
+
+
+@pytest.fixture
+def elmer_mesh(tmp_path):
+    """An ElmerGrid mesh folder partitioned for two processes, which also holds the results of a simulation."""
+    mesh_dir = tmp_path / "sim" / "mesh"
+    mesh_dir.joinpath("partitioning.2").mkdir(parents=True)
+    for name in MESH_FILES:
+        mesh_dir.joinpath(name).write_text(name)
+    mesh_dir.joinpath("partitioning.2", "part.1.header").write_text("part")
+    mesh_dir.joinpath("sim.result").write_text("result")
+    return mesh_dir
+
+
+def test_stored_elmer_mesh_is_fetched(tmp_path, run_helpers, elmer_mesh):
+    entry = run_helpers.get_mesh_store_entry("abc", tmp_path / "store")
+    run_helpers.store_elmer_mesh(elmer_mesh, 2, entry)
+
+    mesh_dir = tmp_path / "other_sim" / "mesh"
+    assert run_helpers.fetch_stored_elmer_mesh(mesh_dir, 2, entry)
+    assert sorted(p.name for p in mesh_dir.iterdir()) == sorted(MESH_FILES + ["partitioning.2"])
+    assert mesh_dir.joinpath("mesh.elements").read_text() == "mesh.elements"
+    assert mesh_dir.joinpath("partitioning.2", "part.1.header").read_text() == "part"
+
+
+def test_new_partitioning_only_partitions_stored_mesh(tmp_path, monkeypatch, run_helpers, elmer_mesh):
+    entry = run_helpers.get_mesh_store_entry("abc", tmp_path / "store")
+    run_helpers.store_elmer_mesh(elmer_mesh, 2, entry)
+
+    sim_path = tmp_path / "other_sim"
+    assert run_helpers.fetch_stored_elmer_mesh(sim_path / "mesh", 4, entry)
+    assert sim_path.joinpath("mesh", "mesh.elements").exists()
+
+    calls = []
+    monkeypatch.setattr(run_helpers.shutil, "which", lambda name: name)
+    monkeypatch.setattr(run_helpers.subprocess, "check_call", lambda cmd, **kwargs: calls.append(cmd[:3]))
+    run_helpers.run_elmer_grid("mesh.msh", 4, sim_path, mesh_fetched=True)
+    assert calls == [["ElmerGrid", "2", "2"]]
+
+
+def test_storing_same_entry_again_keeps_first_mesh(tmp_path, run_helpers):
+    entry = run_helpers.get_mesh_store_entry("abc", tmp_path / "store")
+    for content in ["first", "second"]:
+        msh_path = tmp_path / content / "mesh.msh"
+        msh_path.parent.mkdir()
+        msh_path.write_text(content)
+        run_helpers.store_mesh(msh_path, entry)
+    assert [p.name for p in entry.iterdir()] == ["mesh.msh"]
+    assert entry.joinpath("mesh.msh").read_text() == "first"
+
+
+def test_earlier_mesh_is_regenerated_without_store(tmp_path, monkeypatch, run_helpers, elmer_mesh):
+    assert not run_helpers.fetch_stored_elmer_mesh(elmer_mesh, 1, None)
+
+    calls = []
+    monkeypatch.setattr(run_helpers.shutil, "which", lambda name: name)
+    monkeypatch.setattr(run_helpers.subprocess, "check_call", lambda cmd, **kwargs: calls.append(cmd[:3]))
+    run_helpers.run_elmer_grid("mesh.msh", 4, tmp_path / "sim")
+    assert calls == [["ElmerGrid", "14", "2"], ["ElmerGrid", "2", "2"]]
+
+
+def test_earlier_mesh_is_replaced_by_stored_mesh(tmp_path, run_helpers, elmer_mesh):
+    entry = run_helpers.get_mesh_store_entry("abc", tmp_path / "store")
+    run_helpers.store_elmer_mesh(elmer_mesh, 1, entry)
+
+    mesh_dir = tmp_path / "other_sim" / "mesh"
+    mesh_dir.joinpath("partitioning.2").mkdir(parents=True)
+    mesh_dir.joinpath("mesh.elements").write_text("earlier")
+    assert run_helpers.fetch_stored_elmer_mesh(mesh_dir, 2, entry)
+    assert mesh_dir.joinpath("mesh.elements").read_text() == "mesh.elements"
+    assert not mesh_dir.joinpath("partitioning.2").exists()
+    assert not [p for p in mesh_dir.iterdir() if p.name.endswith(".tmp")]
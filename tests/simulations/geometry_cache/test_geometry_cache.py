@@ -0,0 +1,76 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.elements.finger_capacitor_square import FingerCapacitorSquare
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.geometry_cache import GeometryCache, geometry_cache_key
+from kqcircuits.simulations.port import InternalPort
+from kqcircuits.simulations.single_element_simulation import get_single_element_sim_class
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+from kqcircuits.util.geometry_json_encoder import GeometryJsonEncoder
+
+sim_parameters = {
+    "name": "wg",
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+
+
+def _simulation_data(simulation):
+    return json.dumps(simulation.get_simulation_data(), cls=GeometryJsonEncoder, sort_keys=True)
+
+
+def test_cached_simulation_equals_built_simulation(tmp_path):
+    cache = GeometryCache(tmp_path)
+    built = WaveGuidesSim(pya.Layout(), geometry_cache=cache, **sim_parameters)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    cache.store = None  # a cache hit must not store again
+    cached = WaveGuidesSim(pya.Layout(), geometry_cache=cache, **sim_parameters)
+    assert _simulation_data(cached) == _simulation_data(built)
+    assert [type(port) for port in cached.ports] == [type(port) for port in built.ports]
+    for layer in built.get_layers():
+        built_region = pya.Region(built.cell.begin_shapes_rec(built.layout.layer(layer)))
+        cached_region = pya.Region(cached.cell.begin_shapes_rec(cached.layout.layer(layer)))
+        assert (built_region ^ cached_region).is_empty()
+
+
+def test_key_depends_on_parameters():
+    reference = geometry_cache_key(WaveGuidesSim(pya.Layout(), **sim_parameters))
+    assert geometry_cache_key(WaveGuidesSim(pya.Layout(), **sim_parameters)) == reference
+    assert geometry_cache_key(WaveGuidesSim(pya.Layout(), **sim_parameters, n_guides=2)) != reference
+
+
+def test_key_depends_on_single_element_sim_class_arguments():
+    box = pya.DBox(-200, -200, 200, 200)
+    all_ports = get_single_element_sim_class(FingerCapacitorSquare)
+    one_port = get_single_element_sim_class(FingerCapacitorSquare, ignore_ports=["port_b"])
+    reference = geometry_cache_key(all_ports(pya.Layout(), box=box))
+    assert geometry_cache_key(get_single_element_sim_class(FingerCapacitorSquare)(pya.Layout(), box=box)) == reference
+    assert geometry_cache_key(one_port(pya.Layout(), box=box)) != reference
+
+
+def test_explicit_ports_are_not_cached(tmp_path):
+    cache = GeometryCache(tmp_path)
+    WaveGuidesSim(pya.Layout(), geometry_cache=cache, **sim_parameters)
+    ports = [InternalPort(1, pya.DPoint(0, 0))]
+    simulation = WaveGuidesSim(pya.Layout(), ports=ports, geometry_cache=cache, **sim_parameters)
+    assert simulation.ports == ports
+    assert len(list(tmp_path.iterdir())) == 1
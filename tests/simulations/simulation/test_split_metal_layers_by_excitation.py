@@ -0,0 +1,57 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.empty_simulation import EmptySimulation
+
+
+def _excitations(with_airbridge):
+    """Returns the excitations of the metal layers of a simulation with ground and two islands.
+
+    If ``with_airbridge`` is True, the second island is connected to ground by an airbridge.
+    """
+    layout = pya.Layout()
+    cell = layout.create_cell("test")
+
+    def box(*coords):
+        return pya.DBox(*coords).to_itype(layout.dbu)
+
+    gap = pya.Region()
+    for x in (100, 400):
+        gap += pya.Region(box(x - 50, 50, x + 150, 250)) - pya.Region(box(x, 100, x + 100, 200))
+    cell.shapes(layout.layer(default_layers["1t1_base_metal_gap_wo_grid"])).insert(gap)
+    if with_airbridge:
+        cell.shapes(layout.layer(default_layers["1t1_airbridge_pads"])).insert(box(420, 140, 440, 160))
+        cell.shapes(layout.layer(default_layers["1t1_airbridge_pads"])).insert(box(560, 140, 580, 160))
+        cell.shapes(layout.layer(default_layers["1t1_airbridge_flyover"])).insert(box(420, 145, 580, 155))
+    simulation = EmptySimulation.from_cell(cell, box=pya.DBox(0, 0, 700, 300))
+    return {n: l["excitation"] for n, l in simulation.layers.items() if "excitation" in l}
+
+
+def test_islands_are_floating_signals():
+    assert _excitations(False) == {"1t1_ground": 0, "1t1_signal_1": 1, "1t1_signal_2": 2}
+
+
+def test_airbridge_connects_island_to_ground():
+    assert _excitations(True) == {
+        "1t1_ground": 0,
+        "1t1_signal_1": 1,
+        "1t1_airbridge_pads": 0,
+        "1t1_airbridge_flyover": 0,
+    }
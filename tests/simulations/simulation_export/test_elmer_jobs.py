@@ -0,0 +1,101 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+import sys
+
+import pytest
+
+from kqcircuits.defaults import SIM_SCRIPT_PATH
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.elmer.elmer_solution import ElmerCapacitanceSolution, ElmerVectorHelmholtzSolution
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+
+sim_parameters = {
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+
+
+def _export_jobs(tmp_path, solutions, workflow=None):
+    layout = pya.Layout()
+    simulations = [
+        (WaveGuidesSim(layout, name=name, **sim_parameters), solution) for name, solution in zip(("a", "b"), solutions)
+    ]
+    export_elmer(simulations, tmp_path, workflow={"dag_scheduler": True, **(workflow or {})})
+    jobs_data = json.loads((tmp_path / "simulation_jobs.json").read_text())
+    return {job["name"]: job for job in jobs_data["jobs"]}
+
+
+@pytest.fixture
+def job_scheduler(monkeypatch):
+    monkeypatch.syspath_prepend(str(SIM_SCRIPT_PATH / "elmer"))
+    import job_scheduler  # pylint: disable=import-outside-toplevel,import-error
+
+    return job_scheduler
+
+
+def _job(name, after=(), cpus=1, code=0):
+    cmd = [sys.executable, "-c", f"open('order.txt', 'a').write('{name}\\n'); exit({code})"]
+    return {"name": name, "cmd": cmd, "log": f"{name}.log", "cpus": cpus, "after": list(after)}
+
+
+def test_shared_mesh_is_produced_once(tmp_path):
+    jobs = _export_jobs(tmp_path, [ElmerCapacitanceSolution(), ElmerCapacitanceSolution(p_element_order=2)])
+    assert "b:gmsh" not in jobs and "b:elmergrid" not in jobs
+    assert jobs["a:elmergrid"]["after"] == ["a:gmsh"]
+    assert jobs["b:sifs"]["after"] == ["a:elmergrid"]
+    assert jobs["b:results"]["after"] == ["b:solve:b"]
+    assert "job_scheduler.py simulation_jobs.json" in (tmp_path / "simulation.sh").read_text()
+
+
+def test_each_frequency_is_solved_in_own_job(tmp_path):
+    solution = ElmerVectorHelmholtzSolution(frequency=[5, 6])
+    jobs = _export_jobs(tmp_path, [solution, solution], workflow={"elmer_n_processes": 2, "n_workers": 2})
+    solves = [name for name in jobs if name.startswith("b:solve")]
+    assert solves == ["b:solve:b_f5", "b:solve:b_f6"]
+    assert jobs["b:solve:b_f6"]["cmd"][-3:] == ["--only-elmer", "--sif-names", "b_f6"]
+    assert jobs["b:solve:b_f6"]["cpus"] == 2
+    assert jobs["b:results"]["after"] == solves
+
+
+def test_jobs_run_after_dependencies(tmp_path, job_scheduler):
+    jobs = [_job("solve", ["mesh"]), _job("mesh"), _job("results", ["solve"]), _job("other_mesh")]
+    assert job_scheduler.run_jobs(jobs, 1, tmp_path) == []
+    # the job with the longest chain of dependent jobs starts first
+    assert (tmp_path / "order.txt").read_text().split() == ["mesh", "solve", "results", "other_mesh"]
+
+
+def test_failed_job_skips_dependents(tmp_path, job_scheduler):
+    jobs = [_job("mesh", code=1), _job("solve", ["mesh"], cpus=4), _job("other")]
+    assert job_scheduler.run_jobs(jobs, 2, tmp_path) == ["mesh", "solve"]
+    assert sorted((tmp_path / "order.txt").read_text().split()) == ["mesh", "other"]
+
+
+def test_long_chain_of_jobs_is_prioritized(job_scheduler):
+    jobs = [_job("0")] + [_job(str(i), [str(i - 1)]) for i in range(1, 5000)]
+    priorities = job_scheduler.get_job_priorities(job_scheduler.get_dependents(jobs))
+    assert priorities["0"] == 5000 and priorities["4999"] == 1
+
+
+def test_cycle_of_jobs_is_reported(tmp_path, job_scheduler):
+    jobs = [_job("mesh"), _job("a", ["mesh", "c"]), _job("b", ["a"]), _job("c", ["b"]), _job("results", ["c"])]
+    with pytest.raises(ValueError, match="cycle: a -> b -> c -> a"):
+        job_scheduler.run_jobs(jobs, 1, tmp_path)
+    assert not (tmp_path / "order.txt").exists()
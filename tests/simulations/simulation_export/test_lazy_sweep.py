@@ -0,0 +1,93 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.ansys.ansys_export import export_ansys
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.elmer.elmer_solution import ElmerCapacitanceSolution
+from kqcircuits.simulations.export.simulation_export import (
+    SimulationSweep,
+    cross_combine,
+    cross_sweep_simulation,
+)
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+
+sim_parameters = {
+    "name": "wg",
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+sweeps = {"n_guides": [1, 2], "cpw_length": [100, 200]}
+
+
+def _json_files(path):
+    return {f.name: json.loads(f.read_text()) for f in path.glob("*.json")}
+
+
+def test_lazy_sweep_builds_simulations_when_iterated():
+    layout = pya.Layout()
+    sweep = cross_sweep_simulation(layout, WaveGuidesSim, sim_parameters, sweeps, lazy=True)
+    assert isinstance(sweep, SimulationSweep)
+    assert len(sweep) == 4
+    assert layout.cells() == 0
+    assert [sim.name for sim in sweep] == [
+        "wg_1_100",
+        "wg_1_200",
+        "wg_2_100",
+        "wg_2_200",
+    ]
+
+
+def test_lazy_sweep_elmer_export_equals_list_export(tmp_path):
+    list_path, lazy_path = tmp_path / "list", tmp_path / "lazy"
+    list_path.mkdir()
+    lazy_path.mkdir()
+    export_elmer(
+        cross_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, sweeps),
+        list_path,
+    )
+    layout = pya.Layout()
+    export_elmer(
+        cross_sweep_simulation(layout, WaveGuidesSim, sim_parameters, sweeps, lazy=True),
+        lazy_path,
+    )
+    assert _json_files(list_path) == _json_files(lazy_path)
+    assert layout.top_cells() == []
+
+
+def test_lazy_solution_sweep_reuses_meshes(tmp_path):
+    layout = pya.Layout()
+    sweep = cross_sweep_simulation(layout, WaveGuidesSim, sim_parameters, sweeps, lazy=True)
+    solutions = [ElmerCapacitanceSolution(name=f"_p{p}", p_element_order=p) for p in (1, 2)]
+    export_elmer(cross_combine(sweep, solutions), tmp_path)
+    json_files = _json_files(tmp_path)
+    assert len(json_files) == 9
+    assert json_files["wg_1_100_p2.json"]["mesh_name"] == "wg_1_100_p1"
+    assert layout.top_cells() == []
+
+
+def test_lazy_sweep_exports_to_ansys(tmp_path):
+    layout = pya.Layout()
+    export_ansys(
+        cross_sweep_simulation(layout, WaveGuidesSim, sim_parameters, sweeps, lazy=True),
+        tmp_path,
+    )
+    assert all((tmp_path / f"{name}.gds").exists() for name in ["wg_1_100", "wg_1_200", "wg_2_100", "wg_2_200"])
+    assert layout.top_cells() == []
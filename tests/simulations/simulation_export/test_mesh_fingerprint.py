@@ -0,0 +1,57 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.elmer.elmer_solution import ElmerCapacitanceSolution
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+
+sim_parameters = {
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+
+
+def _export(tmp_path, solutions, workflow=None):
+    layout = pya.Layout()
+    simulations = [
+        (WaveGuidesSim(layout, name=name, **sim_parameters), solution) for name, solution in zip(("a", "b"), solutions)
+    ]
+    export_elmer(simulations, tmp_path, workflow=workflow)
+    return {name: json.loads((tmp_path / f"{name}.json").read_text()) for name in ("a", "b")}
+
+
+def test_equal_geometry_shares_mesh(tmp_path):
+    json_data = _export(tmp_path, [ElmerCapacitanceSolution(), ElmerCapacitanceSolution(p_element_order=2)])
+    assert json_data["a"]["mesh_fingerprint"] == json_data["b"]["mesh_fingerprint"]
+    assert json_data["a"]["mesh_name"] == "a"
+    assert json_data["b"]["mesh_name"] == "a"
+
+
+def test_mesh_size_changes_fingerprint(tmp_path):
+    json_data = _export(tmp_path, [ElmerCapacitanceSolution(), ElmerCapacitanceSolution(mesh_size={"global_max": 10})])
+    assert json_data["a"]["mesh_fingerprint"] != json_data["b"]["mesh_fingerprint"]
+    assert json_data["b"]["mesh_name"] == "b"
+
+
+def test_delete_meshes_writes_mesh_users(tmp_path):
+    _export(tmp_path, [ElmerCapacitanceSolution(), ElmerCapacitanceSolution()], workflow={"delete_meshes": True})
+    mesh_users = json.loads((tmp_path / "mesh_users.json").read_text())
+    assert mesh_users == {"a": ["a", "b"]}
@@ -0,0 +1,91 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import json
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.ansys.ansys_export import export_ansys
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.simulation_export import cross_sweep_simulation, sweep_simulation
+from kqcircuits.simulations.export.simulation_handle import SimulationHandle
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+
+sim_parameters = {
+    "name": "wg",
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+sweeps = {"n_guides": [1, 2], "cpw_length": [100, 200]}
+
+
+def _json_files(path):
+    return {f.name: json.loads(f.read_text()) for f in path.glob("*.json") if f.name != "simulation.json"}
+
+
+def _region(gds_file):
+    layout = pya.Layout()
+    layout.read(str(gds_file))
+    return {
+        info.layer: pya.Region(layout.top_cell().begin_shapes_rec(i)) for i, info in enumerate(layout.layer_infos())
+    }
+
+
+def test_parallel_sweep_returns_handles(tmp_path):
+    handles = cross_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, sweeps, processes=2, path=tmp_path)
+    assert len(handles) == 4
+    assert all(isinstance(h, SimulationHandle) for h in handles)
+    assert [h.name for h in handles] == ["wg_1_100", "wg_1_200", "wg_2_100", "wg_2_200"]
+    assert all((tmp_path / f"{h.name}.oas").exists() for h in handles)
+
+
+def test_parallel_sweep_elmer_export_equals_serial(tmp_path):
+    serial_path, parallel_path = tmp_path / "serial", tmp_path / "parallel"
+    serial_path.mkdir()
+    parallel_path.mkdir()
+    simulations = cross_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, sweeps)
+    export_elmer(simulations, serial_path, tool="capacitance")
+    handles = cross_sweep_simulation(
+        pya.Layout(), WaveGuidesSim, sim_parameters, sweeps, processes=2, path=parallel_path
+    )
+    export_elmer(handles, parallel_path, tool="capacitance")
+
+    assert _json_files(serial_path) == _json_files(parallel_path)
+    for simulation in simulations:
+        gds_file = f"{simulation.name}.gds"
+        serial, parallel = _region(serial_path / gds_file), _region(parallel_path / gds_file)
+        assert serial.keys() == parallel.keys()
+        assert all((serial[layer] ^ parallel[layer]).is_empty() for layer in serial)
+
+
+def test_parallel_sweep_exports_to_ansys(tmp_path):
+    handles = cross_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, sweeps, processes=2, path=tmp_path)
+    export_ansys(handles, tmp_path, exit_after_run=True)
+    assert all((tmp_path / f"{h.name}.gds").exists() for h in handles)
+
+
+class _LayoutlessSim(WaveGuidesSim):
+    """Simulation that creates a layout of its own, which the sweep must not give."""
+
+    def __init__(self, **kwargs):
+        super().__init__(pya.Layout(), **kwargs)
+
+
+def test_parallel_sweep_without_layout_builds_like_serial(tmp_path):
+    serial = sweep_simulation(None, _LayoutlessSim, sim_parameters, {"n_guides": [1, 2]})
+    handles = sweep_simulation(None, _LayoutlessSim, sim_parameters, {"n_guides": [1, 2]}, processes=2, path=tmp_path)
+    assert [h.name for h in handles] == [s.name for s in serial]
@@ -0,0 +1,72 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.simulation_export import (
+    SimulationOasWriter,
+    cross_sweep_simulation,
+    export_simulation_oas,
+)
+from kqcircuits.simulations.single_element_simulation import get_single_element_sim_class
+from kqcircuits.elements.finger_capacitor_square import FingerCapacitorSquare
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+from kqcircuits.util.load_save_layout import load_layout
+
+sim_parameters = {
+    "name": "wg",
+    "use_edge_ports": False,
+    "box": pya.DBox(-500, -500, 500, 500),
+}
+sweeps = {"n_guides": [1, 2], "cpw_length": [100, 200]}
+
+
+def _load(filename):
+    layout = pya.Layout()
+    load_layout(filename, layout)
+    return layout
+
+
+def test_writes_simulations_of_different_layouts(tmp_path):
+    simulations = [WaveGuidesSim(pya.Layout(), **{**sim_parameters, "name": name}) for name in ("a", "b")]
+    layout = _load(export_simulation_oas(simulations, tmp_path))
+    assert sorted(cell.name for cell in layout.top_cells()) == ["a", "b"]
+    for simulation in simulations:
+        cell = layout.cell(simulation.name)
+        for layer in simulation.get_layers():
+            region = pya.Region(simulation.cell.begin_shapes_rec(simulation.layout.layer(layer)))
+            assert (region ^ pya.Region(cell.begin_shapes_rec(layout.layer(layer)))).is_empty()
+
+
+def test_identical_subcells_are_shared(tmp_path):
+    sim_class = get_single_element_sim_class(FingerCapacitorSquare)
+    simulations = [sim_class(pya.Layout(), name=f"c{i}", box=pya.DBox(-200, -200, 200, 200)) for i in range(3)]
+    written = _load(export_simulation_oas(simulations, tmp_path))
+    assert len(written.top_cells()) == 3
+    assert written.cells() == simulations[0].layout.cells() + 2
+
+
+def test_lazy_export_writes_oas(tmp_path):
+    with SimulationOasWriter(tmp_path / "simulation.oas") as writer:
+        export_elmer(
+            cross_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, sweeps, lazy=True),
+            tmp_path,
+            oas_writer=writer,
+        )
+    layout = _load(tmp_path / "simulation.oas")
+    assert sorted(cell.name for cell in layout.top_cells()) == ["wg_1_100", "wg_1_200", "wg_2_100", "wg_2_200"]
@@ -0,0 +1,69 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import numpy as np
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.export.simulation_export import combine_sweep_simulation, unique_rows
+from kqcircuits.simulations.export.sweep_planner import SweepParameter, SweepPlanner
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
+
+parameters = [
+    SweepParameter("cpw_length", 100, 200),
+    SweepParameter("n_guides", 1, 3, integer=True),
+    SweepParameter("face", choices=("1t1", "2b1")),
+]
+
+
+def test_initial_samples_are_latin_hypercube():
+    samples = SweepPlanner(parameters, seed=0).initial_samples(10)
+    lengths = np.array([s[0] for s in samples])
+    assert sorted(np.floor((lengths - 100) / 10)) == list(range(10))
+    assert {s[1] for s in samples} == {1, 2, 3}
+    assert all(isinstance(s[1], int) for s in samples)
+    assert {s[2] for s in samples} == {"1t1", "2b1"}
+
+
+def test_samples_are_not_repeated():
+    planner = SweepPlanner([SweepParameter("n", 0, 3, integer=True), SweepParameter("m", choices=(1, 2))], seed=0)
+    samples = planner.initial_samples(4, add_edges=True)
+    more = planner.next_samples(10, samples, [0] * len(samples))
+    all_samples = [tuple(s) for s in samples + more]
+    assert len(set(all_samples)) == len(all_samples) <= 8
+
+
+def test_next_samples_refine_varying_region():
+    planner = SweepPlanner([SweepParameter("x", 0, 1)], seed=0)
+    samples = planner.initial_samples(20)
+    results = [float(s[0] > 0.5) for s in samples]
+    more = planner.next_samples(5, samples, results, exploration=0.01)
+    assert len(more) == 5
+    assert np.mean([abs(s[0] - 0.5) for s in more]) < 0.15
+
+
+def test_samples_feed_combine_sweep_simulation():
+    planner = SweepPlanner(parameters[:2], seed=0)
+    samples = planner.initial_samples(3)
+    sim_parameters = {"name": "wg", "use_edge_ports": False, "box": pya.DBox(-500, -500, 500, 500)}
+    simulations = combine_sweep_simulation(pya.Layout(), WaveGuidesSim, sim_parameters, planner.keys, samples)
+    assert [(sim.cpw_length, sim.n_guides) for sim in simulations] == [tuple(s) for s in samples]
+
+
+def test_unique_rows_of_mixed_dtypes_keep_order():
+    rows = np.array([[2, 0.5], [1, 0.25], [2, 0.5]], dtype=object)
+    assert unique_rows(rows).tolist() == [[2, 0.5], [1, 0.25]]
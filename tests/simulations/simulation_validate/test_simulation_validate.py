@@ -39,7 +39,11 @@ from kqcircuits.simulations.export.simulation_validate import (
     has_edgeport_when_forbidden,
     flux_integration_layer_exists_if_needed,
     simulation_and_solution_types_match,
+    validate_sweep,
 )
+from kqcircuits.simulations.export.elmer.elmer_export import export_elmer
+from kqcircuits.simulations.export.simulation_export import cross_combine, sweep_simulation
+from kqcircuits.simulations.waveguides_sim import WaveGuidesSim
 
 
 @pytest.fixture
@@ -209,3 +213,38 @@ def test_raise_flux_integration_error_if_has_no_needed_layer_and_others(mock_sim
     with pytest.raises(ValidateSimError) as expected_error:
         flux_integration_layer_exists_if_needed(mock_simulation, solution)
     assert expected_error.value.validation_type == "flux_integration_layer_exists_if_needed"
+
+
+def test_validate_sweep_reports_all_failures():
+    parameter_sets = [
+        {"name": "ok", "metal_height": 0.2, "tls_sheet_approximation": False},
+        {"name": "bad1", "metal_height": 0.2, "tls_sheet_approximation": True, "detach_tls_sheets_from_body": False},
+        {"name": "bad2", "metal_height": 0.2, "tls_sheet_approximation": True, "detach_tls_sheets_from_body": False},
+    ]
+    with pytest.raises(ValidateSimError) as expected_error:
+        validate_sweep(Simulation, parameter_sets, [ElmerCapacitanceSolution(), ElmerEPR3DSolution()])
+    message = str(expected_error.value)
+    assert message.startswith("2 simulation and solution combinations")
+    assert "bad1 with ElmerCapacitanceSolution" in message and "bad2 with ElmerCapacitanceSolution" in message
+    assert "ok" not in message.split("\n", 1)[1]
+
+
+def test_validate_sweep_checks_types_and_partition_regions():
+    validate_sweep(CrossSectionSimulation, [{"name": "cs"}], [ElmerCrossSectionSolution()])
+    with pytest.raises(ValidateSimError):
+        validate_sweep(CrossSectionSimulation, [{"name": "cs"}], [ElmerCapacitanceSolution()])
+    with pytest.raises(ValidateSimError):
+        validate_sweep(
+            Simulation,
+            [{"name": "sim", "partition_regions": [{"name": "sa"}]}],
+            [ElmerCapacitanceSolution(integrate_energies=True)],
+        )
+
+
+def test_lazy_sweep_is_validated_before_build(layout, tmp_path, monkeypatch):
+    sweep = sweep_simulation(
+        layout, WaveGuidesSim, {"name": "wg", "use_edge_ports": False}, {"n_guides": [1, 2]}, lazy=True
+    )
+    monkeypatch.setattr(WaveGuidesSim, "build", lambda self: pytest.fail("geometry was built"))
+    with pytest.raises(ValidateSimError):
+        export_elmer(cross_combine(sweep, ElmerCapacitanceSolution(linear_system_method="mg")), tmp_path)
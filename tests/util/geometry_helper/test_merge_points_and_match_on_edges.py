@@ -149,3 +149,14 @@ def test_hole_detection():
     assert region.area() == 1600000
     merge_points_and_match_on_edges([region])
     assert region.area() == 1600000
+
+
+def test_edge_split_at_points_of_other_region():
+    bottom = pya.Region(pya.Box(0, 0, 10000, 1000))
+    top = pya.Region([pya.Box(1000 * i + 100, 1001, 1000 * i + 900, 2000) for i in range(10)])
+    merge_points_and_match_on_edges([bottom, top])
+    assert bottom.count() == 1
+    assert next(bottom.each()).num_points() == 24
+    assert (bottom & top).is_empty()
+    assert top.count() == 10
+    assert top.bbox() == pya.Box(100, 1001, 9900, 2000)
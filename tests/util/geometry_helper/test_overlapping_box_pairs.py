@@ -0,0 +1,47 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+import random
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.geometry_helper import overlapping_box_pairs
+
+
+def _all_overlapping_pairs(boxes):
+    return {(i, j) for i in range(len(boxes)) for j in range(i + 1, len(boxes)) if boxes[i].touches(boxes[j])}
+
+
+def test_pairs_of_random_boxes_are_found():
+    rng = random.Random(7)
+    boxes = []
+    for _ in range(300):
+        x, y = rng.randint(0, 1000), rng.randint(0, 1000)
+        boxes.append(pya.Box(x, y, x + rng.randint(0, 100), y + rng.randint(0, 100)))
+    pairs = overlapping_box_pairs(boxes)
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == _all_overlapping_pairs(boxes)
+
+
+def test_touching_boxes_are_paired():
+    boxes = [pya.DBox(0, 0, 1, 1), pya.DBox(1, 0, 2, 1), pya.DBox(2.5, 0, 3, 1)]
+    assert overlapping_box_pairs(boxes) == [(0, 1)]
+    assert sorted(overlapping_box_pairs(boxes, enlargement=0.25)) == [(0, 1), (1, 2)]
+
+
+def test_no_boxes():
+    assert not overlapping_box_pairs([])
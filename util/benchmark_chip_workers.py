@@ -0,0 +1,72 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+# Measure the startup cost of a chip worker process, i.e. starting the process, importing KQCircuits and loading its
+# libraries, compared to the time of building a chip in the worker.
+#
+# A cold worker pays the startup cost before its first chip. The warm chip workers of ``MaskSet`` pay it once when
+# they start, or not at all if they are forked from a process that has already loaded the libraries, which is the
+# "fork, preloaded" case below. The startup cost saved is the startup time times the number of chip tasks that would
+# otherwise start a worker.
+#
+# usage: python benchmark_chip_workers.py [number_of_chips]
+
+
+import sys
+from multiprocessing import get_context
+from time import perf_counter
+
+
+def _run(chip_count):
+    start = perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from kqcircuits.chips.chip import Chip
+    from kqcircuits.klayout_view import KLayoutView
+    from kqcircuits.util.library_helper import load_libraries
+
+    load_libraries()
+    startup_time = perf_counter() - start
+
+    chip_times = []
+    for i in range(chip_count):
+        start = perf_counter()
+        view = KLayoutView()  # clean layout for each chip, like in MaskSet workers
+        Chip.create(view.layout, name_chip=f"CH{i}")
+        view.close()
+        chip_times.append(perf_counter() - start)
+    return startup_time, chip_times
+
+
+if __name__ == "__main__":
+    benchmark_chip_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for start_method, preload in (("spawn", False), ("fork", False), ("fork", True)):
+        if preload:
+            from kqcircuits.util.library_helper import load_libraries  # pylint: disable=import-outside-toplevel
+
+            load_libraries()
+        start_time = perf_counter()
+        with get_context(start_method).Pool(1) as pool:
+            libraries_time, chip_times = pool.apply(_run, (benchmark_chip_count,))
+        process_time = perf_counter() - start_time - libraries_time - sum(chip_times)
+        name = f"{start_method}, preloaded" if preload else start_method
+        print(
+            f"{name:>16}: process {process_time:5.2f} s, imports and libraries {libraries_time:5.2f} s, "
+            f"chips {', '.join(f'{t:.2f}' for t in chip_times)} s"
+        )
@@ -0,0 +1,100 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+# Measure the time spent in importing the layers of the simulation in ``finger_capacitor_square_with_grid.py`` into the
+# OpenCASCADE model of Gmsh with ``add_region`` and in fragmenting them, which are the geometry stages of the Elmer
+# mesh generation. The ground grid is drawn in the small box of the script and in a five times larger box, and the
+# import is repeated with the 5 µm grid holes filled by ``min_hole_size``. Requires gmsh.
+#
+# usage: python benchmark_gmsh_import.py
+
+
+import sys
+from time import perf_counter
+
+import gmsh
+
+from kqcircuits.defaults import SIM_SCRIPT_PATH
+from kqcircuits.elements.finger_capacitor_square import FingerCapacitorSquare
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.single_element_simulation import get_single_element_sim_class
+
+sys.path.append(str(SIM_SCRIPT_PATH / "elmer"))
+from gmsh_helpers import add_region  # pylint: disable=wrong-import-position,import-error
+
+sim_parameters = {
+    "name": "capacitor",
+    "use_internal_ports": True,
+    "use_ports": True,
+    "box": pya.DBox(pya.DPoint(0, 0), pya.DPoint(1000, 1000)),
+    "finger_number": 4,
+    "finger_width": 10,
+    "finger_gap_end": 9.5,
+    "finger_length": 0,
+    "finger_gap": 0,
+    "a": 3.5,
+    "b": 32,
+    "a2": 3.5,
+    "b2": 32,
+    "ground_padding": 10,
+    "port_size": 200,
+    "face_stack": ["1t1", "2b1"],
+    "corner_r": 2,
+    "chip_distance": 8,
+    "with_grid": True,
+    "face_ids": ["2b1", "1t1", "2t1"],
+}
+
+
+def _import_and_fragment(simulation, min_hole_size):
+    gmsh.model.add("benchmark")
+    layout, cell = simulation.layout, simulation.cell
+    start_time = perf_counter()
+    dim_tags = []
+    for data in simulation.layers.values():
+        if "layer" in data:
+            dim_tags += add_region(
+                pya.Region(cell.begin_shapes_rec(layout.layer(data["layer"], 0))), layout.dbu, min_hole_size
+            )
+    gmsh.model.occ.synchronize()
+    import_time = perf_counter() - start_time
+    gmsh.model.occ.fragment(dim_tags, [])
+    gmsh.model.occ.synchronize()
+    fragment_time = perf_counter() - start_time - import_time
+    gmsh.model.remove()
+    return import_time, fragment_time
+
+
+if __name__ == "__main__":
+    SimClass = get_single_element_sim_class(FingerCapacitorSquare)
+    grid_boxes = {
+        "small grid": pya.DBox(pya.DPoint(350, 450), pya.DPoint(650, 550)),
+        "large grid": pya.DBox(pya.DPoint(250, 350), pya.DPoint(750, 650)),
+    }
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Verbosity", 1)
+    for grid_name, grid_box in grid_boxes.items():
+        simulation = SimClass(pya.Layout(), ground_grid_box=grid_box, **sim_parameters)
+        for min_hole_size in (0.0, 10.0):
+            import_time, fragment_time = _import_and_fragment(simulation, min_hole_size)
+            print(
+                f"{grid_name:>10}, min_hole_size {min_hole_size:4.1f}: "
+                f"import {import_time:6.2f} s, fragment {fragment_time:6.2f} s"
+            )
+    gmsh.finalize()
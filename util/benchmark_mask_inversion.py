@@ -0,0 +1,101 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+# Compare the run time and peak memory of inverting a mask layer ("-" prefixed layer in mask_export_layers) with the
+# flat merged region used in earlier versions and with the tiled inversion of ``mask_export.py``.
+#
+# The input is the all-layers .oas file of a mask layout, for example the file Demo_v1/Demo_v1-1t1/Demo_v1-1t1.oas
+# exported by ``kqc mask demo.py`` with ``with_grid=True``. Each method runs in its own process so that the peak
+# memory usages are independent.
+#
+# usage: python benchmark_mask_inversion.py path/to/mask.oas [layer_name] [face_id] [wafer_rad]
+
+
+import os
+import resource
+import sys
+from multiprocessing import Pool
+from time import perf_counter
+
+from kqcircuits.klayout_view import resolve_default_layer_info
+from kqcircuits.masks.mask_export import _insert_inverted_layer
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.geometry_helper import circle_polygon
+from kqcircuits.util.load_save_layout import load_layout
+
+
+def _invert_flat(cell, layer, wafer_rad):
+    """Inversion as done before tiling: merge the whole layer into a flat region and XOR it with the wafer disc."""
+    layout = cell.layout()
+    wafer = pya.Region(cell.begin_shapes_rec(layer)).merged()
+    disc = pya.Region(circle_polygon(wafer_rad).to_itype(layout.dbu))
+    result = wafer ^ disc
+    result.merged_semantics = False
+    return result.area(), result.count()
+
+
+def _invert_tiled(cell, layer, wafer_rad):
+    layout = cell.layout()
+    target_cell = layout.create_cell("inverted")
+    _insert_inverted_layer(cell, layer, target_cell, wafer_rad)
+    result = pya.Region(target_cell.begin_shapes_rec(layer))
+    result.merged_semantics = False  # the tiles do not overlap, so the area can be summed without merging
+    return result.area(), result.count()
+
+
+def _run(args):
+    method, path, layer_name, face_id, wafer_rad = args
+    # limit the address space to the physical memory, so that running out of memory raises an error in KLayout
+    # instead of invoking the OOM killer
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    layout = pya.Layout()
+    load_layout(path, layout)
+    layer = layout.layer(resolve_default_layer_info(layer_name, face_id))
+    start = perf_counter()
+    try:
+        area, count = method(layout.top_cell(), layer, wafer_rad)
+    except RuntimeError as e:  # typically std::bad_alloc
+        print(f"{method.__name__} failed: {e}")
+        area, count = None, None
+    elapsed = perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB to MB on Linux
+    return method.__name__, elapsed, peak_rss, area, count
+
+
+if __name__ == "__main__":
+    mask_path = sys.argv[1]
+    benchmark_layer = sys.argv[2] if len(sys.argv) > 2 else "base_metal_gap"
+    benchmark_face = sys.argv[3] if len(sys.argv) > 3 else "1t1"
+    benchmark_wafer_rad = float(sys.argv[4]) if len(sys.argv) > 4 else 76200
+
+    results = []
+    for benchmark_method in (_invert_flat, _invert_tiled):
+        with Pool(1) as pool:  # fresh process for each method
+            results += pool.map(
+                _run, [(benchmark_method, mask_path, benchmark_layer, benchmark_face, benchmark_wafer_rad)]
+            )
+
+    print(f"Inverting {benchmark_face}_{benchmark_layer} of {mask_path}")
+    for name, t, rss, a, n in results:
+        result_str = "failed" if a is None else f"area {a * 1e-6:.3f} µm^2, {n} polygons"
+        print(f"{name:>14}: {t:8.2f} s, peak RSS {rss:8.1f} MB, {result_str}")
+    # tiled polygons are cut at tile boundaries, where the cut points are rounded to the database grid
+    if None not in (results[0][3], results[1][3]) and abs(results[0][3] - results[1][3]) > 1e-8 * results[0][3]:
+        print("WARNING: results have different areas")
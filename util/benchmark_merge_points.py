@@ -0,0 +1,114 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+# Measure the time of ``merge_points_and_match_on_edges`` on the layer sets of real simulations. The simulations are
+# built once, the regions given to ``merge_points_and_match_on_edges`` by ``produce_layers`` are recorded, and the
+# function is then timed on copies of the recorded regions.
+#
+# usage: python benchmark_merge_points.py [repeats]
+
+
+import sys
+from time import perf_counter
+
+from kqcircuits.chips.tsv_test import TsvTest
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations import simulation
+from kqcircuits.simulations.empty_simulation import EmptySimulation
+from kqcircuits.simulations.single_xmons_full_chip_sim import SingleXmonsFullChipSim
+from kqcircuits.simulations.xmons_direct_coupling_full_chip_sim import XMonsDirectCouplingFullChipSim
+from kqcircuits.util.geometry_helper import merge_points_and_match_on_edges
+
+_recorded = []
+
+
+def _record(regions, tolerance=2):
+    _recorded.append(([region.dup() for region in regions], tolerance))
+    merge_points_and_match_on_edges(regions, tolerance)
+
+
+def _partition_regions(face, n):
+    return [
+        {
+            "name": f"part{i}{j}",
+            "region": pya.DBox(
+                1000 + 8000 * i / n, 1000 + 8000 * j / n, 1000 + 8000 * (i + 1) / n, 1000 + 8000 * (j + 1) / n
+            ),
+            "face": face,
+            "vertical_dimensions": 5.0,
+            "metal_edge_dimensions": 4.0,
+        }
+        for i in range(n)
+        for j in range(n)
+    ]
+
+
+def _single_xmons_full_chip_sim(**kwargs):
+    return SingleXmonsFullChipSim(pya.Layout(), launchers=True, use_test_resonators=True, n=16, port_size=900, **kwargs)
+
+
+def _tsv_test_sim():
+    layout = pya.Layout()
+    return EmptySimulation.from_cell(
+        TsvTest.create(layout, with_grid=False),
+        margin=0,
+        hollow_tsv=2.0,
+        face_stack=["1t1", "2b1"],
+        partition_regions=[{"name": "mer", "face": "1t1", "vertical_dimensions": 3.0, "metal_edge_dimensions": 2.0}],
+        tls_layer_thickness=0.01,
+    )
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    simulation.merge_points_and_match_on_edges = _record
+
+    benchmarks = {
+        "XMonsDirectCoupling": lambda: XMonsDirectCouplingFullChipSim(pya.Layout(), use_ports=True),
+        "TLS sheets, 9 parts": lambda: _single_xmons_full_chip_sim(
+            partition_regions=_partition_regions("1t1", 3),
+            tls_layer_thickness=0.01,
+            tls_sheet_approximation=True,
+            metal_height=[0.2],
+        ),
+        "TLS layers, 4 parts": lambda: _single_xmons_full_chip_sim(
+            partition_regions=_partition_regions("1t1", 2),
+            tls_layer_thickness=0.01,
+            metal_height=[0.2],
+            dielectric_height=[0.1],
+            dielectric_material=["silicon"],
+        ),
+        "TsvTest flip-chip": _tsv_test_sim,
+    }
+    for benchmark_name, create_simulation in benchmarks.items():
+        _recorded.clear()
+        create_simulation()
+        for call, (regions, tolerance) in enumerate(_recorded):
+            polygons = sum(region.count() for region in regions)
+            points = sum(polygon.num_points() for region in regions for polygon in region.each())
+            times = []
+            for _ in range(repeats):
+                copies = [region.dup() for region in regions]
+                start_time = perf_counter()
+                merge_points_and_match_on_edges(copies, tolerance)
+                times.append(perf_counter() - start_time)
+            print(
+                f"{benchmark_name:>20} call {call}: {len(regions):3} regions, {polygons:5} polygons, "
+                f"{points:7} points, best {min(times):6.3f} s of {repeats}"
+            )
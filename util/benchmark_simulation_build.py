@@ -0,0 +1,102 @@
+# This code is part of KQCircuits
+# Copyright (C) 2026 IQM Finland Oy
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# https://www.gnu.org/licenses/gpl-3.0.html.
+#
+# The software distribution should follow IQM trademark policy for open-source software
+# (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
+# Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
+# and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+
+
+# Measure the time spent in the geometry build phases of ``Simulation``, i.e. ``split_metal_layers_by_excitation`` and
+# ``produce_layers``, for the full chip simulations and for simulations of whole chips created with
+# ``Simulation.from_cell``. The partitioned simulation with TLS layers stresses the layer partitioning of
+# ``produce_layers``.
+#
+# usage: python benchmark_simulation_build.py
+
+
+from time import perf_counter
+
+from kqcircuits.chips.airbridge_crossings import AirbridgeCrossings
+from kqcircuits.chips.tsv_test import TsvTest
+from kqcircuits.pya_resolver import pya
+from kqcircuits.simulations.empty_simulation import EmptySimulation
+from kqcircuits.simulations.simulation import Simulation
+from kqcircuits.simulations.single_xmons_full_chip_sim import SingleXmonsFullChipSim
+
+_phase_times = {}
+
+
+def _timed(method):
+    def timed_method(self, *args, **kwargs):
+        start = perf_counter()
+        result = method(self, *args, **kwargs)
+        _phase_times[method.__name__] = perf_counter() - start
+        return result
+
+    return timed_method
+
+
+def _single_xmons_full_chip_sim():
+    return SingleXmonsFullChipSim(pya.Layout(), launchers=True, use_test_resonators=True, n=16, port_size=900)
+
+
+def _partitioned_single_xmons_full_chip_sim():
+    partition_regions = [
+        {
+            "name": f"part{i}{j}",
+            "region": pya.DBox(1000 + 4000 * i, 1000 + 4000 * j, 5000 + 4000 * i, 5000 + 4000 * j),
+            "face": "1t1",
+            "vertical_dimensions": 5.0,
+            "metal_edge_dimensions": 4.0,
+        }
+        for i in range(2)
+        for j in range(2)
+    ]
+    return SingleXmonsFullChipSim(
+        pya.Layout(),
+        launchers=True,
+        use_test_resonators=True,
+        n=16,
+        port_size=900,
+        partition_regions=partition_regions,
+        tls_layer_thickness=0.01,
+        metal_height=[0.2],
+    )
+
+
+def _chip_sim(chip_class):
+    layout = pya.Layout()
+    return EmptySimulation.from_cell(chip_class.create(layout, with_grid=False), margin=0)
+
+
+if __name__ == "__main__":
+    Simulation.split_metal_layers_by_excitation = _timed(Simulation.split_metal_layers_by_excitation)
+    Simulation.produce_layers = _timed(Simulation.produce_layers)
+
+    benchmarks = {
+        "SingleXmonsFullChipSim": _single_xmons_full_chip_sim,
+        "Partitioned with TLS": _partitioned_single_xmons_full_chip_sim,
+        "AirbridgeCrossings": lambda: _chip_sim(AirbridgeCrossings),
+        "TsvTest": lambda: _chip_sim(TsvTest),
+    }
+    for benchmark_name, create_simulation in benchmarks.items():
+        start_time = perf_counter()
+        simulation = create_simulation()
+        total_time = perf_counter() - start_time
+        excitations = {l["excitation"] for l in simulation.layers.values() if "excitation" in l}
+        print(
+            f"{benchmark_name:>22}: total {total_time:6.2f} s, "
+            + ", ".join(f"{name} {t:6.2f} s" for name, t in _phase_times.items())
+            + f", {len(excitations)} excitations"
+        )